@@ -1,6 +1,5 @@
+import os
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -8,13 +7,37 @@ from datetime import datetime
 from location_data import get_all_countries, get_states_for_country, get_cities_for_state, get_localities_for_city
 from currency_data import get_currency_for_country, format_currency
 from industry_metrics import get_industry_specific_fields, get_all_industries, get_business_models
-from ml_model import StartupSuccessPredictor
+from serving import SharedPredictor, canonical_key
+from audit_log import AuditLog
+from instrumentation import Instrumentation
+from rerun_profiler import RerunProfiler
+from response_surface import ResponseSurface, surface_path
+from ml_model import FUNDING_SCALE
 
 st.set_page_config(page_title="Startup Success Predictor",
                    page_icon="🚀",
                    layout="wide",
                    initial_sidebar_state="expanded")
 
+profile_mode = (os.environ.get('STARTUP_PROFILE') == '1'
+                or st.query_params.get('profile') == '1')
+if profile_mode:
+    if 'rerun_profiler' not in st.session_state:
+        st.session_state.rerun_profiler = RerunProfiler()
+    profiler = st.session_state.rerun_profiler
+else:
+    profiler = RerunProfiler(enabled=False)
+
+
+def rerun():
+    """``st.rerun()``, ending the profiled rerun at this point"""
+    profiler.finish(interrupted=True)
+    st.rerun()
+
+
+profiler.start(label=f"step {st.session_state.get('step', 1)}")
+profiler.mark("styles")
+
 st.markdown("""
     <style>
     .main {
@@ -75,21 +98,67 @@ st.markdown("""
 """,
             unsafe_allow_html=True)
 
+profiler.mark("session & predictor")
+
 if 'step' not in st.session_state:
     st.session_state.step = 1
 if 'startup_data' not in st.session_state:
     st.session_state.startup_data = {}
-if 'predictor' not in st.session_state:
-    with st.spinner('Initializing AI prediction models...'):
-        st.session_state.predictor = StartupSuccessPredictor()
-        st.session_state.predictor.train_models()
+
+
+@st.cache_resource(show_spinner='Initializing AI prediction models...')
+def get_shared_predictor():
+    shared_predictor = SharedPredictor()
+    shared_predictor.get()
+    return shared_predictor
+
+
+shared_predictor = get_shared_predictor()
+
+
+@st.cache_resource(max_entries=2)
+def get_response_surface(version):
+    predictor = shared_predictor.get()
+    surface = ResponseSurface.load(surface_path(shared_predictor.artifact_path),
+                                   predictor)
+    # Without a precomputed surface, contexts are evaluated as startups use them
+    return surface or ResponseSurface(predictor.feature_names,
+                                      artifact_version=version)
+
+
+@st.cache_resource
+def get_instrumentation():
+    instrumentation = Instrumentation()
+    get_shared_predictor().add_reload_hook(
+        lambda predictor: setattr(predictor, 'instrumentation', instrumentation))
+    return instrumentation
+
+
+@st.cache_resource
+def get_audit_log(path):
+    audit_log = AuditLog(path)
+    get_shared_predictor().add_reload_hook(
+        lambda predictor: setattr(predictor, 'audit_log', audit_log))
+    return audit_log
+
+
+# Raw inputs are only persisted when an audit log path is configured
+if os.environ.get('STARTUP_AUDIT_LOG'):
+    get_audit_log(os.environ['STARTUP_AUDIT_LOG'])
+
+debug_mode = (os.environ.get('STARTUP_DEBUG') == '1'
+              or st.query_params.get('debug') == '1')
+if debug_mode:
+    instrumentation = get_instrumentation()
 
 
 def reset_form():
     st.session_state.step = 1
     st.session_state.startup_data = {}
-    st.rerun()
+    rerun()
+
 
+profiler.mark("header")
 
 st.title("🚀 Startup Success Prediction Platform")
 st.markdown(
@@ -114,6 +183,8 @@ with col4:
 
 st.markdown("---")
 
+profiler.mark(f"step {st.session_state.step}")
+
 if st.session_state.step == 1:
     st.header("Step 1: Basic Startup Information")
 
@@ -180,7 +251,7 @@ if st.session_state.step == 1:
                 selected_model
             })
             st.session_state.step = 2
-            st.rerun()
+            rerun()
         else:
             st.error("Please enter a startup name")
 
@@ -275,7 +346,7 @@ elif st.session_state.step == 2:
     with col1:
         if st.button("← Back", type="secondary"):
             st.session_state.step = 1
-            st.rerun()
+            rerun()
 
     with col2:
         if st.button("Next: Industry Details →", type="primary"):
@@ -295,7 +366,7 @@ elif st.session_state.step == 2:
                     currency_info
                 })
                 st.session_state.step = 3
-                st.rerun()
+                rerun()
             else:
                 st.error("Please enter your locality/area/neighborhood")
 
@@ -373,30 +444,65 @@ elif st.session_state.step == 3:
     with col1:
         if st.button("← Back", type="secondary"):
             st.session_state.step = 2
-            st.rerun()
+            rerun()
 
     with col2:
         if st.button("Generate Prediction 🎯", type="primary"):
             st.session_state.startup_data[
                 'industry_metrics'] = industry_metrics
             st.session_state.step = 4
-            st.rerun()
+            rerun()
 
 elif st.session_state.step == 4:
-    st.header("🎯 Success Prediction Results")
+    import plotly.graph_objects as go
 
-    with st.spinner('Analyzing your startup with AI models...'):
-        prediction_result = st.session_state.predictor.predict(
-            st.session_state.startup_data)
+    st.header("🎯 Success Prediction Results")
 
+    predictor = shared_predictor.get()
+    fast_mode = False
+    if predictor.student is not None:
+        fast_mode = st.toggle(
+            "⚡ Fast mode",
+            key="fast_mode",
+            help="Score with one distilled model that approximates the "
+            "four-model ensemble; quicker, but not an exact match")
+
+    profiler.mark("step 4: prediction")
+    # Widgets below rerun this page; reuse the prediction (and log it once)
+    # until the inputs, mode or artifact change
+    prediction_key = (canonical_key(st.session_state.startup_data), fast_mode,
+                      shared_predictor.version)
+    cached = st.session_state.get('prediction')
+    if cached is None or cached[0] != prediction_key:
+        with st.spinner('Analyzing your startup with AI models...'):
+            cached = (prediction_key,
+                      predictor.predict(st.session_state.startup_data,
+                                        mode="fast" if fast_mode else "full",
+                                        explain=not fast_mode))
+        st.session_state.prediction = cached
+    prediction_result = cached[1]
+
+    profiler.mark("step 4: summary")
     success_prob = prediction_result['success_probability']
     confidence = prediction_result['confidence_interval']
+    bands = prediction_result.get('uncertainty_bands')
+    if bands:
+        uncertainty = f"Range across the forest's trees: {bands['p5']:.1f}% – {bands['p95']:.1f}%"
+        spread_line = (f'<p style="margin: 5px 0 0 0;"><small>5th to 95th percentile of the '
+                       f'Random Forest\'s trees; the four models differ by '
+                       f'±{confidence:.1f}%</small></p>')
+    elif fast_mode:
+        uncertainty = f"Typical gap to the full ensemble: ±{confidence:.1f}%"
+        spread_line = ""
+    else:
+        uncertainty = f"Model disagreement: ±{confidence:.1f}%"
+        spread_line = ""
 
     st.markdown(f"""
     <div class="success-box" style="text-align: center;">
         <h2 style="color: #28a745; margin: 0;">Success Probability</h2>
         <h1 style="color: #155724; margin: 10px 0; font-size: 4em;">{success_prob:.1f}%</h1>
-        <p style="font-size: 1.2em; margin: 0;">Confidence Interval: ±{confidence:.1f}%</p>
+        <p style="font-size: 1.2em; margin: 0;">{uncertainty}</p>{spread_line}
     </div>
     """,
                 unsafe_allow_html=True)
@@ -453,11 +559,12 @@ elif st.session_state.step == 4:
 
     st.subheader("📊 Model Analysis")
 
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "Model Predictions", "Success Factors", "Regional Insights",
-        "Recommendations"
+        "Recommendations", "What-If Analysis"
     ])
 
+    profiler.mark("step 4: model chart")
     with tab1:
         st.markdown("#### Individual Model Predictions")
 
@@ -502,6 +609,7 @@ elif st.session_state.step == 4:
 
         st.dataframe(model_df, use_container_width=True, hide_index=True)
 
+    profiler.mark("step 4: success factors")
     with tab2:
         st.markdown("#### Key Success Factors")
 
@@ -531,24 +639,64 @@ elif st.session_state.step == 4:
             details['normalized_value'] * 100
         } for name, details in top_features])
 
-        fig = go.Figure()
+        explanation = prediction_result.get('explanation')
 
-        fig.add_trace(
-            go.Bar(y=feature_df['Factor'],
-                   x=feature_df['Importance'],
-                   name='Factor Importance',
-                   orientation='h',
-                   marker_color='#2E86AB',
-                   text=feature_df['Importance'].round(1),
-                   textposition='outside'))
+        fig = go.Figure()
 
-        fig.update_layout(title='What Drives Your Success Prediction',
-                          xaxis_title='Importance Score',
-                          yaxis_title='Success Factor',
-                          height=400,
-                          showlegend=False)
+        if explanation:
+            contribution_df = pd.DataFrame([{
+                'Factor': feature_names_map.get(name, name),
+                'Impact': points
+            } for name, points in explanation['contributions'].items()])
+            contribution_df = contribution_df.reindex(
+                contribution_df['Impact'].abs().sort_values(
+                    ascending=False).index).head(8).iloc[::-1]
 
-        st.plotly_chart(fig, use_container_width=True)
+            fig.add_trace(
+                go.Bar(y=contribution_df['Factor'],
+                       x=contribution_df['Impact'],
+                       name='Impact on Prediction',
+                       orientation='h',
+                       marker_color=[
+                           '#28a745' if v >= 0 else '#dc3545'
+                           for v in contribution_df['Impact']
+                       ],
+                       text=contribution_df['Impact'].map('{:+.1f}'.format),
+                       textposition='outside'))
+
+            fig.update_layout(
+                title='What Drives Your Success Prediction',
+                xaxis_title='Impact on Success Probability (percentage points)',
+                yaxis_title='Success Factor',
+                height=400,
+                showlegend=False)
+
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.caption(
+                f"Each bar shows how much that factor moves the ensemble's success "
+                f"probability away from its baseline ({explanation['base_value']:.1f}%); "
+                f"together they add up to the probability shown above. The factors are "
+                f"traced through the {', '.join(explanation['models'])} models, weighted "
+                f"as the ensemble combines them. The SVM is not broken down by factor, "
+                f"so its part is included in the baseline.")
+        else:
+            fig.add_trace(
+                go.Bar(y=feature_df['Factor'],
+                       x=feature_df['Importance'],
+                       name='Factor Importance',
+                       orientation='h',
+                       marker_color='#2E86AB',
+                       text=feature_df['Importance'].round(1),
+                       textposition='outside'))
+
+            fig.update_layout(title='What Drives Your Success Prediction',
+                              xaxis_title='Importance Score',
+                              yaxis_title='Success Factor',
+                              height=400,
+                              showlegend=False)
+
+            st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("#### Your Startup's Factor Scores")
 
@@ -567,6 +715,7 @@ elif st.session_state.step == 4:
             st.markdown(
                 f"{emoji} **{row['Factor']}**: :{color}[{score:.1f}/100]")
 
+    profiler.mark("step 4: regional chart")
     with tab3:
         st.markdown("#### Regional & Market Analysis")
 
@@ -629,6 +778,7 @@ elif st.session_state.step == 4:
 
         st.plotly_chart(fig, use_container_width=True)
 
+    profiler.mark("step 4: recommendations")
     with tab4:
         st.markdown("#### 💡 Strategic Recommendations")
 
@@ -716,6 +866,120 @@ elif st.session_state.step == 4:
             - Stay adaptable and ready to pivot
             """)
 
+    profiler.mark("step 4: what-if")
+    with tab5:
+        st.markdown("#### 🔮 What-If Analysis")
+        st.caption(
+            "See how your success probability responds to a single input while "
+            "everything else stays as you entered it.")
+
+        startup_data = st.session_state.startup_data
+        currency_code = startup_data.get('currency', {}).get('code', '')
+        what_if_labels = {
+            'funding_amount': f'Funding Amount ({currency_code})',
+            'team_size': 'Team Size',
+            'founding_year': 'Founding Year'
+        }
+
+        # Like the prediction, the curves are computed once per prediction key, so
+        # slider drags below only look up the response surface
+        cached_curves = st.session_state.get('sensitivity')
+        if cached_curves is None or cached_curves[0] != prediction_key:
+            cached_curves = (prediction_key,
+                             shared_predictor.get().sensitivity(startup_data))
+            st.session_state.sensitivity = cached_curves
+        curves = cached_curves[1]
+        factor = st.radio("Vary",
+                          list(what_if_labels),
+                          format_func=what_if_labels.get,
+                          horizontal=True)
+        curve = curves[factor]
+
+        fig = go.Figure()
+
+        fig.add_trace(
+            go.Scatter(x=np.concatenate(
+                [curve['values'], curve['values'][::-1]]),
+                       y=np.concatenate([
+                           curve['success_probability'] +
+                           curve['confidence_interval'],
+                           (curve['success_probability'] -
+                            curve['confidence_interval'])[::-1]
+                       ]),
+                       fill='toself',
+                       fillcolor='rgba(46, 134, 171, 0.15)',
+                       line=dict(width=0),
+                       hoverinfo='skip',
+                       name='Model Agreement'))
+
+        fig.add_trace(
+            go.Scatter(x=curve['values'],
+                       y=curve['success_probability'],
+                       mode='lines',
+                       line=dict(width=3, color='#2E86AB'),
+                       name='Success Probability'))
+
+        if startup_data.get(factor) is not None:
+            fig.add_vline(x=startup_data[factor],
+                          line_dash='dash',
+                          line_color='#4CAF50',
+                          annotation_text='Your startup')
+
+        fig.update_layout(title='Success Probability Response',
+                          xaxis_title=what_if_labels[factor],
+                          yaxis_title='Success Probability (%)',
+                          hovermode='x unified',
+                          height=400,
+                          showlegend=False)
+
+        st.plotly_chart(fig, use_container_width=True)
+
+        best = int(np.argmax(curve['success_probability']))
+        st.info(
+            f"Highest predicted success in this range: "
+            f"**{curve['success_probability'][best]:.1f}%** at "
+            f"{what_if_labels[factor]} = {curve['values'][best]:,.0f}")
+
+        st.markdown("##### 🎚️ Try Different Values")
+
+        estimate = get_response_surface(shared_predictor.version).slice_for(
+            shared_predictor.get(), startup_data)
+        current_funding = int(
+            min(startup_data.get('funding_amount', 0), FUNDING_SCALE))
+        current_team = int(min(max(startup_data.get('team_size', 5), 1), 100))
+        current_year = int(
+            min(max(startup_data.get('founding_year', 2024), 2000), 2024))
+
+        slider_col1, slider_col2, slider_col3 = st.columns(3)
+        with slider_col1:
+            what_if_funding = st.slider(f"Funding ({currency_code})",
+                                        0,
+                                        FUNDING_SCALE,
+                                        value=current_funding,
+                                        step=100000,
+                                        key='what_if_funding')
+        with slider_col2:
+            what_if_team = st.slider("Team Size",
+                                     1,
+                                     100,
+                                     value=current_team,
+                                     key='what_if_team')
+        with slider_col3:
+            what_if_year = st.slider("Founding Year",
+                                     2000,
+                                     2024,
+                                     value=current_year,
+                                     key='what_if_year')
+
+        what_if_prob = estimate(what_if_funding, what_if_team, what_if_year)
+        baseline_prob = estimate(current_funding, current_team, current_year)
+        st.metric("Estimated Success Probability",
+                  f"{what_if_prob:.1f}%",
+                  delta=f"{what_if_prob - baseline_prob:+.1f} pts vs. your inputs")
+        st.caption(
+            "Estimated from a precomputed response surface so it updates as you "
+            "drag; use Modify Inputs for an exact prediction.")
+
     st.markdown("---")
 
     col1, col2, col3 = st.columns(3)
@@ -731,7 +995,7 @@ elif st.session_state.step == 4:
                      type="secondary",
                      use_container_width=True):
             st.session_state.step = 1
-            st.rerun()
+            rerun()
 
     with col3:
         if st.button("🆕 New Prediction",
@@ -789,6 +1053,8 @@ This AI-powered platform predicts startup success probability using:
 *Predictions are based on statistical models and should be used as guidance, not guarantees.*
 """)
 
+profiler.mark("sidebar")
+
 if st.session_state.step < 4:
     st.sidebar.info(f"**Current Step:** {st.session_state.step}/4")
 
@@ -804,3 +1070,60 @@ if st.session_state.step < 4:
             st.sidebar.text(
                 f"Location: {st.session_state.startup_data.get('city', 'N/A')}, {st.session_state.startup_data['country']}"
             )
+
+if debug_mode:
+    with st.sidebar.expander("🛠️ Performance Debug", expanded=False):
+        snapshot = instrumentation.snapshot()
+        if snapshot['stages']:
+            st.dataframe(pd.DataFrame([{
+                'Stage': name,
+                'Calls': stats['count'],
+                'Mean (ms)': round(stats['mean_ms'], 3),
+                'p99 (ms)': round(stats['p99_ms'], 3),
+                'Max (ms)': round(stats['max_ms'], 3)
+            } for name, stats in sorted(snapshot['stages'].items())]),
+                         hide_index=True)
+        else:
+            st.caption("No predictions recorded yet.")
+        st.caption(f"Artifact version: {shared_predictor.version}")
+        st.code(instrumentation.to_prometheus(), language="text")
+        if st.button("Reset metrics"):
+            instrumentation.reset()
+
+profiler.finish()
+if profile_mode:
+    with st.sidebar.expander("⏱️ Rerun Profile", expanded=False):
+        if profiler.reruns:
+            last = profiler.reruns[-1]
+            st.caption(f"Last rerun ({last['label']}): {last['total'] * 1000:.1f} ms, "
+                       f"{len(profiler.reruns)} reruns in window")
+            st.markdown("**Most expensive sections**")
+            st.dataframe(pd.DataFrame([{
+                'Section': row['section'],
+                'Reruns': row['reruns'],
+                'Mean (ms)': round(row['mean_ms'], 2),
+                'p95 (ms)': round(row['p95_ms'], 2),
+                'Max (ms)': round(row['max_ms'], 2),
+                'Share (%)': round(row['share'] * 100, 1)
+            } for row in profiler.section_report()]),
+                         hide_index=True)
+            functions = profiler.function_report()
+            if functions:
+                st.markdown("**Top functions (cumulative)**")
+                st.dataframe(pd.DataFrame([{
+                    'Function': row['function'],
+                    'Calls': row['calls'],
+                    'Cumulative (ms)': round(row['cumtime_ms'], 2),
+                    'Own (ms)': round(row['tottime_ms'], 2)
+                } for row in functions]),
+                             hide_index=True)
+            st.markdown("**Recent reruns**")
+            st.dataframe(pd.DataFrame([{
+                'Rerun': row['label'],
+                'Total (ms)': round(row['total_ms'], 1),
+                'Slowest section': row['slowest'],
+                'Interrupted': row['interrupted']
+            } for row in profiler.rerun_report()]),
+                         hide_index=True)
+        if st.button("Reset profile"):
+            profiler.reset()
@@ -0,0 +1,363 @@
+"""Append-only audit log of predictions in a local SQLite database.
+
+Attach an ``AuditLog`` to ``StartupSuccessPredictor.audit_log`` and every
+``predict``/``predict_batch`` call is logged, one row per startup:
+
+    logged_at            seconds since the epoch (UTC)
+    artifact_version     artifact checksum, plus the model version
+    mode                 prediction mode (full, fast or cascade)
+    batch_rows           startups scored in the same call
+    latency_ms           time the predictor spent on that call
+    success_probability  ensemble probability (%) and its confidence interval
+    model_predictions    JSON object of per-model probabilities (%)
+    inputs               JSON of the raw startup
+    features             prepared feature vector as packed little-endian float64;
+                         the feature names are stored once per distinct list
+
+The request thread only puts a reference on a bounded queue. A background
+thread serializes queued predictions and writes them in one transaction
+per batch to a database in write-ahead-log mode, so readers never block
+it. Triggers reject updates and deletes. When the queue is full,
+predictions are counted as dropped instead of slowing requests down. A
+prediction whose values cannot be stored is counted as rejected on its
+own, so the rest of its batch is still written.
+
+    audit = AuditLog('artifacts/predictions.db')
+    predictor.audit_log = audit
+    ...
+    recent_predictions('artifacts/predictions.db', limit=20)
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIT_PATH = os.environ.get('STARTUP_AUDIT_LOG', 'artifacts/predictions.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feature_sets (
+    id INTEGER PRIMARY KEY,
+    names TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    logged_at REAL NOT NULL,
+    artifact_version TEXT,
+    model_version INTEGER,
+    mode TEXT NOT NULL,
+    batch_rows INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    success_probability REAL NOT NULL,
+    confidence_interval REAL,
+    model_predictions TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    feature_set INTEGER NOT NULL REFERENCES feature_sets (id),
+    features BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS predictions_logged_at ON predictions (logged_at);
+CREATE INDEX IF NOT EXISTS predictions_artifact ON predictions (artifact_version, id);
+CREATE TRIGGER IF NOT EXISTS predictions_no_update BEFORE UPDATE ON predictions
+BEGIN SELECT RAISE(ABORT, 'the prediction log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS predictions_no_delete BEFORE DELETE ON predictions
+BEGIN SELECT RAISE(ABORT, 'the prediction log is append-only'); END;
+"""
+
+INSERT = """
+INSERT INTO predictions (logged_at, artifact_version, model_version, mode, batch_rows,
+                         latency_ms, success_probability, confidence_interval,
+                         model_predictions, inputs, feature_set, features)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+FEATURE_DTYPE = np.dtype('<f8')
+
+# Startup fields that are not JSON types (numpy integers, dates) are written as strings
+_encode_inputs = json.JSONEncoder(default=str).encode
+
+
+def _values(entry):
+    """A result entry as a list: arrays from predict_batch, scalars from predict"""
+    values = entry.tolist() if hasattr(entry, 'tolist') else entry
+    return values if isinstance(values, list) else [values]
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class AuditLog:
+    """Buffered, append-only prediction log written by a background thread
+
+    The writer wakes every ``max_wait`` seconds (or on ``flush``) and writes
+    what is pending in transactions of up to ``max_batch_rows`` startups.
+    At most ``max_pending`` startups wait to be written; a call that would
+    go over it is dropped whole.
+    """
+
+    def __init__(self, path=DEFAULT_AUDIT_PATH, max_batch_rows=256, max_wait=0.5,
+                 max_pending=10000):
+        self.path = path
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.written = 0
+        # Predictions not written: queue full, invalid values, failed transactions
+        self.dropped = 0
+        self.rejected = 0
+        self.failed = 0
+        # Startups queued and not yet written or lost
+        self._pending_rows = 0
+        # Guards the counters, which request threads and the writer both update
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = _connect(path)
+        with connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+        # Ids of the feature name lists already stored (writer thread only)
+        self._feature_sets = {}
+        # deque appends are atomic and, unlike a queue.Queue, wake no waiting thread
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, predictor, startups, feature_array, result, mode, seconds):
+        """Queue one predict/predict_batch call of ``predictor`` for writing
+
+        ``result`` and ``feature_array`` are kept by reference until written
+        and must not be modified.
+        """
+        item = (time.time(), predictor.metadata.get('checksum'),
+                predictor.metadata.get('model_version'), tuple(predictor.feature_names),
+                startups, feature_array, result, mode, seconds)
+        with self._lock:
+            if self._pending_rows + len(startups) > self.max_pending:
+                self.dropped += len(startups)
+                return
+            self._pending_rows += len(startups)
+            self._pending.append(item)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is written, or ``timeout`` seconds
+
+        Returns False if the wait timed out or the writer thread has stopped.
+        """
+        if self._closed:
+            return True
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._pending.append(done)
+        self._wake.set()
+        return done.wait(timeout)
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.append(None)
+        self._wake.set()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def stats(self):
+        with self._lock:
+            return {'path': self.path, 'written': self.written, 'dropped': self.dropped,
+                    'rejected': self.rejected, 'failed': self.failed,
+                    'pending': self._pending_rows}
+
+    def recent(self, flush_timeout=5.0, **kwargs):
+        """``recent_predictions`` of this log, including everything queued so far
+
+        Waits at most ``flush_timeout`` seconds for the writer; after that (or
+        if the writer has stopped) only what is already written is returned.
+        """
+        if not self.flush(flush_timeout):
+            logger.warning('Audit log writer for %s is behind or stopped; reading what '
+                           'is written', self.path)
+        return recent_predictions(self.path, **kwargs)
+
+    def _run(self):
+        connection = _connect(self.path)
+        try:
+            while True:
+                self._wake.wait(self.max_wait)
+                # Cleared before draining, so a flush after this point wakes the next round
+                self._wake.clear()
+                batch, rows = [], 0
+                while self._pending:
+                    item = self._pending.popleft()
+                    if item is None or isinstance(item, threading.Event):
+                        self._write(connection, batch, rows)
+                        batch, rows = [], 0
+                        if item is None:
+                            return
+                        item.set()
+                        continue
+                    batch.append(item)
+                    rows += len(item[4])
+                    if rows >= self.max_batch_rows:
+                        self._write(connection, batch, rows)
+                        batch, rows = [], 0
+                self._write(connection, batch, rows)
+        finally:
+            connection.close()
+
+    def _feature_set(self, connection, names):
+        feature_set = self._feature_sets.get(names)
+        if feature_set is None:
+            encoded = json.dumps(names)
+            connection.execute('INSERT OR IGNORE INTO feature_sets (names) VALUES (?)',
+                               (encoded,))
+            feature_set = connection.execute('SELECT id FROM feature_sets WHERE names = ?',
+                                             (encoded,)).fetchone()[0]
+            self._feature_sets[names] = feature_set
+        return feature_set
+
+    def _write(self, connection, batch, rows):
+        """Write a batch in one transaction
+
+        A prediction that cannot be stored (a NaN probability, say) is counted
+        as rejected without losing the rest of the batch; rows lost to a
+        failed transaction (a full disk, say) are counted as failed.
+        """
+        if not batch:
+            return
+        encoded, rejected = [], 0
+        try:
+            with connection:
+                for item in batch:
+                    try:
+                        encoded += self._encode(connection, item)
+                    except (KeyError, TypeError, ValueError, IndexError):
+                        rejected += len(item[4])
+                        logger.exception('Cannot log %d predictions to %s', len(item[4]),
+                                         self.path)
+                written = self._insert(connection, encoded)
+        except Exception:
+            # Ids inserted by the rolled back transaction are gone
+            self._feature_sets.clear()
+            with self._lock:
+                self._pending_rows -= rows
+                self.rejected += rejected
+                self.failed += rows - rejected
+            logger.exception('Failed to write %d predictions to %s', rows - rejected, self.path)
+            return
+        with self._lock:
+            self._pending_rows -= rows
+            self.written += written
+            self.rejected += rejected + len(encoded) - written
+
+    def _encode(self, connection, item):
+        (logged_at, version, model_version, names, startups, feature_array, result, mode,
+         seconds) = item
+        feature_set = self._feature_set(connection, names)
+        features = np.asarray(feature_array, dtype=FEATURE_DTYPE)
+        probability = _values(result['success_probability'])
+        spread = _values(result['confidence_interval'])
+        # Cascade mode leaves the models a row did not reach as NaN
+        models = {name: _values(probs) for name, probs in result['model_predictions'].items()}
+        return [(logged_at, version, model_version, mode, len(startups), seconds * 1000,
+                 probability[i], spread[i],
+                 json.dumps({name: probs[i] for name, probs in models.items()
+                             if not math.isnan(probs[i])}),
+                 _encode_inputs(startup), feature_set, features[i].tobytes())
+                for i, startup in enumerate(startups)]
+
+    def _insert(self, connection, rows):
+        """Insert rows, one by one after a constraint failure so only the bad rows
+        are lost; returns how many were inserted"""
+        connection.execute('SAVEPOINT audit_batch')
+        try:
+            connection.executemany(INSERT, rows)
+            return len(rows)
+        except sqlite3.IntegrityError:
+            connection.execute('ROLLBACK TO audit_batch')
+        inserted = 0
+        for row in rows:
+            try:
+                connection.execute(INSERT, row)
+                inserted += 1
+            except sqlite3.IntegrityError as exc:
+                logger.warning('Rejected a prediction for %s: %s', self.path, exc)
+        return inserted
+
+
+def recent_predictions(path=DEFAULT_AUDIT_PATH, limit=100, since=None, artifact_version=None,
+                       mode=None):
+    """The newest logged predictions, newest first
+
+    ``since`` (seconds since the epoch), ``artifact_version`` and ``mode``
+    narrow the rows down; each has an index or walks the primary key
+    backwards, so the cost follows ``limit`` rather than the log's size.
+    Inputs and per-model probabilities come back as dicts and the feature
+    vector as a dict keyed by feature name. The database is opened read-only;
+    a missing one raises FileNotFoundError instead of being created.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'No audit log at {path}')
+    clauses, params = [], []
+    if since is not None:
+        clauses.append('p.logged_at >= ?')
+        params.append(since)
+    if artifact_version is not None:
+        clauses.append('p.artifact_version = ?')
+        params.append(artifact_version)
+    if mode is not None:
+        clauses.append('p.mode = ?')
+        params.append(mode)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    query = f"""
+        SELECT p.id, p.logged_at, p.artifact_version, p.model_version, p.mode, p.batch_rows,
+               p.latency_ms, p.success_probability, p.confidence_interval,
+               p.model_predictions, p.inputs, f.names, p.features
+        FROM predictions p JOIN feature_sets f ON f.id = p.feature_set
+        {where} ORDER BY p.id DESC LIMIT ?
+    """
+    connection = sqlite3.connect(f'{pathlib.Path(path).absolute().as_uri()}?mode=ro',
+                                 uri=True, timeout=30)
+    try:
+        rows = connection.execute(query, params + [limit]).fetchall()
+    finally:
+        connection.close()
+    names_cache = {}
+    history = []
+    for (row_id, logged_at, version, model_version, mode, batch_rows, latency_ms, probability,
+         spread, models, inputs, names, features) in rows:
+        if names not in names_cache:
+            names_cache[names] = json.loads(names)
+        history.append({
+            'id': row_id,
+            'logged_at': logged_at,
+            'artifact_version': version,
+            'model_version': model_version,
+            'mode': mode,
+            'batch_rows': batch_rows,
+            'latency_ms': latency_ms,
+            'success_probability': probability,
+            'confidence_interval': spread,
+            'model_predictions': json.loads(models),
+            'inputs': json.loads(inputs),
+            'features': dict(zip(names_cache[names],
+                                 np.frombuffer(features, dtype=FEATURE_DTYPE).tolist()))
+        })
+    return history
@@ -0,0 +1,107 @@
+"""Cold-start benchmark for the inference path.
+
+Each scenario runs in a fresh interpreter so module caches do not hide
+import costs. The run fails if a scenario exceeds its budget or pulls in a
+module that should stay lazy (scikit-learn, pandas, plotly, and the
+explanation and drift-monitoring code a plain prediction does not use).
+
+    python benchmarks/import_time.py --runs 5 --output import_time.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_MODULES = ['sklearn', 'pandas', 'plotly', 'explanations', 'monitoring']
+
+SCENARIOS = {
+    'import_ml_model': {
+        'budget_ms': 250,
+        'code': 'import ml_model'
+    },
+    'load_artifact_and_predict': {
+        'budget_ms': 400,
+        'code': ('from ml_model import StartupSuccessPredictor\n'
+                 'p = StartupSuccessPredictor.from_artifact(ARTIFACT)\n'
+                 "p.predict({'country': 'India', 'industry': 'Fintech'})")
+    }
+}
+
+PROBE = '''
+import sys, time, json
+ARTIFACT = {artifact!r}
+start = time.perf_counter()
+{code}
+elapsed = (time.perf_counter() - start) * 1000
+lazy = sorted({{m.split('.')[0] for m in sys.modules}} & set({lazy!r}))
+print(json.dumps({{'ms': elapsed, 'loaded': lazy}}))
+'''
+
+
+def run_probe(code, artifact):
+    script = PROBE.format(code=code, artifact=artifact, lazy=LAZY_MODULES)
+    out = subprocess.run([sys.executable, '-c', script],
+                         cwd=REPO_ROOT,
+                         capture_output=True,
+                         text=True,
+                         check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def ensure_artifact(path):
+    sys.path.insert(0, REPO_ROOT)
+    from ml_model import StartupSuccessPredictor
+
+    if not os.path.exists(path):
+        predictor = StartupSuccessPredictor()
+        predictor.train_models()
+        predictor.save_artifact(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--artifact', default=None,
+                        help='artifact to load (a temporary one is trained if omitted)')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='multiply every budget, e.g. for slow CI machines')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    artifact = args.artifact or os.path.join(tempfile.mkdtemp(), 'predictor.npz')
+    ensure_artifact(artifact)
+
+    results = {}
+    failed = False
+    for name, scenario in SCENARIOS.items():
+        samples = [run_probe(scenario['code'], artifact) for _ in range(args.runs)]
+        timings = [s['ms'] for s in samples]
+        budget = scenario['budget_ms'] * args.budget_scale
+        loaded = sorted({m for s in samples for m in s['loaded']})
+        ok = statistics.median(timings) <= budget and not loaded
+        failed = failed or not ok
+        results[name] = {
+            'median_ms': statistics.median(timings),
+            'min_ms': min(timings),
+            'max_ms': max(timings),
+            'budget_ms': budget,
+            'lazy_modules_loaded': loaded,
+            'ok': ok
+        }
+        print(f"{name:<28} median {results[name]['median_ms']:8.1f} ms "
+              f"(budget {budget:.0f} ms) {'OK' if ok else 'OVER BUDGET'}"
+              + (f" - loaded {', '.join(loaded)}" if loaded else ''))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Micro-benchmarks for the prediction path.
+
+Covers prepare_features, every model's predict_proba, predict, and batch
+scoring from 1 row up to 1M rows. Reports latency percentiles, rows/sec
+and peak RSS, and saves JSON that can be compared between commits:
+
+    python benchmarks/inference.py --output before.json
+    python benchmarks/inference.py --output after.json --compare before.json
+
+``--dtype float32`` benchmarks the compact float32 predictor (see
+``StartupSuccessPredictor.astype``). ``--store`` scores batches of feature
+rows mapped from a feature store (see ``main.py ingest``) instead of
+preparing synthetic startups. ``--mode`` benchmarks fast or cascade scoring.
+Compare it against a full-mode baseline to see the gain.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from industry_metrics import get_all_industries, get_business_models  # noqa: E402
+from ml_model import PREDICTION_MODES, load_or_train_predictor  # noqa: E402
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000, 100000, 1000000]
+COUNTRIES = ['India', 'United States', 'United Kingdom', 'Germany', 'Singapore',
+             'Brazil', 'Kenya', 'Japan']
+CITIES = ['Bangalore', 'New York City', 'London', 'Berlin', 'Singapore', 'Nairobi']
+
+
+def make_startups(n, seed=0):
+    """Deterministic synthetic startups covering the app's input fields"""
+    rng = np.random.RandomState(seed)
+    industries = get_all_industries()
+    business_models = list(get_business_models())
+    return [{
+        'industry': industries[rng.randint(len(industries))],
+        'business_model': business_models[rng.randint(len(business_models))],
+        'team_size': int(rng.randint(1, 60)),
+        'founding_year': int(rng.randint(2005, 2025)),
+        'country': COUNTRIES[rng.randint(len(COUNTRIES))],
+        'city': CITIES[rng.randint(len(CITIES))],
+        'funding_amount': float(rng.exponential(2e6)),
+        'industry_metrics': {'has_mvp': 'Launched', 'nearby_restaurants': int(rng.randint(0, 20))}
+    } for _ in range(n)]
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def measure(fn, rows, min_time, min_repeats, max_repeats):
+    """Time ``fn`` repeatedly; returns latency percentiles and throughput"""
+    fn()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeats and (
+            len(timings) < min_repeats or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    timings = np.array(timings)
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {
+        'rows': rows,
+        'repeats': len(timings),
+        'p50_ms': p50 * 1000,
+        'p90_ms': p90 * 1000,
+        'p99_ms': p99 * 1000,
+        'mean_ms': timings.mean() * 1000,
+        'rows_per_sec': rows / p50 if p50 > 0 else float('inf'),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(predictor, sizes, max_prep_rows, min_time, min_repeats, max_repeats,
+              store=None, mode='full'):
+    results = {}
+
+    def bench(name, fn, rows, heavy=False):
+        results[name] = measure(fn, rows, min_time,
+                                1 if heavy else min_repeats,
+                                3 if heavy else max_repeats)
+        r = results[name]
+        print(f"{name:<40} p50 {r['p50_ms']:10.3f} ms  p99 {r['p99_ms']:10.3f} ms  "
+              f"{r['rows_per_sec']:14,.0f} rows/s  rss {r['peak_rss_mb']:8.1f} MB")
+
+    startup = make_startups(1, seed=1)[0]
+    bench('prepare_features', lambda: predictor.prepare_features(startup), 1)
+    bench('predict', lambda: predictor.predict(startup, mode=mode), 1)
+
+    largest = max(sizes)
+    startups = make_startups(min(largest, max_prep_rows))
+    if store is not None and len(store) >= largest:
+        features = store.features[:largest]
+    else:
+        base = (store.features if store is not None
+                else predictor.prepare_feature_matrix(startups))
+        reps = -(-largest // len(base))
+        features = np.tile(base, (reps, 1))[:largest]
+    features = np.asarray(features, dtype=predictor.dtype)
+    # Standardized in float64, as the predictor does, then cast for the models
+    scaled = predictor.scaler.transform(np.asarray(features, dtype=np.float64)).astype(
+        predictor.dtype)
+
+    for n in sizes:
+        heavy = n >= 100000
+        for name, model in predictor.models.items():
+            block = scaled[:n]
+            bench(f'predict_proba[{name}][{n}]', lambda: model.predict_proba(block), n, heavy)
+        block = features[:n]
+        bench(f'predict_features[{n}]', lambda: predictor.predict_features(block, mode=mode), n,
+              heavy)
+        if n <= max_prep_rows:
+            batch = startups[:n]
+            bench(f'predict_batch[{n}]', lambda: predictor.predict_batch(batch, mode=mode), n,
+                  heavy)
+    return results
+
+
+def compare(current, baseline, max_regression):
+    """Print p50 ratios against a baseline run; returns names that regressed"""
+    regressed = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        ratio = result['p50_ms'] / baseline[name]['p50_ms']
+        flag = ' REGRESSION' if ratio > max_regression else ''
+        print(f"{name:<40} {baseline[name]['p50_ms']:10.3f}ms {result['p50_ms']:10.3f}ms "
+              f"{ratio:8.2f}{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifact', help='artifact to benchmark (a temporary one is trained if omitted)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--max-prep-rows', type=int, default=100000,
+                        help='largest batch that also benchmarks dict-to-feature preparation')
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='seconds to keep repeating each benchmark')
+    parser.add_argument('--min-repeats', type=int, default=5)
+    parser.add_argument('--max-repeats', type=int, default=1000)
+    parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64',
+                        help='precision the predictor scores in')
+    parser.add_argument('--mode', choices=PREDICTION_MODES, default='full',
+                        help='prediction mode of predict, predict_features and predict_batch')
+    parser.add_argument('--store', help='feature store whose rows feed the batch benchmarks')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON to compare p50 latencies against')
+    parser.add_argument('--max-regression', type=float, default=1.25,
+                        help='p50 ratio above which --compare fails')
+    args = parser.parse_args(argv)
+
+    artifact = args.artifact or os.path.join(tempfile.mkdtemp(), 'predictor.npz')
+    predictor = load_or_train_predictor(artifact)
+    if args.dtype != predictor.dtype.name:
+        predictor = predictor.astype(args.dtype)
+
+    store = None
+    if args.store:
+        from feature_store import FeatureStore
+
+        store = FeatureStore(args.store)
+    results = run_suite(predictor, sorted(args.sizes), args.max_prep_rows, args.min_time,
+                        args.min_repeats, args.max_repeats, store, args.mode)
+    report = {
+        'commit': git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'artifact_version': predictor.metadata.get('checksum'),
+        'dtype': predictor.dtype.name,
+        'mode': args.mode,
+        'results': results
+    }
+    if args.mode == 'cascade':
+        report['cascade'] = predictor.cascade_stats()
+        print('cascade exits:', json.dumps(report['cascade']))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline['results'], args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Training cost benchmark and scaling curves.
+
+Sweeps ``n_samples`` of the synthetic training data over orders of magnitude
+together with per-model options (forest size, SVM kernel, ...). Every trial
+runs in a fresh process so its peak memory is measured in isolation, and
+records fit time, 5-fold CV time, peak RSS and CV accuracy:
+
+    python benchmarks/training.py --samples 100 1000 10000 --rf-estimators 50 100 \\
+        --svm-kernels rbf linear --output training.json --plot training.html
+
+With ``--store`` the trials train on the first ``n_samples`` rows of a
+feature store (see ``main.py ingest``), mapped from disk without
+re-preparing features.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def _peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def run_trial(n_samples, model_name, params, cv_folds, store_path=None):
+    """Fit and cross-validate one model configuration; runs in its own process"""
+    from sklearn.model_selection import cross_val_score
+    from sklearn.preprocessing import StandardScaler
+
+    from ml_model import StartupSuccessPredictor
+
+    predictor = StartupSuccessPredictor(model_params={model_name: params})
+    if store_path:
+        from feature_store import FeatureStore
+
+        store = FeatureStore(store_path)
+        X = StandardScaler().fit_transform(store.features[:n_samples])
+        y = np.asarray(store.labels[:n_samples])
+    else:
+        df = predictor.generate_synthetic_training_data(n_samples)
+        X = StandardScaler().fit_transform(df.drop('success', axis=1))
+        y = df['success']
+    baseline_rss = _peak_rss_mb()
+    model = predictor._build_estimators()[model_name]
+
+    started = time.perf_counter()
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = cross_val_score(model, X, y, cv=cv_folds, scoring='accuracy')
+    cv_seconds = time.perf_counter() - started
+
+    return {
+        'n_samples': len(y),
+        'model': model_name,
+        'params': params,
+        'fit_seconds': fit_seconds,
+        'cv_seconds': cv_seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+        'rss_growth_mb': _peak_rss_mb() - baseline_rss,
+        'cv_accuracy': float(scores.mean()),
+        'cv_accuracy_std': float(scores.std())
+    }
+
+
+def build_trials(args):
+    configs = [('Logistic Regression', {}), ('Decision Tree', {})]
+    configs += [('Random Forest', {'n_estimators': n}) for n in args.rf_estimators]
+    configs += [('SVM', {'kernel': k}) for k in args.svm_kernels]
+    if args.models:
+        configs = [c for c in configs if c[0] in args.models]
+    return [(n, name, params) for n in args.samples for name, params in configs]
+
+
+def label(result):
+    options = ', '.join(f'{k}={v}' for k, v in result['params'].items())
+    return f"{result['model']} ({options})" if options else result['model']
+
+
+def print_table(results):
+    header = (f"{'model':<36} {'n_samples':>10} {'fit s':>9} {'cv s':>9} "
+              f"{'peak MB':>9} {'accuracy':>9}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{label(r):<36} {r['n_samples']:>10,} {r['fit_seconds']:>9.3f} "
+              f"{r['cv_seconds']:>9.3f} {r['peak_rss_mb']:>9.1f} {r['cv_accuracy']:>9.3f}")
+
+
+def write_plot(results, path):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1, cols=3, subplot_titles=(
+        'Fit + CV time (s)', 'Peak RSS (MB)', 'CV accuracy'))
+    for name in dict.fromkeys(label(r) for r in results):
+        series = sorted((r for r in results if label(r) == name), key=lambda r: r['n_samples'])
+        x = [r['n_samples'] for r in series]
+        for col, values in enumerate([
+                [r['fit_seconds'] + r['cv_seconds'] for r in series],
+                [r['peak_rss_mb'] for r in series],
+                [r['cv_accuracy'] for r in series]], start=1):
+            fig.add_trace(go.Scatter(x=x, y=values, name=name, legendgroup=name,
+                                     showlegend=col == 1, mode='lines+markers'),
+                          row=1, col=col)
+    fig.update_xaxes(type='log', title_text='n_samples')
+    fig.update_yaxes(type='log', row=1, col=1)
+    fig.write_html(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--rf-estimators', type=int, nargs='+', default=[100])
+    parser.add_argument('--svm-kernels', nargs='+', default=['rbf'])
+    parser.add_argument('--models', nargs='+', help='only benchmark these models')
+    parser.add_argument('--cv-folds', type=int, default=5)
+    parser.add_argument('--store', help='train on this feature store instead of synthetic data')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--plot', help='write scaling curves to this HTML file (needs plotly)')
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for n_samples, model_name, params in build_trials(args):
+        # A fresh process per trial keeps peak RSS attributable to one config
+        with context.Pool(1) as pool:
+            result = pool.apply(run_trial,
+                                (n_samples, model_name, params, args.cv_folds, args.store))
+        results.append(result)
+        print(f"{label(result):<36} n={n_samples:<9,} fit {result['fit_seconds']:.3f}s "
+              f"cv {result['cv_seconds']:.3f}s", file=sys.stderr)
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.plot:
+        write_plot(results, args.plot)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""Streaming bulk scoring of CSV/Parquet files of startups.
+
+Input rows use the same fields as the app's startup data (``country``,
+``industry``, ``funding_amount``, ...). Industry-specific metrics come from
+an ``industry_metrics`` column holding a JSON object and/or from columns
+named ``metrics.<field>``. Files are read and written chunk by chunk, so
+memory use does not grow with the file size.
+"""
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from ml_model import (BAND_PERCENTILES, DEFAULT_ARTIFACT_PATH, FOREST_MODEL_NAME, MODEL_KEYS,
+                      load_or_train_predictor)
+
+STARTUP_FIELDS = ('startup_name', 'industry', 'team_size', 'founding_year',
+                  'business_model', 'country', 'state', 'city', 'locality',
+                  'funding_amount')
+METRIC_PREFIX = 'metrics.'
+
+
+def file_format(path, explicit=None):
+    if explicit:
+        return explicit
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext in ('.csv', '.txt', '.gz'):
+        return 'csv'
+    raise ValueError(f"Cannot infer file format of {path}; pass it explicitly")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError('Parquet support needs pyarrow: pip install pyarrow') from exc
+    return pyarrow
+
+
+def read_chunks(path, chunk_size, fmt=None):
+    """Yield DataFrames of at most ``chunk_size`` rows from a CSV/Parquet file"""
+    fmt = file_format(path, fmt)
+    if fmt == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        pa = _require_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def records_from_frame(frame):
+    """Convert a DataFrame chunk into startup dicts for the predictor"""
+    fields = [c for c in frame.columns if c in STARTUP_FIELDS]
+    metric_columns = [c for c in frame.columns if str(c).startswith(METRIC_PREFIX)]
+    has_metrics_json = 'industry_metrics' in frame.columns
+    records = []
+    for row in frame.to_dict('records'):
+        record = {f: row[f] for f in fields if not _is_missing(row[f])}
+        metrics = {}
+        if has_metrics_json and isinstance(row['industry_metrics'], str):
+            metrics.update(json.loads(row['industry_metrics']))
+        for column in metric_columns:
+            if not _is_missing(row[column]):
+                metrics[column[len(METRIC_PREFIX):]] = row[column]
+        if metrics:
+            record['industry_metrics'] = metrics
+        records.append(record)
+    return records
+
+
+def score_frame(predictor, frame):
+    """Score a DataFrame chunk; returns the chunk with prediction columns added
+
+    A chunk that fails as a whole is rescored one row at a time, so a bad
+    startup only costs its own row: its predictions are NaN and the
+    ``error`` column (empty for scored rows) says why.
+    """
+    try:
+        result = predictor.predict_batch(records_from_frame(frame))
+        errors = [None] * len(frame)
+    except Exception:
+        result, errors = _score_each(predictor, frame)
+    scored = frame.copy()
+    scored['success_probability'] = result['success_probability']
+    scored['confidence_interval'] = result['confidence_interval']
+    for name, probs in result['model_predictions'].items():
+        scored[f"probability_{MODEL_KEYS.get(name, name)}"] = probs
+    for key, band in (result.get('uncertainty_bands') or {}).items():
+        scored[f'forest_{key}'] = band
+    # A string dtype even when every row scored, so Parquet chunks share one schema
+    scored['error'] = pd.Series(errors, index=frame.index, dtype='string')
+    return scored
+
+
+def _score_each(predictor, frame):
+    """``predict_batch`` result of ``frame`` scored row by row, and each row's error"""
+    rows = len(frame)
+    result = {
+        'success_probability': np.full(rows, np.nan),
+        'confidence_interval': np.full(rows, np.nan),
+        'model_predictions': {name: np.full(rows, np.nan) for name in predictor.models},
+        'uncertainty_bands': ({f'p{q}': np.full(rows, np.nan) for q in BAND_PERCENTILES}
+                              if FOREST_MODEL_NAME in predictor.models else None)
+    }
+    errors = [None] * rows
+    for i in range(rows):
+        try:
+            row = predictor.predict_batch(records_from_frame(frame.iloc[i:i + 1]))
+        except Exception as exc:
+            errors[i] = f'{type(exc).__name__}: {exc}'
+            continue
+        result['success_probability'][i] = row['success_probability'][0]
+        result['confidence_interval'][i] = row['confidence_interval'][0]
+        for name, probs in row['model_predictions'].items():
+            result['model_predictions'][name][i] = probs[0]
+        for key, band in (row.get('uncertainty_bands') or {}).items():
+            result['uncertainty_bands'][key][i] = band[0]
+    return result, errors
+
+
+class CsvChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='w' if self._header else 'a',
+                     header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        if self._header:
+            open(self.path, 'w').close()
+
+
+class ParquetChunkWriter:
+    """Writes each chunk as a row group of a single Parquet file"""
+
+    def __init__(self, path):
+        self.pa = _require_pyarrow()
+        self.path = path
+        self._writer = None
+
+    def write(self, frame):
+        table = self.pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _rejected(scored):
+    return int(scored['error'].notna().sum())
+
+
+def open_writer(path, fmt=None):
+    return ParquetChunkWriter(path) if file_format(path, fmt) == 'parquet' else CsvChunkWriter(path)
+
+
+class ProgressReporter:
+    """Throughput readout on stderr, refreshed at most every ``interval`` seconds"""
+
+    def __init__(self, stream=sys.stderr, interval=0.5, enabled=True):
+        self.stream = stream
+        self.interval = interval
+        self.enabled = enabled
+        self.rows = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, rows, rejected=0):
+        self.rows += rows
+        self.rejected += rejected
+        now = time.perf_counter()
+        if self.enabled and now - self._last >= self.interval:
+            self._last = now
+            self.stream.write(f"\rScored {self.rows:,} rows{self._rejected_note} "
+                              f"({self.rate:,.0f} rows/s)")
+            self.stream.flush()
+
+    @property
+    def _rejected_note(self):
+        return f", {self.rejected:,} rejected" if self.rejected else ""
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def finish(self):
+        if self.enabled:
+            self.stream.write(f"\rScored {self.rows:,} rows{self._rejected_note} in "
+                              f"{self.elapsed:.1f}s ({self.rate:,.0f} rows/s)\n")
+            self.stream.flush()
+
+
+def score_file(input_path,
+               output_path,
+               artifact_path=DEFAULT_ARTIFACT_PATH,
+               chunk_size=50000,
+               workers=1,
+               input_format=None,
+               output_format=None,
+               progress=True):
+    """Stream ``input_path`` through the predictor into ``output_path``.
+
+    With ``workers > 1`` chunks are scored by a ParallelScoringEngine whose
+    workers share the model weights; at most two chunks per worker are in
+    flight and results are written in input order. Rows that cannot be
+    scored are written with an ``error`` (see ``score_frame``) and counted
+    as ``rejected``.
+    """
+    predictor = load_or_train_predictor(artifact_path)
+    reporter = ProgressReporter(enabled=progress)
+    writer = open_writer(output_path, output_format)
+    chunks = read_chunks(input_path, chunk_size, input_format)
+    try:
+        if workers <= 1:
+            for frame in chunks:
+                scored = score_frame(predictor, frame)
+                writer.write(scored)
+                reporter.update(len(scored), _rejected(scored))
+        else:
+            from parallel_scoring import ParallelScoringEngine
+
+            with ParallelScoringEngine(predictor, workers) as engine:
+                pending = deque()
+                for frame in chunks:
+                    pending.append(engine.submit(score_frame, frame))
+                    while len(pending) >= 2 * workers:
+                        scored = pending.popleft().get()
+                        writer.write(scored)
+                        reporter.update(len(scored), _rejected(scored))
+                while pending:
+                    scored = pending.popleft().get()
+                    writer.write(scored)
+                    reporter.update(len(scored), _rejected(scored))
+    finally:
+        writer.close()
+    reporter.finish()
+    return {
+        'rows': reporter.rows,
+        'rejected': reporter.rejected,
+        'seconds': reporter.elapsed,
+        'rows_per_second': reporter.rate,
+        'artifact_version': predictor.metadata.get('checksum')
+    }
@@ -0,0 +1,146 @@
+"""Distill the four-model ensemble into one compact student for fast mode.
+
+The student is a shallow gradient-boosted regression model fit to the
+ensemble's averaged success probability (not to the outcomes), on the
+training rows plus synthetic rows recombined from them. It reads the raw
+feature matrix, so fast-mode scoring skips the scaler, the kernel SVM and
+the 100-tree forest:
+
+    report = distill(predictor, X, y)
+    predictor.predict(startup, mode='fast')
+
+Fidelity to the ensemble is measured on unseen rows and stored in the
+artifact metadata under ``student``.
+"""
+import os
+import time
+
+import numpy as np
+
+from ml_model import (DEFAULT_ARTIFACT_PATH, StartupSuccessPredictor,
+                      training_state_path)
+from model_artifact import compile_estimator
+
+
+def augment(X, n_samples, swap_probability=0.5, random_state=42):
+    """Synthetic rows that keep each feature's distribution but mix their pairings
+
+    Every row starts as a copy of a random row of ``X``; each feature is then
+    replaced, with ``swap_probability``, by that feature of another random row.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    rng = np.random.RandomState(random_state)
+    samples = X[rng.randint(len(X), size=n_samples)]
+    swap = rng.rand(n_samples, X.shape[1]) < swap_probability
+    donors = X[rng.randint(len(X), size=n_samples)]
+    samples[swap] = donors[swap]
+    return samples
+
+
+def _per_row_seconds(fn, X, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - started)
+    return best / len(X)
+
+
+def _single_row_seconds(fn, X, rows=200):
+    started = time.perf_counter()
+    for row in X[:rows]:
+        fn(row.reshape(1, -1))
+    return (time.perf_counter() - started) / min(rows, len(X))
+
+
+def distill(predictor, X, y, n_samples=50000, n_estimators=150, max_depth=4,
+            learning_rate=0.1, holdout=0.2, n_eval_samples=5000, random_state=42):
+    """Fit ``predictor.student`` to the ensemble and report its fidelity
+
+    Fidelity compares student and ensemble on ``n_eval_samples`` fresh
+    synthetic rows: absolute probability differences in percentage points and
+    agreement of the > 50% decision. (The ensemble's trees memorize their own
+    training rows, so those would overstate the gap.) The student's accuracy
+    against ``y`` is measured on a ``holdout`` share of the real rows kept out
+    of its training set, where both are also timed per row.
+    """
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    X = np.asarray(X, dtype=np.float64)
+    rng = np.random.RandomState(random_state)
+    order = rng.permutation(len(X))
+    n_holdout = int(len(X) * holdout)
+    if not n_holdout:
+        raise ValueError('The holdout is empty; fidelity needs held-out rows')
+    test, train = order[:n_holdout], order[n_holdout:]
+
+    X_train = np.vstack([X[train], augment(X[train], n_samples, random_state=random_state)])
+    teacher = predictor.predict_features(X_train)['success_probability'] / 100
+    estimator = GradientBoostingRegressor(n_estimators=n_estimators, max_depth=max_depth,
+                                          learning_rate=learning_rate, subsample=0.8,
+                                          random_state=random_state)
+    started = time.perf_counter()
+    estimator.fit(X_train, teacher)
+    fit_seconds = time.perf_counter() - started
+    predictor.student = compile_estimator(estimator).astype(predictor.dtype)
+
+    def fast(rows):
+        return predictor.predict_features(rows, mode='fast')
+
+    X_eval = augment(X, n_eval_samples, random_state=random_state + 1)
+    expected = predictor.predict_features(X_eval)['success_probability']
+    actual = fast(X_eval)['success_probability']
+    diff = np.abs(actual - expected)
+    X_test, outcomes = X[test], np.asarray(y).astype(int)[test]
+    full_row = _single_row_seconds(predictor.predict_features, X_test)
+    fast_row = _single_row_seconds(fast, X_test)
+    full_batch = _per_row_seconds(predictor.predict_features, X_test)
+    fast_batch = _per_row_seconds(fast, X_test)
+    fidelity = {
+        'rows': int(n_eval_samples),
+        'mae': float(diff.mean()),
+        'p95_abs_diff': float(np.percentile(diff, 95)),
+        'max_abs_diff': float(diff.max()),
+        'decision_agreement': float(((actual > 50) == (expected > 50)).mean()),
+        'accuracy_rows': int(n_holdout),
+        'student_accuracy': float(((fast(X_test)['success_probability'] > 50) == outcomes).mean()),
+        'latency_us': {
+            'single_full': full_row * 1e6,
+            'single_fast': fast_row * 1e6,
+            'batch_full_per_row': full_batch * 1e6,
+            'batch_fast_per_row': fast_batch * 1e6
+        },
+        'speedup': {'single': full_row / fast_row, 'batch': full_batch / fast_batch}
+    }
+
+    predictor.metadata['student'] = {
+        'model': 'GradientBoostingRegressor',
+        'params': {'n_estimators': n_estimators, 'max_depth': max_depth,
+                   'learning_rate': learning_rate, 'subsample': 0.8},
+        'n_training_rows': int(len(X_train)),
+        'n_synthetic_rows': int(n_samples),
+        'fit_seconds': fit_seconds,
+        'fidelity': fidelity
+    }
+    return predictor.metadata['student']
+
+
+def distill_artifact(path=DEFAULT_ARTIFACT_PATH, output=None, n_training_samples=1000,
+                     **kwargs):
+    """Add a distilled student to an artifact (in place unless ``output`` is given)
+
+    Distills on the artifact's training data when its training state is
+    present, otherwise on fresh synthetic data from ``train_models``' generator.
+    """
+    predictor = StartupSuccessPredictor.from_artifact(path)
+    state_path = training_state_path(path)
+    if os.path.exists(state_path):
+        data = StartupSuccessPredictor.from_training_state(state_path).training_data
+        X, y = data['X'], data['y']
+    else:
+        df = predictor.generate_synthetic_training_data(n_training_samples)
+        X = df[predictor.feature_names].to_numpy(dtype=np.float64)
+        y = df['success'].to_numpy()
+    report = distill(predictor, X, y, **kwargs)
+    predictor.save_artifact(output or path)
+    return report
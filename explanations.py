@@ -0,0 +1,243 @@
+"""Per-row explanations of individual predictions.
+
+Tree models get exact path-dependent Shapley values (the quantity TreeSHAP
+computes): each feature's share of the difference between the row's
+prediction and the cover-weighted average prediction, where a missing
+feature is integrated out along the tree using the training sample counts.
+The logistic model gets ``coef * (x - mean)`` on the standardized inputs,
+which is its exact Shapley decomposition in log-odds.
+
+For one leaf, the expected output given a feature subset S is the leaf value
+times a product over the features on its path of either ``z_j`` (does the
+row satisfy every split on j, 0 or 1) or ``r_j`` (product of cover ratios of
+those splits). The Shapley value of such a product has the closed form
+
+    phi_i = v * (z_i - r_i) * integral_0^1 prod_{j != i} (r_j + (z_j - r_j) u) du
+
+and the integrand is a polynomial of degree < n_features, so a short
+Gauss-Legendre rule evaluates it exactly. Everything is vectorized over
+rows x leaves x path features.
+"""
+import collections
+import hashlib
+import threading
+
+import numpy as np
+
+from model_artifact import LogisticModel, TreeEnsembleModel
+
+
+class TreeExplainer:
+    """Exact path-dependent Shapley values for a ``TreeEnsembleModel``
+
+    Leaves are grouped by how many distinct features their path splits on,
+    so each group only multiplies the factors that are not identically one
+    and uses the smallest exact quadrature rule for its polynomial degree.
+    """
+
+    # Upper bound on (rows x leaves x path features) per block
+    chunk_cells = 1 << 16
+
+    def __init__(self, model, n_features):
+        if model.cover is None:
+            raise ValueError('Tree model has no node cover; re-export it to explain it')
+        self.n_features = n_features
+        value, lower, upper, ratio = self._leaf_tables(model)
+        self.expected_value = float(value @ ratio.prod(axis=1))
+        on_path = np.isfinite(lower) | np.isfinite(upper)
+        depth = on_path.sum(axis=1)
+        self.groups = []
+        for d in np.unique(depth[depth > 0]):
+            leaves = np.flatnonzero(depth == d)
+            # Column indices of the features on each leaf's path, in feature order
+            features = np.nonzero(on_path[leaves])[1].reshape(len(leaves), d)
+            rows = leaves[:, None]
+            nodes, weights = np.polynomial.legendre.leggauss(-(-d // 2))
+            u = (nodes + 1) / 2
+            # Path-feature axis first, so the products below run over contiguous slabs
+            r = ratio[rows, features].T[:, None, :, None]
+            self.groups.append({
+                'features': features,
+                'lower': lower[rows, features],
+                'upper': upper[rows, features],
+                'ratio': ratio[rows, features].T[:, None, :],
+                'value': value[leaves],
+                # Factor r_j + (z_j - r_j) u at each quadrature node, for z_j = 1 and z_j = 0
+                'reached': r + (1 - r) * u,
+                'missed': r * (1 - u),
+                'weights': weights / 2,
+                # Sums each (path feature, leaf) term into its feature column
+                'scatter': np.eye(n_features)[features.T.ravel()]
+            })
+
+    def _leaf_tables(self, model):
+        """Per leaf: value, per-feature interval (lower, upper] and cover ratio"""
+        n_nodes = len(model.left)
+        lower = np.full((n_nodes, self.n_features), -np.inf)
+        upper = np.full((n_nodes, self.n_features), np.inf)
+        ratio = np.ones((n_nodes, self.n_features))
+        frontier = np.asarray(model.roots)
+        # Children always come after their parent, so push bounds down level by level
+        while frontier.size:
+            frontier = frontier[model.left[frontier] != -1]
+            f = model.feature[frontier]
+            thr = model.threshold[frontier]
+            for children, bound in ((model.left[frontier], upper), (model.right[frontier], lower)):
+                lower[children] = lower[frontier]
+                upper[children] = upper[frontier]
+                ratio[children] = ratio[frontier]
+                if bound is upper:
+                    upper[children, f] = np.minimum(upper[children, f], thr)
+                else:
+                    lower[children, f] = np.maximum(lower[children, f], thr)
+                ratio[children, f] *= model.cover[children] / model.cover[frontier]
+            frontier = np.concatenate([model.left[frontier], model.right[frontier]])
+        leaves = np.flatnonzero(model.left == -1)
+        return model.value[leaves] / model.n_trees, lower[leaves], upper[leaves], ratio[leaves]
+
+    def _group_block(self, X, group):
+        x = X[:, group['features']]
+        z = ((x > group['lower']) & (x <= group['upper'])).transpose(2, 0, 1)
+        factors = np.where(z[..., None], group['reached'], group['missed'])
+        # Product over every other path feature, from prefix and suffix products
+        d = len(factors)
+        others = np.empty_like(factors)
+        others[0] = 1.0
+        for j in range(1, d):
+            np.multiply(others[j - 1], factors[j - 1], out=others[j])
+        suffix = factors[d - 1].copy()
+        for j in range(d - 2, -1, -1):
+            others[j] *= suffix
+            suffix *= factors[j]
+        integral = others @ group['weights']
+        weighted = (z - group['ratio']) * integral * group['value']
+        return weighted.transpose(1, 0, 2).reshape(len(X), -1) @ group['scatter']
+
+    def shap_values(self, X):
+        """Contributions in probability units, shape (rows, features)"""
+        # Split thresholds are compared against float32 inputs, as in apply()
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        phi = np.zeros((len(X), self.n_features))
+        for group in self.groups:
+            step = max(1, self.chunk_cells // group['features'].size)
+            for start in range(0, len(X), step):
+                phi[start:start + step] += self._group_block(X[start:start + step], group)
+        return phi
+
+
+class LinearExplainer:
+    """Shapley values of a logistic model on standardized inputs
+
+    The scaler centres the training data, so ``x - mean`` is the scaled row
+    itself and the expected log-odds is the intercept.
+    """
+
+    def __init__(self, model):
+        self.coef = model.coef
+        self.expected_value = float(model.intercept[0])
+
+    def shap_values(self, X):
+        """Contributions in log-odds, shape (rows, features)"""
+        return X * self.coef
+
+
+def _log_odds_to_probability(contributions, base_log_odds):
+    """Rescale log-odds contributions so they add up to the probability change"""
+    log_odds = base_log_odds + contributions.sum(axis=1)
+    base = 1.0 / (1.0 + np.exp(-base_log_odds))
+    prob = 1.0 / (1.0 + np.exp(-log_odds))
+    change = log_odds - base_log_odds
+    safe = np.where(np.abs(change) > 1e-12, change, 1.0)
+    slope = np.where(np.abs(change) > 1e-12, (prob - base) / safe, prob * (1 - prob))
+    return base, contributions * slope[:, None]
+
+
+class PredictionExplainer:
+    """Explains a predictor's ensemble row by row, with an LRU cache per input row
+
+    Contributions are in success-probability percentage points. Each
+    explained model's base value plus its contributions equals its
+    prediction. The ensemble's contributions combine the models' with the
+    aggregator's weights, then scale by the calibration's slope between the
+    base and the row, so the ensemble base value plus its contributions
+    equals the ensemble probability. The SVM has no exact attribution: it is
+    held at the row's own prediction, so its share sits in the base value.
+    """
+
+    def __init__(self, predictor, cache_size=1024):
+        self.predictor = predictor
+        self.feature_names = list(predictor.feature_names)
+        self.explainers = {}
+        for name, model in predictor.models.items():
+            if isinstance(model, TreeEnsembleModel) and model.cover is not None:
+                self.explainers[name] = TreeExplainer(model, len(self.feature_names))
+            elif isinstance(model, LogisticModel):
+                self.explainers[name] = LinearExplainer(model)
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def explain_features(self, feature_array):
+        """Base values and contributions for a prepared feature matrix"""
+        if not self.explainers:
+            return None
+        scaled = self.predictor._scale(feature_array)
+        weights, bias, calibrate = self.predictor._combination()
+        base_score = np.full(len(scaled), float(bias))
+        contributions = np.zeros(scaled.shape)
+        models = {}
+        for weight, (name, model) in zip(weights, self.predictor.models.items()):
+            explainer = self.explainers.get(name)
+            if explainer is None:
+                base_score += weight * model.predict_proba(scaled)[:, 1]
+                continue
+            phi = explainer.shap_values(scaled)
+            if isinstance(explainer, LinearExplainer):
+                base, phi = _log_odds_to_probability(phi, explainer.expected_value)
+            else:
+                base = explainer.expected_value
+            models[name] = {'base_value': base * 100, 'contributions': phi * 100}
+            base_score += weight * base
+            contributions += weight * phi
+        base, probability = calibrate(base_score), calibrate(base_score + contributions.sum(axis=1))
+        change = probability - base
+        score_change = contributions.sum(axis=1)
+        # Where the row's score barely moves, use the calibration's local slope
+        step = 1e-6
+        slope = np.where(np.abs(score_change) > 1e-12,
+                         change / np.where(np.abs(score_change) > 1e-12, score_change, 1.0),
+                         (calibrate(base_score + step) - base) / step)
+        return {
+            'features': self.feature_names,
+            'base_value': base * 100,
+            'contributions': contributions * slope[:, None] * 100,
+            'models': models
+        }
+
+    def explain_row(self, feature_row):
+        """Explanation of one prepared feature row as ``{feature: points}`` dicts"""
+        feature_row = np.ascontiguousarray(feature_row, dtype=np.float64)
+        key = hashlib.blake2b(feature_row.tobytes(), digest_size=16).digest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        batch = self.explain_features(feature_row.reshape(1, -1))
+        if batch is None:
+            return None
+        explanation = {
+            'base_value': float(batch['base_value'][0]),
+            'contributions': dict(zip(self.feature_names, batch['contributions'][0].tolist())),
+            'models': {
+                name: {
+                    'base_value': float(m['base_value']),
+                    'contributions': dict(zip(self.feature_names, m['contributions'][0].tolist()))
+                }
+                for name, m in batch['models'].items()
+            }
+        }
+        with self._lock:
+            self._cache[key] = explanation
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return explanation
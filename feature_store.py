@@ -0,0 +1,216 @@
+"""Columnar feature store of historical startup outcomes for training.
+
+``FeatureStore.ingest`` streams CSV/Parquet outcome files chunk by chunk
+through the predictor's own feature preparation (the path inference uses)
+and writes the result to a directory:
+
+    meta.json      feature names, row count, label column and sources
+    features.npy   (rows, features) float64, column-major
+    labels.npy     outcomes (1 = success) as int8
+    ids.npy        startup id of every row
+
+The arrays are opened with ``mmap_mode='r'``, so retraining and benchmarks
+read prepared features straight from the page cache instead of rebuilding
+them from raw records:
+
+    store = FeatureStore.ingest(['outcomes-2023.csv', 'outcomes-2024.parquet'],
+                                'artifacts/feature_store')
+    predictor = train_predictor(store)
+"""
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from bulk_scoring import file_format, read_chunks, records_from_frame
+from ml_model import (DEFAULT_AGGREGATION, DEFAULT_ARTIFACT_PATH, StartupSuccessPredictor,
+                      training_state_path)
+
+FORMAT_VERSION = 1
+
+DEFAULT_STORE_PATH = os.environ.get('STARTUP_FEATURE_STORE', 'artifacts/feature_store')
+
+
+def _feature_preparer(predictor):
+    """A predictor whose ``prepare_feature_matrix`` yields the training columns"""
+    if predictor is not None and predictor.feature_names:
+        return predictor
+    predictor = StartupSuccessPredictor()
+    # prepare_features returns its columns in the order the models are trained on
+    predictor.feature_names = list(predictor.prepare_features({}))
+    return predictor
+
+
+def _labels(frame, label_column, source):
+    if label_column not in frame.columns:
+        raise ValueError(f"{source} has no '{label_column}' outcome column")
+    labels = frame[label_column]
+    present = labels.notna().to_numpy()
+    values = labels[present].astype(int).to_numpy()
+    if not np.isin(values, (0, 1)).all():
+        raise ValueError(f"'{label_column}' in {source} must hold 0/1 outcomes")
+    return present, values.astype(np.int8)
+
+
+class FeatureStore:
+    """Memory-mapped features, labels and startup ids of an ingested store"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format in {path}")
+        self.feature_names = self.meta['feature_names']
+        self.features = np.load(os.path.join(path, 'features.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+        self.ids = np.load(os.path.join(path, 'ids.npy'), mmap_mode='r')
+        self._index = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def column(self, name):
+        """One feature over every row, as a contiguous zero-copy view"""
+        return self.features[:, self.feature_names.index(name)]
+
+    @property
+    def index(self):
+        """Startup id -> row; a repeated id resolves to its latest row"""
+        if self._index is None:
+            self._index = {startup_id: row for row, startup_id in enumerate(self.ids.tolist())}
+        return self._index
+
+    def rows_for(self, startup_ids):
+        return np.array([self.index[startup_id] for startup_id in startup_ids], dtype=np.int64)
+
+    def lookup(self, startup_ids):
+        """Feature rows of the given startup ids"""
+        return np.asarray(self.features[self.rows_for(startup_ids)])
+
+    @classmethod
+    def ingest(cls, inputs, path=DEFAULT_STORE_PATH, predictor=None,
+               label_column='success', id_column='startup_id', chunk_size=50000,
+               input_format=None, overwrite=False):
+        """Prepare features for every labeled row of ``inputs`` and write a store
+
+        Rows without an outcome are skipped. Files lacking ``id_column`` get
+        ``<file name>:<row number>`` ids. The store is built next to ``path``
+        and moved into place once complete.
+        """
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(f"Feature store {path} exists; pass overwrite=True to replace it")
+        predictor = _feature_preparer(predictor)
+        names = list(predictor.feature_names)
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        build = tempfile.mkdtemp(dir=parent, prefix='.feature_store-')
+        try:
+            sources = []
+            n_rows = n_positive = id_width = 0
+            with contextlib.ExitStack() as files:
+                columns = [files.enter_context(open(os.path.join(build, f'column{j}.bin'), 'wb'))
+                           for j in range(len(names))]
+                labels = files.enter_context(open(os.path.join(build, 'labels.bin'), 'wb'))
+                ids = files.enter_context(open(os.path.join(build, 'ids.txt'), 'w',
+                                               encoding='utf-8'))
+                for source in inputs:
+                    stats = {'path': os.path.abspath(source),
+                             'format': file_format(source, input_format),
+                             'rows': 0, 'skipped': 0}
+                    offset = 0
+                    for frame in read_chunks(source, chunk_size, input_format):
+                        present, outcomes = _labels(frame, label_column, source)
+                        if id_column in frame.columns:
+                            chunk_ids = frame[id_column][present].astype(str).tolist()
+                        else:
+                            name = os.path.basename(source)
+                            chunk_ids = [f'{name}:{offset + i}' for i in np.flatnonzero(present)]
+                        offset += len(frame)
+                        X = predictor.prepare_feature_matrix(records_from_frame(frame[present]))
+                        for j, column in enumerate(columns):
+                            # Read back as float64 below, whatever the predictor's dtype
+                            column.write(np.ascontiguousarray(X[:, j], dtype=np.float64).tobytes())
+                        labels.write(outcomes.tobytes())
+                        n_positive += int(outcomes.sum())
+                        ids.writelines(startup_id.replace('\n', ' ') + '\n'
+                                       for startup_id in chunk_ids)
+                        id_width = max([id_width] + [len(i) for i in chunk_ids])
+                        stats['rows'] += len(outcomes)
+                        stats['skipped'] += int(len(frame) - len(outcomes))
+                    n_rows += stats['rows']
+                    sources.append(stats)
+            if not n_rows:
+                raise ValueError('No labeled rows to ingest')
+
+            features = np.lib.format.open_memmap(os.path.join(build, 'features.npy'), mode='w+',
+                                                 dtype=np.float64, shape=(n_rows, len(names)),
+                                                 fortran_order=True)
+            for j in range(len(names)):
+                features[:, j] = np.memmap(os.path.join(build, f'column{j}.bin'),
+                                           dtype=np.float64, mode='r')
+                os.remove(os.path.join(build, f'column{j}.bin'))
+            features.flush()
+            del features
+            np.save(os.path.join(build, 'labels.npy'),
+                    np.fromfile(os.path.join(build, 'labels.bin'), dtype=np.int8))
+            os.remove(os.path.join(build, 'labels.bin'))
+            id_array = np.lib.format.open_memmap(os.path.join(build, 'ids.npy'), mode='w+',
+                                                 dtype=f'<U{max(id_width, 1)}', shape=(n_rows,))
+            with open(os.path.join(build, 'ids.txt'), encoding='utf-8') as f:
+                for start in range(0, n_rows, chunk_size):
+                    block = [line[:-1] for line in itertools.islice(f, chunk_size)]
+                    id_array[start:start + len(block)] = block
+            id_array.flush()
+            del id_array
+            os.remove(os.path.join(build, 'ids.txt'))
+
+            meta = {
+                'format_version': FORMAT_VERSION,
+                'feature_names': names,
+                'n_rows': n_rows,
+                'n_positive': n_positive,
+                'label_column': label_column,
+                'id_column': id_column,
+                'sources': sources,
+                'created_at': datetime.now(timezone.utc).isoformat()
+            }
+            with open(os.path.join(build, 'meta.json'), 'w') as f:
+                json.dump(meta, f, indent=2)
+            os.chmod(build, 0o755)
+            if os.path.exists(path):
+                # Open memory maps of the old store stay valid after its files are unlinked
+                shutil.rmtree(path)
+            os.replace(build, path)
+        except BaseException:
+            shutil.rmtree(build, ignore_errors=True)
+            raise
+        return cls(path)
+
+
+def train_predictor(store, model_params=None, cv_folds=5, aggregation=DEFAULT_AGGREGATION):
+    """Train every model from scratch on a feature store"""
+    predictor = StartupSuccessPredictor(model_params)
+    predictor.feature_names = list(store.feature_names)
+    predictor.fit(store.features, store.labels, cv_folds, aggregation)
+    predictor.metadata['training_source'] = {
+        'feature_store': os.path.abspath(store.path),
+        'created_at': store.meta['created_at'],
+        'n_rows': len(store)
+    }
+    return predictor
+
+
+def train_artifact(store_path=DEFAULT_STORE_PATH, path=DEFAULT_ARTIFACT_PATH, **kwargs):
+    """Train on a feature store and publish the artifact with its training state"""
+    predictor = train_predictor(FeatureStore(store_path), **kwargs)
+    meta = predictor.save_artifact(path)
+    predictor.save_training_state(training_state_path(path))
+    return meta
@@ -0,0 +1,305 @@
+"""Post-training compression of the Random Forest in an artifact.
+
+Four steps, each reported in the artifact metadata under ``forest_compression``:
+
+- prune: trees are dropped greedily, each time the one whose removal gives
+  the best out-of-bag Brier score, for as long as held-out out-of-bag
+  accuracy and Brier score stay within tolerances of the full forest's
+- quantize: every split threshold is moved to the midpoint between the two
+  adjacent training values of its feature that it separates, so training
+  rows take the same paths and the trees share far fewer distinct thresholds
+- merge: sibling leaves with the same value are folded into their parent
+- pack: nodes are stored as ``CompressedTreeEnsemble`` arrays of 7 bytes per
+  node plus one table each of distinct thresholds and leaf values
+
+Everything fitted to the old forest's outputs is brought in line: the
+distilled student is dropped (as on retraining), and the aggregator, the
+early-exit cascade and the drift reference are refit (see
+``refit_dependents``). The training state gets the same pruning and
+thresholds (see ``apply_to_estimator``), the refit components and the
+report, so ``update_artifact`` keeps the forest compressed.
+
+Out-of-bag rows come from the forest's bootstrap samples, so the training
+state next to the artifact is needed:
+
+    report = compress_artifact('artifacts/startup_predictor.npz')
+"""
+import copy
+import os
+import time
+
+import numpy as np
+
+from ml_model import (DEFAULT_ARTIFACT_PATH, FOREST_MODEL_NAME as FOREST,
+                      StartupSuccessPredictor, precision_report, training_state_path)
+from model_artifact import CompressedTreeEnsemble, compile_estimator
+
+
+def _oob_scores(S, C, y):
+    """Out-of-bag (accuracy, Brier score) of every column of summed votes"""
+    valid = C > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = S / C
+    counts = valid.sum(axis=0)
+    accuracy = np.where(valid, (p > 0.5) == y[:, None], False).sum(axis=0) / counts
+    brier = np.where(valid, (p - y[:, None]) ** 2, 0.0).sum(axis=0) / counts
+    return accuracy, brier
+
+
+def oob_prune(tree_proba, inbag, y, tolerance=0.005, brier_tolerance=0.01, min_trees=20,
+              random_state=42):
+    """Trees to keep after greedy backward elimination on out-of-bag rows
+
+    ``tree_proba`` holds every tree's probability for every training row and
+    ``inbag`` whether the row was in that tree's bootstrap sample. Trees are
+    chosen for removal on one random half of the rows and the other half
+    decides when to stop: once its out-of-bag accuracy falls more than
+    ``tolerance`` below the full forest's, or its Brier score rises by more
+    than ``brier_tolerance`` (relative). Choosing and checking on the same
+    rows overfits them. Returns the kept tree indices and the held-out
+    half's scores after each removal.
+    """
+    y = np.asarray(y).astype(int)
+    oob = ~np.asarray(inbag, dtype=bool)
+    votes = np.where(oob, tree_proba, 0.0)
+    select = np.random.RandomState(random_state).rand(len(y)) < 0.5
+    halves = [(votes[rows], oob[rows], y[rows]) for rows in (select, ~select)]
+    S, C = zip(*[(v.sum(axis=1), o.sum(axis=1)) for v, o, _ in halves])
+    (v_select, oob_select, y_select), (v_check, oob_check, y_check) = halves
+    (S_select, S_check), (C_select, C_check) = S, C
+
+    def check_scores():
+        accuracy, brier = _oob_scores(S_check[:, None], C_check[:, None], y_check)
+        return {'trees': len(kept), 'oob_accuracy': float(accuracy[0]),
+                'oob_brier': float(brier[0])}
+
+    kept = list(range(tree_proba.shape[1]))
+    history = [check_scores()]
+    baseline = history[0]
+    while len(kept) > min_trees:
+        _, brier = _oob_scores(S_select[:, None] - v_select[:, kept],
+                               C_select[:, None] - oob_select[:, kept], y_select)
+        tree = kept[int(np.nanargmin(brier))]
+        S_select = S_select - v_select[:, tree]
+        C_select = C_select - oob_select[:, tree]
+        S_check = S_check - v_check[:, tree]
+        C_check = C_check - oob_check[:, tree]
+        kept.remove(tree)
+        scores = check_scores()
+        if (scores['oob_accuracy'] < baseline['oob_accuracy'] - tolerance or
+                scores['oob_brier'] > baseline['oob_brier'] * (1 + brier_tolerance)):
+            kept.append(tree)
+            break
+        history.append(scores)
+    return sorted(kept), history
+
+
+def quantize_thresholds(model, X):
+    """Split thresholds moved to midpoints between adjacent observed values
+
+    ``X`` is the (scaled) training matrix. Values are compared in float32, as
+    in ``TreeEnsembleModel.apply``; a threshold outside the observed range is
+    kept as is.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    threshold = model.threshold.copy()
+    internal = model.left != -1
+    for f in np.unique(model.feature[internal]):
+        nodes = np.flatnonzero(internal & (model.feature == f))
+        observed = np.unique(X[:, f]).astype(np.float64)
+        below = np.searchsorted(observed, threshold[nodes], side='right') - 1
+        inside = (below >= 0) & (below < len(observed) - 1)
+        i = below[inside]
+        threshold[nodes[inside]] = (observed[i] + observed[i + 1]) / 2
+    return threshold
+
+
+def refit_dependents(predictor, state, before, after):
+    """Refit what was fitted to the uncompressed forest's outputs
+
+    The distilled student imitated the old forest and is dropped. The
+    aggregator, early-exit cascade and drift reference are fitted from
+    out-of-fold predictions of the cross-validation models, so the forest's
+    are shifted by how much compression moved its probability (``before``
+    to ``after``, in [0, 1]) on each training row and all three are refit;
+    the cascade also re-measures the models' speed. Returns what was refit.
+    """
+    refit = []
+    if predictor.student is not None:
+        predictor.student = None
+        predictor.metadata.pop('student', None)
+        refit.append('student dropped')
+    data = state.training_data
+    if not data.get('oof'):
+        return refit
+    # Kept in the training state, so later refits and updates start from them
+    data['oof'][FOREST] = np.clip(data['oof'][FOREST] + after - before, 0, 1)
+    training_data = predictor.training_data
+    predictor.training_data = data
+    try:
+        if 'aggregation' in predictor.metadata:
+            predictor.fit_aggregator(predictor.metadata['aggregation']['method'])
+            refit += ['aggregator', 'cascade']
+        predictor._record_drift_reference()
+        refit.append('drift_reference')
+    finally:
+        predictor.training_data = training_data
+    return refit
+
+
+def apply_to_estimator(forest, model, kept=None, threshold=None):
+    """Prune and re-threshold a fitted scikit-learn forest like its compressed copy
+
+    ``model`` is the forest's ``compile_estimator`` copy, which ``kept`` (tree
+    indices) and ``threshold`` (per node) refer to.
+    """
+    if threshold is not None:
+        for root, tree in zip(model.roots, forest.estimators_):
+            internal = np.flatnonzero(tree.tree_.children_left != -1)
+            tree.tree_.threshold[internal] = threshold[root + internal]
+    if kept is not None:
+        forest.estimators_ = [forest.estimators_[t] for t in kept]
+        forest.n_estimators = len(kept)
+
+
+def requantize(predictor):
+    """Quantize the thresholds of a compressed forest again after an update
+
+    Trees added by ``update`` have thresholds anywhere between training
+    values; moving them to midpoints keeps every training row's path, so
+    nothing fitted to the forest's outputs changes.
+    """
+    forest = predictor.estimators[FOREST]
+    model = compile_estimator(forest)
+    X_scaled = predictor.fitted_scaler.transform(predictor.training_data['X'])
+    apply_to_estimator(forest, model, threshold=quantize_thresholds(model, X_scaled))
+    predictor._compile()
+
+
+def _sync_state(state, predictor):
+    """Copy what compression refit on ``predictor`` into its training state"""
+    state.aggregator = (None if predictor.aggregator is None
+                        else predictor.aggregator.astype(np.float64))
+    state.cascade = None if predictor.cascade is None else predictor.cascade.astype(np.float64)
+    for key in ('aggregation', 'cascade', 'drift_reference', 'forest_compression'):
+        if key in predictor.metadata:
+            state.metadata[key] = predictor.metadata[key]
+    state.metadata.pop('student', None)
+
+
+def _bytes(component):
+    return sum(array.nbytes for array in component.to_arrays().values())
+
+
+def compress_forest(predictor, state=None, tolerance=0.005, brier_tolerance=0.01, min_trees=20,
+                    quantize=True, n_eval_samples=5000, random_state=42):
+    """Replace ``predictor``'s Random Forest with a compressed copy
+
+    ``state`` is the predictor's training state (``from_training_state``);
+    by default ``predictor`` itself, right after training. Pruning is skipped
+    for forests grown by ``update``, whose older trees' bootstrap rows are
+    no longer known. Prediction deltas against the uncompressed forest are
+    measured on ``n_eval_samples`` rows recombined from the training rows.
+    ``state``'s forest, out-of-fold predictions and fitted components are
+    updated to match; save it with ``save_training_state``.
+    """
+    from distillation import augment
+
+    state = predictor if state is None else state
+    if state.training_data is None or FOREST not in state.estimators:
+        raise ValueError('Compression needs the Random Forest training state')
+    if isinstance(predictor.models[FOREST], CompressedTreeEnsemble):
+        raise ValueError('The Random Forest is already compressed')
+    forest = state.estimators[FOREST]
+    X, y = state.training_data['X'], state.training_data['y']
+    X_scaled = state.fitted_scaler.transform(X)
+    model = compile_estimator(forest)
+    started = time.perf_counter()
+
+    tree_proba = model.predict_tree_proba(X_scaled)
+    if state.training_data['updates']:
+        kept, pruning = None, {'skipped': 'the forest was grown by incremental updates'}
+    elif not forest.bootstrap:
+        kept, pruning = None, {'skipped': 'the forest was trained without bootstrap samples'}
+    else:
+        inbag = np.zeros(tree_proba.shape, dtype=bool)
+        for t, rows in enumerate(forest.estimators_samples_):
+            inbag[rows, t] = True
+        kept, history = oob_prune(tree_proba, inbag, y, tolerance, brier_tolerance, min_trees,
+                                  random_state)
+        pruning = {
+            'trees_before': model.n_trees,
+            'trees_after': len(kept),
+            # Scores on the held-out half of the out-of-bag rows
+            'oob_accuracy_before': history[0]['oob_accuracy'],
+            'oob_accuracy_after': history[-1]['oob_accuracy'],
+            'oob_brier_before': history[0]['oob_brier'],
+            'oob_brier_after': history[-1]['oob_brier'],
+            'tolerance': tolerance,
+            'brier_tolerance': brier_tolerance
+        }
+
+    threshold = quantize_thresholds(model, X_scaled) if quantize else None
+    compressed = CompressedTreeEnsemble.pack(model, kept, threshold).astype(predictor.dtype)
+    internal = model.left != -1
+    if kept is not None:
+        # Nodes of the kept trees, for a like-for-like distinct threshold count
+        tree_of_node = np.searchsorted(model.roots, np.arange(len(model.left)), side='right') - 1
+        internal &= np.isin(tree_of_node, kept)
+    reference = copy.copy(predictor)
+    reference.models = dict(predictor.models)
+    report = {
+        'pruning': pruning,
+        'nodes_before': int(len(model.left)),
+        'nodes_after': int(len(compressed.child)),
+        'thresholds_before': int(len(np.unique(model.threshold[internal]))),
+        'thresholds_after': int(len(compressed.thresholds)),
+        'leaf_values': int(len(compressed.leaf_values)),
+        'quantized': bool(quantize),
+        'forest_bytes': [_bytes(reference.models[FOREST]), _bytes(compressed)],
+        'seconds': time.perf_counter() - started
+    }
+    predictor.models[FOREST] = compressed
+    predictor._explainer = None
+    report['refit'] = refit_dependents(predictor, state, tree_proba.mean(axis=1),
+                                       compressed.predict_proba(X_scaled)[:, 1])
+    X_eval = augment(X, n_eval_samples, random_state=random_state)
+    deltas = precision_report(reference, predictor, X_eval)
+    report['prediction_deltas'] = {'rows': deltas['rows'], 'models': {
+        name: deltas['models'][name] for name in (FOREST, 'Ensemble')}}
+    predictor.metadata['forest_compression'] = report
+    apply_to_estimator(forest, model, kept, threshold)
+    _sync_state(state, predictor)
+    return report
+
+
+def _load_seconds(path, repeats=5):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        StartupSuccessPredictor.from_artifact(path)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def compress_artifact(path=DEFAULT_ARTIFACT_PATH, output=None, **kwargs):
+    """Compress an artifact's Random Forest (in place unless ``output`` is given)
+
+    The training state is written next to the output with the same
+    compression, so ``update_artifact`` keeps it. Returns the compression
+    report plus the measured load time and file size of the artifact before
+    and after.
+    """
+    state_path = training_state_path(path)
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(f"No training state at {state_path}; compression needs the "
+                                "forest's bootstrap samples")
+    predictor = StartupSuccessPredictor.from_artifact(path)
+    state = StartupSuccessPredictor.from_training_state(state_path)
+    before = {'load_seconds': _load_seconds(path), 'file_bytes': os.path.getsize(path)}
+    report = compress_forest(predictor, state, **kwargs)
+    output = output or path
+    predictor.save_artifact(output)
+    state.save_training_state(training_state_path(output))
+    after = {'load_seconds': _load_seconds(output), 'file_bytes': os.path.getsize(output)}
+    return dict(report, artifact=[before, after])
@@ -0,0 +1,166 @@
+"""Per-stage timers and counters for the prediction hot path.
+
+Attach an ``Instrumentation`` to ``StartupSuccessPredictor.instrumentation``
+to time each stage (feature preparation, scaling, every model's
+predict_proba, feature importance). When the attribute is ``None`` the
+predictor skips all timing, so the disabled cost is one attribute check
+per stage. Collected metrics export as Prometheus text or as an
+OpenTelemetry (OTLP/JSON) metrics payload.
+"""
+import bisect
+import threading
+import time
+
+# Upper bounds in seconds, from 50us up to 5s
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class StageStats:
+    """Histogram of durations for one stage"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+    def observe(self, seconds, rows):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.rows += rows
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets + (self.max,), self.bucket_counts):
+            if count and seen + count >= target:
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+            lower = upper
+        return self.max
+
+
+class Instrumentation:
+    """Thread-safe collection of stage timings and counters"""
+
+    def __init__(self, namespace='startup_predictor', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self.started = time.time()
+
+    def observe(self, stage, seconds, rows=1):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats(self.buckets)
+            stats.observe(seconds, rows)
+
+    def increment(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def time(self, stage, fn, *args, rows=1):
+        """Call ``fn(*args)`` and record its duration under ``stage``"""
+        started = time.perf_counter()
+        result = fn(*args)
+        self.observe(stage, time.perf_counter() - started, rows)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Summary per stage (durations in milliseconds) plus counters"""
+        with self._lock:
+            stages = {
+                name: {
+                    'count': s.count,
+                    'rows': s.rows,
+                    'mean_ms': s.total / s.count * 1000,
+                    'p50_ms': s.quantile(0.5) * 1000,
+                    'p99_ms': s.quantile(0.99) * 1000,
+                    'max_ms': s.max * 1000,
+                    'total_ms': s.total * 1000
+                }
+                for name, s in self._stages.items()
+            }
+            return {'stages': stages, 'counters': dict(self._counters)}
+
+    def to_prometheus(self):
+        """Render metrics in the Prometheus text exposition format"""
+        metric = f'{self.namespace}_stage_duration_seconds'
+        rows_metric = f'{self.namespace}_stage_rows_total'
+        lines = [f'# HELP {metric} Duration of prediction stages.',
+                 f'# TYPE {metric} histogram']
+        with self._lock:
+            stages = sorted(self._stages.items())
+            counters = sorted(self._counters.items())
+            for name, s in stages:
+                cumulative = 0
+                for upper, count in zip(self.buckets, s.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{upper:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {s.count}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {s.total:.9f}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {s.count}')
+            lines += [f'# HELP {rows_metric} Rows processed by prediction stages.',
+                      f'# TYPE {rows_metric} counter']
+            lines += [f'{rows_metric}{{stage="{name}"}} {s.rows}' for name, s in stages]
+            for name, value in counters:
+                counter = f'{self.namespace}_{name}_total'
+                lines += [f'# TYPE {counter} counter', f'{counter} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def to_otel(self):
+        """Metrics as an OTLP/JSON ``ExportMetricsServiceRequest`` payload"""
+        start_ns = str(int(self.started * 1e9))
+        now_ns = str(time.time_ns())
+        with self._lock:
+            histogram_points = [{
+                'attributes': [{'key': 'stage', 'value': {'stringValue': name}}],
+                'startTimeUnixNano': start_ns,
+                'timeUnixNano': now_ns,
+                'count': str(s.count),
+                'sum': s.total,
+                'max': s.max,
+                'bucketCounts': [str(c) for c in s.bucket_counts],
+                'explicitBounds': list(self.buckets)
+            } for name, s in sorted(self._stages.items())]
+            counters = [{
+                'name': f'{self.namespace}.{name}',
+                'sum': {
+                    'aggregationTemporality': 2,
+                    'isMonotonic': True,
+                    'dataPoints': [{'startTimeUnixNano': start_ns, 'timeUnixNano': now_ns,
+                                    'asInt': str(value)}]
+                }
+            } for name, value in sorted(self._counters.items())]
+        metrics = [{
+            'name': f'{self.namespace}.stage.duration',
+            'unit': 's',
+            'histogram': {'aggregationTemporality': 2, 'dataPoints': histogram_points}
+        }] + counters
+        return {
+            'resourceMetrics': [{
+                'resource': {'attributes': [{'key': 'service.name',
+                                             'value': {'stringValue': self.namespace}}]},
+                'scopeMetrics': [{'scope': {'name': __name__}, 'metrics': metrics}]
+            }]
+        }
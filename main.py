@@ -1,5 +1,328 @@
-def main():
-    print("Hello from repl-nix-workspace!")
+import argparse
+import logging
+
+from ml_model import AGGREGATION_METHODS, DEFAULT_AGGREGATION, DEFAULT_ARTIFACT_PATH
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Startup success prediction command-line tools')
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve = subparsers.add_parser('serve', help='run the headless HTTP/JSON scoring API')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                       help='model artifact to serve (trained if missing)')
+    serve.add_argument('--max-batch-size', type=int, default=64,
+                       help='largest micro-batch of single predictions')
+    serve.add_argument('--max-wait-ms', type=float, default=5.0,
+                       help='how long to wait for a micro-batch to fill')
+    serve.add_argument('--instrument', action='store_true',
+                       help='record per-stage timings (exposed on /metrics/prometheus)')
+    serve.add_argument('--cascade-tolerance', type=float, default=0.0,
+                       help='points a ?mode=cascade probability may land past a verdict threshold')
+    serve.add_argument('--monitor', action='store_true',
+                       help='sketch traffic for drift against the training data (GET /drift)')
+    serve.add_argument('--audit-log', metavar='PATH',
+                       help='append every prediction to this SQLite audit log (GET /predictions)')
+
+    history = subparsers.add_parser('history', help='print the newest logged predictions')
+    history.add_argument('--audit-log',
+                         help='audit log to read (default: artifacts/predictions.db)')
+    history.add_argument('--limit', type=int, default=20)
+    history.add_argument('--mode', help='only predictions made in this mode')
+    history.add_argument('--artifact-version', help='only predictions of this artifact checksum')
+
+    score = subparsers.add_parser('score', help='bulk-score a CSV/Parquet file of startups')
+    score.add_argument('input', help='CSV or Parquet file of startups')
+    score.add_argument('output', help='CSV or Parquet file to write predictions to')
+    score.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                       help='model artifact to score with (trained if missing)')
+    score.add_argument('--chunk-size', type=int, default=50000,
+                       help='rows read, scored and written at a time')
+    score.add_argument('--workers', type=int, default=1,
+                       help='score chunks in this many processes')
+    score.add_argument('--input-format', choices=['csv', 'parquet'])
+    score.add_argument('--output-format', choices=['csv', 'parquet'])
+    score.add_argument('--quiet', action='store_true', help='hide the progress readout')
+
+    update = subparsers.add_parser(
+        'update', help='incrementally train an artifact on new labeled outcomes')
+    update.add_argument('input', help='CSV or Parquet file of startups with their outcomes')
+    update.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                        help='artifact to update; its training state must sit next to it')
+    update.add_argument('--label-column', default='success',
+                        help='column holding the outcome (1 = success)')
+    update.add_argument('--new-trees', type=int, default=10,
+                        help='trees added to the random forest')
+    update.add_argument('--max-trees', type=int, default=500,
+                        help='oldest trees are dropped beyond this forest size')
+    update.add_argument('--input-format', choices=['csv', 'parquet'])
+
+    ingest = subparsers.add_parser(
+        'ingest', help='build a training feature store from historical outcome files')
+    ingest.add_argument('inputs', nargs='+', help='CSV or Parquet files of startups with outcomes')
+    ingest.add_argument('--store', help='feature store directory (default: artifacts/feature_store)')
+    ingest.add_argument('--label-column', default='success',
+                        help='column holding the outcome (1 = success)')
+    ingest.add_argument('--id-column', default='startup_id',
+                        help='column identifying each startup')
+    ingest.add_argument('--chunk-size', type=int, default=50000,
+                        help='rows read and prepared at a time')
+    ingest.add_argument('--input-format', choices=['csv', 'parquet'])
+    ingest.add_argument('--overwrite', action='store_true', help='replace an existing store')
+
+    train = subparsers.add_parser(
+        'train', help='train an artifact from scratch on a feature store')
+    train.add_argument('--store', help='feature store directory (default: artifacts/feature_store)')
+    train.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                       help='artifact to write, with its training state next to it')
+    train.add_argument('--cv-folds', type=int, default=5)
+    train.add_argument('--aggregation', choices=AGGREGATION_METHODS, default=DEFAULT_AGGREGATION,
+                       help='how the models\' probabilities combine (calibrated methods are '
+                            'opt-in; default: %(default)s)')
+
+    tune = subparsers.add_parser(
+        'tune', help='search model hyperparameters and train an artifact with the winners')
+    tune.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                      help='artifact to write, with its training state next to it')
+    tune.add_argument('--store', help='feature store to tune on (default: synthetic data)')
+    tune.add_argument('--samples', type=int, default=1000,
+                      help='synthetic training rows when no store is given')
+    tune.add_argument('--models', nargs='+', help='only tune these models')
+    tune.add_argument('--candidates', type=int, default=27,
+                      help='settings sampled per model for the first rung')
+    tune.add_argument('--factor', type=int, default=3,
+                      help='candidates are cut and rows multiplied by this per rung')
+    tune.add_argument('--min-resources', type=int,
+                      help='training rows per fold in the first rung')
+    tune.add_argument('--cv-folds', type=int, default=5)
+    tune.add_argument('--jobs', type=int, default=-1, help='parallel fits (-1: all cores)')
+    tune.add_argument('--checkpoint',
+                      help='resumable search state (default: next to the artifact)')
+    tune.add_argument('--seed', type=int, default=42)
+
+    compact = subparsers.add_parser(
+        'compact', help='write a float32 copy of an artifact after an accuracy check')
+    compact.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH, help='artifact to convert')
+    compact.add_argument('--output', help='compact artifact (default: <artifact>.float32.npz)')
+    compact.add_argument('--store',
+                         help='feature store to check on (default: the training data)')
+    compact.add_argument('--min-agreement', type=float, default=0.99,
+                         help='smallest share of unchanged ensemble decisions')
+
+    compress = subparsers.add_parser(
+        'compress-forest', help='prune, quantize and pack the random forest of an artifact')
+    compress.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                          help='artifact to compress; its training state must sit next to it')
+    compress.add_argument('--output', help='artifact to write (default: update in place)')
+    compress.add_argument('--tolerance', type=float, default=0.005,
+                          help='largest out-of-bag accuracy loss from pruning trees')
+    compress.add_argument('--brier-tolerance', type=float, default=0.01,
+                          help='largest relative out-of-bag Brier score increase from pruning')
+    compress.add_argument('--min-trees', type=int, default=20, help='never prune below this')
+    compress.add_argument('--no-quantize', action='store_true',
+                          help='keep split thresholds as trained')
+
+    distill = subparsers.add_parser(
+        'distill', help='add a distilled student model for fast-mode predictions')
+    distill.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                         help='artifact to distill (its training data is used if present)')
+    distill.add_argument('--output', help='artifact to write (default: update in place)')
+    distill.add_argument('--samples', type=int, default=50000,
+                         help='synthetic rows labeled by the ensemble for the student')
+    distill.add_argument('--trees', type=int, default=150, help='boosting stages of the student')
+    distill.add_argument('--max-depth', type=int, default=4, help='depth of each student tree')
+
+    surface = subparsers.add_parser(
+        'surface', help='precompute the what-if response surface for an artifact')
+    surface.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                         help='model artifact to evaluate (trained if missing)')
+    surface.add_argument('--output', help='surface file (default: next to the artifact)')
+    surface.add_argument('--workers', type=int, default=1,
+                         help='evaluate the grid in this many processes')
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    if args.command == 'serve':
+        from scoring_api import serve
+
+        serve(args.host, args.port,
+              artifact_path=args.artifact,
+              max_batch_size=args.max_batch_size,
+              max_wait=args.max_wait_ms / 1000,
+              instrument=args.instrument,
+              cascade_tolerance=args.cascade_tolerance,
+              monitor=args.monitor,
+              audit_log=args.audit_log)
+    elif args.command == 'history':
+        import json
+
+        from audit_log import DEFAULT_AUDIT_PATH, recent_predictions
+
+        try:
+            rows = recent_predictions(args.audit_log or DEFAULT_AUDIT_PATH,
+                                      limit=args.limit,
+                                      mode=args.mode,
+                                      artifact_version=args.artifact_version)
+        except FileNotFoundError as exc:
+            raise SystemExit(f'{exc}; it is created by `serve --audit-log` or by the app '
+                             'with STARTUP_AUDIT_LOG set')
+        for row in rows:
+            print(json.dumps(row))
+    elif args.command == 'score':
+        from bulk_scoring import score_file
+
+        summary = score_file(args.input, args.output,
+                             artifact_path=args.artifact,
+                             chunk_size=args.chunk_size,
+                             workers=args.workers,
+                             input_format=args.input_format,
+                             output_format=args.output_format,
+                             progress=not args.quiet)
+        logging.info('Scored %(rows)d rows (%(rejected)d rejected) at %(rows_per_second).0f rows/s',
+                     summary)
+    elif args.command == 'update':
+        from bulk_scoring import read_chunks, records_from_frame
+        from ml_model import update_artifact
+
+        startups, outcomes = [], []
+        for frame in read_chunks(args.input, 50000, args.input_format):
+            startups.extend(records_from_frame(frame))
+            outcomes.extend(frame[args.label_column].astype(int).tolist())
+        meta = update_artifact(startups, outcomes, args.artifact,
+                               new_trees=args.new_trees, max_trees=args.max_trees)
+        logging.info('Published model version %d (%s) trained on %d samples',
+                     meta['model_version'], meta['checksum'], meta['n_training_samples'])
+    elif args.command == 'ingest':
+        from feature_store import DEFAULT_STORE_PATH, FeatureStore
+
+        store = FeatureStore.ingest(args.inputs, args.store or DEFAULT_STORE_PATH,
+                                    label_column=args.label_column,
+                                    id_column=args.id_column,
+                                    chunk_size=args.chunk_size,
+                                    input_format=args.input_format,
+                                    overwrite=args.overwrite)
+        skipped = sum(source['skipped'] for source in store.meta['sources'])
+        logging.info('Stored %d rows (%d successes, %d unlabeled skipped) in %s',
+                     len(store), store.meta['n_positive'], skipped, store.path)
+    elif args.command == 'train':
+        from feature_store import DEFAULT_STORE_PATH, train_artifact
+
+        meta = train_artifact(args.store or DEFAULT_STORE_PATH, args.artifact,
+                              cv_folds=args.cv_folds, aggregation=args.aggregation)
+        logging.info('Wrote %s (%s) trained on %d samples', args.artifact, meta['checksum'],
+                     meta['n_training_samples'])
+    elif args.command == 'tune':
+        from tuning import tune_artifact, tuning_checkpoint_path
+
+        meta, results = tune_artifact(args.artifact,
+                                      store_path=args.store,
+                                      n_samples=args.samples,
+                                      models=args.models,
+                                      n_candidates=args.candidates,
+                                      factor=args.factor,
+                                      min_resources=args.min_resources,
+                                      cv_folds=args.cv_folds,
+                                      n_jobs=args.jobs,
+                                      checkpoint=args.checkpoint
+                                      or tuning_checkpoint_path(args.artifact),
+                                      random_state=args.seed)
+        for name, result in results.items():
+            logging.info('%s: %.3f CV accuracy with %s', name, result['cv_accuracy'],
+                         result['best_params'])
+        logging.info('Wrote %s (%s)', args.artifact, meta['checksum'])
+    elif args.command == 'compact':
+        import os
+
+        from ml_model import (StartupSuccessPredictor, compact_artifact,
+                              training_state_path)
+
+        if args.store:
+            from feature_store import FeatureStore
+
+            store = FeatureStore(args.store)
+            X, y = store.features, store.labels
+        elif os.path.exists(training_state_path(args.artifact)):
+            data = StartupSuccessPredictor.from_training_state(
+                training_state_path(args.artifact)).training_data
+            X, y = data['X'], data['y']
+        else:
+            df = StartupSuccessPredictor().generate_synthetic_training_data()
+            X, y = df.drop('success', axis=1).to_numpy(), df['success'].to_numpy()
+        output = args.output or os.path.splitext(args.artifact)[0] + '.float32.npz'
+        report = compact_artifact(args.artifact, output, X, y, min_agreement=args.min_agreement)
+        for name, entry in report['models'].items():
+            logging.info('%s: max diff %.4f points, %.2f%% decisions agree, accuracy %.4f -> %.4f',
+                         name, entry['max_abs_diff'], entry['decision_agreement'] * 100,
+                         entry['accuracy_reference'], entry['accuracy_candidate'])
+        logging.info('Wrote %s: model arrays %.1f MB -> %.1f MB', output,
+                     report['model_bytes'][0] / 1e6, report['model_bytes'][1] / 1e6)
+    elif args.command == 'compress-forest':
+        from forest_compression import compress_artifact
+
+        report = compress_artifact(args.artifact, args.output,
+                                   tolerance=args.tolerance,
+                                   brier_tolerance=args.brier_tolerance,
+                                   min_trees=args.min_trees,
+                                   quantize=not args.no_quantize)
+        pruning = report['pruning']
+        if 'skipped' in pruning:
+            logging.info('Pruning skipped: %s', pruning['skipped'])
+        else:
+            logging.info('Pruned %d -> %d trees, out-of-bag accuracy %.3f -> %.3f',
+                         pruning['trees_before'], pruning['trees_after'],
+                         pruning['oob_accuracy_before'], pruning['oob_accuracy_after'])
+        if report['refit']:
+            logging.info('Refit to the compressed forest: %s', ', '.join(report['refit']))
+        logging.info('Nodes %d -> %d, distinct thresholds %d -> %d, forest arrays %.2f MB -> '
+                     '%.2f MB', report['nodes_before'], report['nodes_after'],
+                     report['thresholds_before'], report['thresholds_after'],
+                     report['forest_bytes'][0] / 1e6, report['forest_bytes'][1] / 1e6)
+        before, after = report['artifact']
+        logging.info('Artifact %.2f MB -> %.2f MB, load %.1f ms -> %.1f ms',
+                     before['file_bytes'] / 1e6, after['file_bytes'] / 1e6,
+                     before['load_seconds'] * 1000, after['load_seconds'] * 1000)
+        for name, entry in report['prediction_deltas']['models'].items():
+            logging.info('%s: mean diff %.3f points (max %.3f), %.2f%% decisions agree', name,
+                         entry['mean_abs_diff'], entry['max_abs_diff'],
+                         entry['decision_agreement'] * 100)
+        logging.info('Wrote %s', args.output or args.artifact)
+    elif args.command == 'distill':
+        from distillation import distill_artifact
+
+        report = distill_artifact(args.artifact, args.output,
+                                  n_samples=args.samples,
+                                  n_estimators=args.trees,
+                                  max_depth=args.max_depth)
+        fidelity = report['fidelity']
+        logging.info('Student within %.2f points of the ensemble on average (p95 %.2f), '
+                     '%.2f%% decisions agree, accuracy %.3f',
+                     fidelity['mae'], fidelity['p95_abs_diff'],
+                     fidelity['decision_agreement'] * 100, fidelity['student_accuracy'])
+        logging.info('Single prediction %.0fus -> %.0fus (%.1fx), batch %.1fx faster per row',
+                     fidelity['latency_us']['single_full'], fidelity['latency_us']['single_fast'],
+                     fidelity['speedup']['single'], fidelity['speedup']['batch'])
+        logging.info('Wrote %s', args.output or args.artifact)
+    elif args.command == 'surface':
+        from ml_model import load_or_train_predictor
+        from response_surface import ResponseSurface, surface_path
+
+        predictor = load_or_train_predictor(args.artifact)
+        surface = ResponseSurface.build(predictor, workers=args.workers)
+        output = args.output or surface_path(args.artifact)
+        surface.save(output)
+        logging.info('Wrote %d contexts (%.1f MB) to %s', len(surface),
+                     surface.nbytes / 1e6, output)
+    else:
+        parser.print_help()
 
 
 if __name__ == "__main__":
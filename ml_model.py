@@ -1,28 +1,115 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.model_selection import cross_val_score
-from sklearn.preprocessing import StandardScaler
-import warnings
-warnings.filterwarnings('ignore')
+
+from model_artifact import (MODEL_KEYS, CalibratedAggregator, CompressedTreeEnsemble,
+                            EarlyExitCascade, build_components, compile_estimator,
+                            flatten_components, platt_probability, read_artifact,
+                            write_artifact)
+
+PROBA_STAGES = {name: f'predict_proba.{key}' for name, key in MODEL_KEYS.items()}
+
+# Funding at or above this amount maps to the top of the funding feature
+FUNDING_SCALE = 10000000
+# Company age is measured from this year
+REFERENCE_YEAR = 2024
+
+# Default what-if grids over the startup's numeric inputs
+SENSITIVITY_GRIDS = {
+    'funding_amount': np.linspace(0, FUNDING_SCALE, 101),
+    'team_size': np.arange(1, 101),
+    'founding_year': np.arange(2000, 2025)
+}
+
+# Name of the distilled student in fast-mode results
+FAST_MODEL_NAME = 'Distilled Ensemble'
+
+FOREST_MODEL_NAME = 'Random Forest'
+
+# Percentiles of the forest's per-tree uncertainty bands (see forest_bands)
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Pseudo-rows at the forest's probability added to every leaf for the bands
+LEAF_PRIOR_ROWS = 10
+
+PREDICTION_MODES = ('full', 'fast', 'cascade')
+
+# Success probabilities (%) at which the app's displayed verdict changes; cascade
+# mode stops scoring a row once its verdict is settled
+VERDICT_THRESHOLDS = (50.0, 70.0)
+
+# How model probabilities become the ensemble's (see fit_aggregator); the
+# calibrated combinations are opt-in because they change every probability
+AGGREGATION_METHODS = ('mean', 'weighted', 'stacking')
+DEFAULT_AGGREGATION = 'mean'
+
+DEFAULT_ARTIFACT_PATH = os.environ.get('STARTUP_MODEL_ARTIFACT',
+                                       'artifacts/startup_predictor.npz')
+
 
 class StartupSuccessPredictor:
-    def __init__(self):
-        self.models = {
+    def __init__(self, model_params=None):
+        self.model_params = model_params or {}
+        self.models = {}
+        self.estimators = {}
+        self.scaler = None
+        self.fitted_scaler = None
+        self.feature_names = []
+        self.model_accuracies = {}
+        self.feature_importances = None
+        # Calibrated combination of the models' probabilities; None averages them
+        self.aggregator = None
+        # Optional distilled model for fast mode (see distillation.py)
+        self.student = None
+        # Early-exit estimates for cascade mode (see fit_cascade)
+        self.cascade = None
+        # Rows scored in cascade mode per model they exited after
+        self.cascade_exits = {}
+        self._cascade_lock = threading.Lock()
+        # Points a cascade-mode probability may land past a verdict threshold
+        self.cascade_tolerance = 0.0
+        self.feature_index = {}
+        self.importance_order = None
+        self._ranked_importances = []
+        self.training_stats = {}
+        self.training_data = None
+        self.fold_scores = {}
+        self.metadata = {}
+        # Precision of feature matrices and model arithmetic at inference
+        self.dtype = np.dtype(np.float64)
+        self.instrumentation = None
+        # Optional monitoring.DriftMonitor fed by predict and predict_batch
+        self.monitor = None
+        # Optional audit_log.AuditLog recording every predict and predict_batch call
+        self.audit_log = None
+        self._explainer = None
+
+    def _build_estimators(self):
+        """Create the untrained scikit-learn estimators (imported on demand)"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.svm import SVC
+
+        estimators = {
             'Logistic Regression': LogisticRegression(random_state=42, max_iter=1000),
             'Decision Tree': DecisionTreeClassifier(random_state=42, max_depth=10),
             'Random Forest': RandomForestClassifier(random_state=42, n_estimators=100),
-            'SVM': SVC(random_state=42, probability=True, kernel='rbf')
+            # Probabilities come from our own Platt sigmoid (see _calibrate_svm)
+            'SVM': SVC(random_state=42, kernel='rbf')
         }
-        self.scaler = StandardScaler()
-        self.feature_names = []
-        self.model_accuracies = {}
+        for name, params in self.model_params.items():
+            estimators[name].set_params(**params)
+        return estimators
         
     def generate_synthetic_training_data(self, n_samples=1000):
         """Generate synthetic training data based on realistic patterns"""
+        import pandas as pd
+
         np.random.seed(42)
         
         data = {
@@ -60,35 +147,676 @@ class StartupSuccessPredictor:
         
         return df
     
-    def train_models(self):
+    def train_models(self, n_samples=1000):
         """Train all models on synthetic data"""
-        df = self.generate_synthetic_training_data(1000)
+        df = self.generate_synthetic_training_data(n_samples)
         
         X = df.drop('success', axis=1)
         y = df['success']
         
         self.feature_names = X.columns.tolist()
+        self.fit(X.to_numpy(dtype=np.float64), y.to_numpy())
+
+    def fit(self, X, y, cv_folds=5, aggregation=DEFAULT_AGGREGATION):
+        """Train all models from scratch on a prepared feature matrix and its outcomes
+
+        ``aggregation`` is how the models' probabilities combine (see
+        ``fit_aggregator``).
+        """
+        from sklearn.preprocessing import StandardScaler
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y).astype(int)
         
-        X_scaled = self.scaler.fit_transform(X)
+        self.estimators = self._build_estimators()
+        self.fitted_scaler = StandardScaler()
+        X_scaled = self.fitted_scaler.fit_transform(X)
         
-        for name, model in self.models.items():
+        # Remembered so updates can redo one fold
+        folds = assign_folds(y, cv_folds)
+        self.training_data = {'X': X, 'y': y, 'folds': folds, 'updates': 0,
+                              # Out-of-fold success probabilities, for fit_aggregator
+                              'oof': {},
+                              # Per SVM: out-of-fold decision values, Platt sigmoid and
+                              # the rows it was fit on (None for every row)
+                              'svm': {}}
+        
+        for name, model in self.estimators.items():
+            started = time.perf_counter()
             model.fit(X_scaled, y)
+            fitted = time.perf_counter()
             
-            cv_scores = cross_val_score(model, X_scaled, y, cv=5, scoring='accuracy')
-            self.model_accuracies[name] = {
-                'mean': cv_scores.mean(),
-                'std': cv_scores.std()
+            oof = self.training_data['oof'][name] = np.empty(len(y))
+            scores = []
+            for k in range(cv_folds):
+                accuracy, oof[folds == k] = self._fold_score(model, X_scaled, y, folds, k)
+                scores.append(accuracy)
+            if hasattr(model, 'support_vectors_'):
+                # The SVM's fold scores are decision values
+                self.training_data['svm'][name] = {'decision': oof, 'rows': None}
+                self._calibrate_svm(name)
+            self.fold_scores[name] = np.array(scores)
+            self._record_accuracy(name)
+            self.training_stats[name] = {
+                'fit_seconds': fitted - started,
+                'cv_seconds': time.perf_counter() - fitted
+            }
+
+        self.metadata['model_version'] = 1
+        # A fresh forest is not compressed
+        self.metadata.pop('forest_compression', None)
+        self._record_training_metadata()
+        self._compile()
+        self._refit_aggregation(aggregation)
+        self._record_drift_reference()
+
+    def _fold_score(self, model, X_scaled, y, folds, k, max_train_rows=None):
+        """Accuracy and success probabilities (decision values for an SVM) on
+        fold ``k`` of a fresh copy of ``model`` fit on the other folds"""
+        from sklearn.base import clone
+
+        estimator = clone(model)
+        if 'warm_start' in estimator.get_params():
+            estimator.set_params(warm_start=False)
+        train = np.flatnonzero(folds != k)
+        if max_train_rows is not None and len(train) > max_train_rows:
+            train = np.random.RandomState(k).choice(train, max_train_rows, replace=False)
+        test = folds == k
+        estimator.fit(X_scaled[train], y[train])
+        accuracy = float((estimator.predict(X_scaled[test]) == y[test]).mean())
+        if hasattr(estimator, 'support_vectors_'):
+            return accuracy, estimator.decision_function(X_scaled[test])
+        positive = list(estimator.classes_).index(1)
+        return accuracy, estimator.predict_proba(X_scaled[test])[:, positive]
+
+    def _calibrate_svm(self, name):
+        """Fit the SVM's Platt sigmoid on its out-of-fold decision values
+
+        As libsvm's ``probability=True`` did, but on the predictor's own CV
+        folds instead of an extra internal cross-validation per fit.
+        """
+        data = self.training_data
+        svm = data['svm'][name]
+        svm['sigmoid'] = fit_sigmoid(svm['decision'], data['y'])
+        if data.get('oof') is not None:
+            data['oof'][name] = platt_probability(svm['decision'], svm['sigmoid'])
+
+    def _record_accuracy(self, name):
+        scores = self.fold_scores[name]
+        self.model_accuracies[name] = {'mean': scores.mean(), 'std': scores.std()}
+
+    def _record_training_metadata(self):
+        self.metadata['n_training_samples'] = int(len(self.training_data['y']))
+        self.metadata['model_params'] = {
+            name: {k: v for k, v in model.get_params().items()
+                   if isinstance(v, (int, float, str, bool, type(None)))}
+            for name, model in self.estimators.items()
+        }
+
+    def fit_aggregator(self, method=DEFAULT_AGGREGATION):
+        """Fit how the models' probabilities combine, from their out-of-fold predictions
+
+        ``'weighted'`` averages them with weights proportional to CV accuracy and
+        ``'stacking'`` fits a logistic regression on them; either combined score
+        is then calibrated by (centred) isotonic regression against the outcomes. ``'mean'``
+        restores the plain average. The out-of-fold predictions are the ones
+        ``fit`` makes during cross-validation, so this trains no model. Metrics
+        of the plain average and of the calibrated combination (cross-fitted
+        over the same folds) are recorded in the metadata under ``aggregation``.
+        The early-exit cascade is refit to the new combination. Every
+        probability can change, so the model version is bumped.
+        """
+        report = self._refit_aggregation(method)
+        self.metadata['model_version'] = self.metadata.get('model_version', 1) + 1
+        self.metadata['updated_at'] = datetime.now(timezone.utc).isoformat()
+        return report
+
+    def _refit_aggregation(self, method):
+        """``fit_aggregator`` without a version bump, for ``fit`` and ``update``"""
+        if method not in AGGREGATION_METHODS:
+            raise ValueError(f"Unknown aggregation '{method}'; expected one of {AGGREGATION_METHODS}")
+        if self.training_data is None or not self.training_data.get('oof'):
+            raise ValueError('No out-of-fold predictions in the training state; retrain first')
+        names = list(self.models)
+        P = np.column_stack([self.training_data['oof'][name] for name in names])
+        y, folds = self.training_data['y'], self.training_data['folds']
+        report = {'method': method, 'rows': int(len(y)),
+                  'mean': _probability_metrics(P.mean(axis=1), y)}
+        if method == 'mean':
+            self.aggregator = None
+        else:
+            cross_fitted = np.empty(len(y))
+            for k in np.unique(folds):
+                test = folds == k
+                aggregator = self._fit_aggregator(P[~test], y[~test], method)
+                cross_fitted[test] = aggregator.combine(P[test])
+            self.aggregator = self._fit_aggregator(P, y, method)
+            report['calibrated'] = _probability_metrics(cross_fitted, y)
+            report['weights'] = dict(zip(names, self.aggregator.weights.tolist()))
+            report['bias'] = float(self.aggregator.bias[0])
+        self.metadata['aggregation'] = report
+        # Explanations combine the models with the aggregator's weights
+        self._explainer = None
+        self.fit_cascade()
+        return report
+
+    def _fit_aggregator(self, P, y, method):
+        from sklearn.isotonic import IsotonicRegression
+        from sklearn.linear_model import LogisticRegression
+
+        if method == 'weighted':
+            accuracy = np.array([self.model_accuracies[name]['mean'] for name in self.models])
+            weights, bias = accuracy / accuracy.sum(), 0.0
+        else:
+            stack = LogisticRegression().fit(P, y)
+            weights, bias = stack.coef_[0], stack.intercept_[0]
+        score = P @ weights + bias
+        fitted = IsotonicRegression(out_of_bounds='clip').fit(score, y).predict(score)
+        # Centred isotonic: one breakpoint per block of equal fitted values, at its mean
+        # score, so calibration interpolates between blocks instead of stepping. Add-one
+        # smoothing keeps small end blocks off exactly 0% and 100%.
+        blocks, block, counts = np.unique(fitted, return_inverse=True, return_counts=True)
+        centres = np.bincount(block, score) / counts
+        rates = np.maximum.accumulate((np.bincount(block, y) + 1) / (counts + 2))
+        return CalibratedAggregator(np.asarray(weights, dtype=np.float64),
+                                    np.array([bias], dtype=np.float64), centres, rates)
+
+    def _record_drift_reference(self):
+        """Store the training distribution drift monitoring compares traffic to
+
+        The success probability's reference is the ensemble's out-of-fold
+        probability, as the fitted models' own scores on their training rows
+        are overconfident.
+        """
+        from monitoring import reference_profile
+
+        probability = None
+        if self.training_data.get('oof'):
+            P = np.column_stack([self.training_data['oof'][name] for name in self.models])
+            P = P[np.isfinite(P).all(axis=1)]
+            weights, bias, calibrate = self._combination()
+            probability = calibrate(P @ weights + bias) * 100
+        self.metadata['drift_reference'] = reference_profile(
+            self.training_data['X'], self.feature_names, probability)
+
+    def fit_cascade(self, coverage=0.99, n_bins=10, min_bin_rows=20, order=None):
+        """Fit the early-exit estimates behind ``mode='cascade'``, from out-of-fold predictions
+
+        Models are scored in ``order`` (model names), by default cheapest
+        first by their counted cost per row (see ``cost_per_row`` in
+        model_artifact.py), so the same models always give the same order.
+        After each model but the last, the ensemble's combined score is
+        estimated from the models scored so far by least squares, and the error
+        margin of that estimate is the ``coverage`` quantile of its distance
+        from the final probability, per estimated-probability bin (bins with
+        fewer than ``min_bin_rows`` rows use the quantile over all rows).
+
+        ``decision_agreement`` and the exits are measured out of sample: the
+        estimates and margins are refit without each CV fold and the cascade
+        is run on that fold. They are recorded in the metadata under
+        ``cascade`` with the order and the per-model costs.
+        """
+        names = list(self.models)
+        P = np.column_stack([self.training_data['oof'][name] for name in names])
+        finite = np.isfinite(P).all(axis=1)
+        P, folds = P[finite], self.training_data['folds'][finite]
+        weights, bias, calibrate = self._combination()
+        final = calibrate(P @ weights + bias)
+        costs = {name: model.cost_per_row() for name, model in self.models.items()}
+        if order is None:
+            order = np.argsort([costs[name] for name in names], kind='stable')
+        else:
+            if sorted(order) != sorted(names):
+                raise ValueError(f"Cascade order must list every model once: {names}")
+            order = [names.index(name) for name in order]
+        order = np.asarray(order, dtype=np.int32)
+
+        probability, stage = np.empty(len(P)), np.empty(len(P), dtype=int)
+        for k in np.unique(folds):
+            test = folds == k
+            self._fit_cascade_stages(P[~test], order, coverage, n_bins, min_bin_rows)
+            held_out = P[test]
+            probability[test], _, stage[test], _ = self._run_cascade(
+                lambda j, rows: held_out[rows, j], len(held_out))
+        self._fit_cascade_stages(P, order, coverage, n_bins, min_bin_rows)
+
+        exits = np.bincount(stage, minlength=len(names))
+        self.metadata['cascade'] = {
+            'order': [names[j] for j in order],
+            'cost_per_row': costs,
+            'coverage': coverage,
+            'rows': int(len(P)),
+            'exits': {names[j]: int(n) for j, n in zip(order, exits)},
+            'decision_agreement': float(
+                (_verdict(probability * 100) == _verdict(final * 100)).mean()),
+            'estimated_speedup': self._cascade_speedup(exits, costs)
+        }
+        return self.metadata['cascade']
+
+    def _fit_cascade_stages(self, P, order, coverage, n_bins, min_bin_rows):
+        """Fit ``self.cascade``'s estimates and margins on the model probabilities ``P``"""
+        weights, bias, calibrate = self._combination()
+        score = P @ weights + bias
+        final = calibrate(score)
+        stages = len(order) - 1
+        coef, intercept = np.zeros((stages, len(order))), np.zeros(stages)
+        margin = np.zeros((stages, n_bins))
+        self.cascade = EarlyExitCascade(order, coef, intercept, margin)
+        for k in range(stages):
+            seen = order[:k + 1]
+            solution = np.linalg.lstsq(np.column_stack([P[:, seen], np.ones(len(P))]), score,
+                                       rcond=None)[0]
+            coef[k, seen], intercept[k] = solution[:-1], solution[-1]
+            P_seen = np.zeros_like(P)
+            P_seen[:, seen] = P[:, seen]
+            estimate = self._cascade_bounds(P_seen, k)[0]
+            error = np.abs(estimate - final)
+            index = np.minimum((estimate * n_bins).astype(int), n_bins - 1)
+            margin[k] = np.quantile(error, coverage)
+            for b in range(n_bins):
+                if (index == b).sum() >= min_bin_rows:
+                    margin[k, b] = np.quantile(error[index == b], coverage)
+        self.cascade = EarlyExitCascade(order, coef, intercept, margin).astype(self.dtype)
+
+    def _combination(self):
+        """(weights, bias, calibrate) of the ensemble on probabilities in [0, 1]"""
+        if self.aggregator is None:
+            return np.full(len(self.models), 1 / len(self.models)), 0.0, lambda score: score
+        aggregator = self.aggregator
+        return (aggregator.weights, aggregator.bias[0],
+                lambda score: np.interp(score, aggregator.calibration_x, aggregator.calibration_y))
+
+    def _cascade_bounds(self, P, stage):
+        """Estimate, lower and upper bound of the ensemble probability after ``stage``
+
+        ``P`` has zeros for the models not scored yet. Those models'
+        probabilities can only add between their negative and positive
+        weights to the combined score, and calibration is monotone, so the
+        bounds are exact; the estimate is clipped to them.
+        """
+        weights, bias, calibrate = self._combination()
+        remaining = weights[self.cascade.order[stage + 1:]]
+        partial = P @ weights + bias
+        low = calibrate(partial + np.minimum(remaining, 0).sum())
+        high = calibrate(partial + np.maximum(remaining, 0).sum())
+        return np.clip(calibrate(self.cascade.estimate(P, stage)), low, high), low, high
+
+    def _run_cascade(self, score_model, rows, tolerance=0.0):
+        """Score ``rows`` rows model by model until their verdicts are settled
+
+        ``score_model(j, indices)`` returns model ``j``'s success probabilities
+        (in [0, 1]) for the given row indices. A row exits once the bounds of its
+        ensemble probability, tightened to the estimate's margin, rule out
+        landing on the other side of any verdict threshold from the estimate
+        by more than ``tolerance`` points. The exact bounds always hold but the
+        margins only cover the ``coverage`` share of out-of-fold rows (see
+        ``fit_cascade``), so an early verdict occasionally differs from full
+        scoring. Returns the probabilities (in
+        [0, 1]), the model matrix (NaN where not scored), the exit stage and the
+        margin of each row (0 where every model was scored).
+        """
+        names = list(self.models)
+        P = np.zeros((rows, len(names)), dtype=self.dtype)
+        scored = np.zeros(P.shape, dtype=bool)
+        probability, margin = np.zeros(rows), np.zeros(rows)
+        stage = np.full(rows, len(names) - 1)
+        active = np.arange(rows)
+        for k, j in enumerate(self.cascade.order[:-1]):
+            P[active, j] = score_model(j, active)
+            scored[active, j] = True
+            estimate, low, high = self._cascade_bounds(P[active], k)
+            spread = self.cascade.margin_of(estimate, k)
+            low, high = np.maximum(low, estimate - spread), np.minimum(high, estimate + spread)
+            settled = np.ones(len(active), dtype=bool)
+            for threshold in VERDICT_THRESHOLDS:
+                above = estimate * 100 >= threshold
+                settled &= np.where(above, low * 100 >= threshold - tolerance,
+                                    high * 100 < threshold + tolerance)
+            exits = active[settled]
+            probability[exits], margin[exits], stage[exits] = estimate[settled], spread[settled], k
+            active = active[~settled]
+            if not len(active):
+                break
+        else:
+            j = self.cascade.order[-1]
+            P[active, j] = score_model(j, active)
+            scored[active, j] = True
+            weights, bias, calibrate = self._combination()
+            probability[active] = calibrate(P[active] @ weights + bias)
+        return probability, np.where(scored, P, np.nan), stage, margin
+
+    def _cascade_speedup(self, exits, costs):
+        """Full over cascade scoring cost per row, from the models' costs per row"""
+        if not exits.sum():
+            return None
+        names = list(self.models)
+        cost = np.cumsum([costs[names[j]] for j in self.cascade.order])
+        return float(cost[-1] / ((exits * cost).sum() / exits.sum()))
+
+    def cascade_stats(self):
+        """How many rows scored in cascade mode exited after each model, and the gain"""
+        if self.cascade is None:
+            return None
+        names = [list(self.models)[j] for j in self.cascade.order]
+        with self._cascade_lock:
+            exits = np.array([self.cascade_exits.get(name, 0) for name in names])
+        meta = self.metadata['cascade']
+        return {
+            'rows': int(exits.sum()),
+            'exits': dict(zip(names, exits.tolist())),
+            'models_per_row': float((exits * np.arange(1, len(names) + 1)).sum() / exits.sum())
+            if exits.sum() else None,
+            # Artifacts from before the counted costs recorded measured seconds
+            'estimated_speedup': self._cascade_speedup(
+                exits, meta.get('cost_per_row') or meta['seconds_per_row'])
+        }
+
+    def update(self, startups, outcomes, **kwargs):
+        """Fold newly labeled startups into the trained models (see ``update_features``)"""
+        return self.update_features(self.prepare_feature_matrix(startups), outcomes, **kwargs)
+
+    def update_features(self, X_new, y_new, new_trees=10, max_trees=500,
+                        svm_max_samples=5000):
+        """Incrementally train on new labeled rows instead of rebuilding everything
+
+        The scaler's running mean and variance absorb the new rows; the forest's
+        split thresholds and the logistic coefficients are re-expressed for the
+        new scaling, so existing trees and weights keep making the same decisions.
+        Then the forest grows by ``new_trees`` warm-started trees (oldest dropped
+        beyond ``max_trees``), the logistic model is warm-started from its current
+        coefficients, and the decision tree and SVM (on at most ``svm_max_samples``
+        rows) are refit. The new rows are assigned to a single CV fold and only
+        that fold is re-scored; the other folds keep their last scores.
+        """
+        if self.training_data is None:
+            raise ValueError('No training state; train the predictor or load it with '
+                             'from_training_state first')
+        X_new = np.asarray(X_new, dtype=np.float64).reshape(-1, len(self.feature_names))
+        y_new = np.asarray(y_new).astype(int)
+        data = self.training_data
+        n_folds = int(data['folds'].max()) + 1
+        fold = data['updates'] % n_folds
+        data['X'] = np.vstack([data['X'], X_new])
+        data['y'] = np.concatenate([data['y'], y_new])
+        data['folds'] = np.concatenate([data['folds'], np.full(len(y_new), fold, dtype=np.int32)])
+        data['updates'] += 1
+        # Training states from before out-of-fold predictions were kept have none
+        oof = data.get('oof')
+        if oof is not None:
+            for name in oof:
+                oof[name] = np.concatenate([oof[name], np.full(len(y_new), np.nan)])
+        for svm in data['svm'].values():
+            svm['decision'] = np.concatenate([svm['decision'], np.full(len(y_new), np.nan)])
+        X, y = data['X'], data['y']
+
+        old_mean = self.fitted_scaler.mean_.copy()
+        old_scale = self.fitted_scaler.scale_.copy()
+        self.fitted_scaler.partial_fit(X_new)
+        X_scaled = self.fitted_scaler.transform(X)
+
+        for name, model in self.estimators.items():
+            started = time.perf_counter()
+            if hasattr(model, 'estimators_'):
+                self._rescale_trees(model, old_mean, old_scale)
+                if len(model.estimators_) + new_trees > max_trees:
+                    model.estimators_ = model.estimators_[-(max_trees - new_trees):]
+                seed = model.random_state
+                model.set_params(warm_start=True,
+                                 n_estimators=len(model.estimators_) + new_trees,
+                                 # A fresh seed stream, so new trees never repeat dropped ones
+                                 random_state=seed + 1 if isinstance(seed, int) else seed)
+                model.fit(X_scaled, y)
+            elif hasattr(model, 'coef_'):
+                self._rescale_linear(model, old_mean, old_scale)
+                model.set_params(warm_start=True)
+                model.fit(X_scaled, y)
+            elif hasattr(model, 'support_vectors_') and len(y) > svm_max_samples:
+                sample = np.random.RandomState(data['updates']).choice(
+                    len(y), svm_max_samples, replace=False)
+                model.fit(X_scaled[sample], y[sample])
+                data['svm'][name]['rows'] = sample
+            else:
+                model.fit(X_scaled, y)
+            fitted = time.perf_counter()
+
+            max_train_rows = svm_max_samples if hasattr(model, 'support_vectors_') else None
+            accuracy, probabilities = self._fold_score(model, X_scaled, y, data['folds'], fold,
+                                                       max_train_rows)
+            self.fold_scores[name][fold] = accuracy
+            if name in data['svm']:
+                data['svm'][name]['decision'][data['folds'] == fold] = probabilities
+                self._calibrate_svm(name)
+            elif oof is not None:
+                oof[name][data['folds'] == fold] = probabilities
+            self._record_accuracy(name)
+            self.training_stats[name] = {
+                'fit_seconds': fitted - started,
+                'cv_seconds': time.perf_counter() - fitted,
+                'cv_folds_rerun': [int(fold)]
             }
+
+        self.metadata['model_version'] = self.metadata.get('model_version', 1) + 1
+        self.metadata['updated_at'] = datetime.now(timezone.utc).isoformat()
+        self._record_training_metadata()
+        self._compile()
+        if oof is not None:
+            method = self.metadata.get('aggregation', {}).get('method', DEFAULT_AGGREGATION)
+            self._refit_aggregation(method)
+        self._record_drift_reference()
+        return self.metadata
+
+    def _rescale_trees(self, forest, old_mean, old_scale):
+        """Move split thresholds from the old scaling to the current scaler's"""
+        mean, scale = self.fitted_scaler.mean_, self.fitted_scaler.scale_
+        for tree in forest.estimators_:
+            t = tree.tree_
+            internal = t.children_left != -1
+            f = t.feature[internal]
+            raw = old_mean[f] + old_scale[f] * t.threshold[internal]
+            t.threshold[internal] = (raw - mean[f]) / scale[f]
+
+    def _rescale_linear(self, model, old_mean, old_scale):
+        """Re-express logistic weights so the decision function is unchanged"""
+        mean, scale = self.fitted_scaler.mean_, self.fitted_scaler.scale_
+        model.intercept_ = model.intercept_ + (model.coef_ * (mean - old_mean) / old_scale).sum(axis=1)
+        model.coef_ = model.coef_ * scale / old_scale
+
+    def save_training_state(self, path):
+        """Pickle the estimators and training data that ``update`` needs"""
+        state = {
+            'feature_names': self.feature_names,
+            'model_params': self.model_params,
+            'estimators': self.estimators,
+            'fitted_scaler': self.fitted_scaler,
+            'training_data': self.training_data,
+            'fold_scores': self.fold_scores,
+            'aggregator': self.aggregator,
+            'cascade': self.cascade,
+            'training_stats': self.training_stats,
+            'metadata': {k: v for k, v in self.metadata.items()
+                         if k not in ('components', 'checksum', 'created_at')}
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.pkl.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def from_training_state(cls, path):
+        """Restore a trainable predictor saved with ``save_training_state``"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if 'svm' not in state['training_data']:
+            raise ValueError(f"Training state {path} predates the SVM's own Platt scaling; "
+                             "retrain to replace it")
+        predictor = cls(state['model_params'])
+        predictor.feature_names = state['feature_names']
+        predictor.estimators = state['estimators']
+        predictor.fitted_scaler = state['fitted_scaler']
+        predictor.training_data = state['training_data']
+        predictor.fold_scores = state['fold_scores']
+        predictor.aggregator = state.get('aggregator')
+        predictor.cascade = state.get('cascade')
+        predictor.training_stats = state['training_stats']
+        predictor.metadata = state['metadata']
+        for name in predictor.fold_scores:
+            predictor._record_accuracy(name)
+        predictor._compile()
+        return predictor
+
+    def _compile(self):
+        """Serve predictions from numpy copies of the fitted estimators"""
+        self.scaler = compile_estimator(self.fitted_scaler)
+        self.models = {
+            name: compile_estimator(model, **self._compile_args(name))
+            for name, model in self.estimators.items()
+        }
+        if FOREST_MODEL_NAME in self.models and self.metadata.get('forest_compression'):
+            # The forest was pruned and quantized in place; keep it packed (see forest_compression.py)
+            self.models[FOREST_MODEL_NAME] = CompressedTreeEnsemble.pack(
+                self.models[FOREST_MODEL_NAME])
+        self._explainer = None
+        # A student distilled from earlier models no longer matches these
+        self.student = None
+        self.metadata.pop('student', None)
+        if FOREST_MODEL_NAME in self.estimators:
+            # feature_importances_ averages over every tree on each access, so read it once
+            self.feature_importances = np.asarray(
+                self.estimators[FOREST_MODEL_NAME].feature_importances_, dtype=np.float64)
+        self._index_features()
+
+    def _compile_args(self, name):
+        """What compiling an SVM needs besides the estimator: its training rows
+        (to resolve gamma) and its Platt sigmoid"""
+        svm = self.training_data['svm'].get(name)
+        if svm is None:
+            return {}
+        X = self.fitted_scaler.transform(self.training_data['X'])
+        if svm['rows'] is not None:
+            X = X[svm['rows']]
+        return {'X': X, 'sigmoid': svm['sigmoid']}
+
+    def _index_features(self):
+        """Precompute the name -> column map and the importance ranking"""
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        if self.feature_importances is None:
+            self.importance_order = None
+            self._ranked_importances = []
+            return
+        # Stable sort keeps feature order for ties, as sorted(..., reverse=True) did
+        self.importance_order = np.argsort(-self.feature_importances, kind='stable')
+        self._ranked_importances = [
+            (self.feature_names[i], self.feature_importances[i]) for i in self.importance_order
+        ]
+
+    def to_arrays(self):
+        """Flatten the trained predictor into numpy arrays plus JSON metadata"""
+        components = {'scaler': self.scaler}
+        components.update({MODEL_KEYS[name]: model for name, model in self.models.items()})
+        if self.aggregator is not None:
+            components['aggregator'] = self.aggregator
+        if self.cascade is not None:
+            components['cascade'] = self.cascade
+        if self.student is not None:
+            components['student'] = self.student
+        arrays, manifest = flatten_components(components)
+        meta = dict(self.metadata)
+        meta.update({
+            'dtype': self.dtype.name,
+            'feature_names': self.feature_names,
+            'model_names': list(self.models),
+            'model_accuracies': {
+                name: {k: float(v) for k, v in acc.items()}
+                for name, acc in self.model_accuracies.items()
+            },
+            'components': manifest
+        })
+        if self.feature_importances is not None:
+            meta['feature_importances'] = [float(v) for v in self.feature_importances]
+        return arrays, meta
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        """Build an inference-only predictor from ``to_arrays`` output"""
+        components = build_components(arrays, meta['components'])
+        predictor = cls()
+        predictor.scaler = components['scaler']
+        predictor.models = {
+            name: components[MODEL_KEYS[name]] for name in meta['model_names']
+        }
+        predictor.aggregator = components.get('aggregator')
+        predictor.cascade = components.get('cascade')
+        predictor.student = components.get('student')
+        predictor.feature_names = meta['feature_names']
+        predictor.model_accuracies = meta['model_accuracies']
+        if 'feature_importances' in meta:
+            predictor.feature_importances = np.asarray(meta['feature_importances'])
+        predictor.dtype = np.dtype(meta.get('dtype', 'float64'))
+        predictor.metadata = meta
+        predictor._index_features()
+        return predictor
+
+    def astype(self, dtype):
+        """Inference-only copy that scores in ``dtype`` (e.g. float32) end to end
+
+        Feature matrices, coefficients and tree/SVM arrays are cast, which
+        halves their memory and bandwidth in float32. The scaler keeps float64
+        statistics and only its output is cast (see ``_scale``), and tree
+        thresholds are rounded down to the nearest float32, so split decisions
+        only change for inputs within a float32 rounding step of a threshold.
+        Logistic, SVM and aggregation arithmetic runs in ``dtype``, so their
+        probabilities move slightly; ``precision_report`` measures by how much.
+        """
+        predictor = type(self).from_arrays(*self.to_arrays())
+        predictor.dtype = np.dtype(dtype)
+        predictor.scaler = self.scaler.astype(np.float64)
+        predictor.models = {name: model.astype(predictor.dtype)
+                            for name, model in self.models.items()}
+        if self.aggregator is not None:
+            predictor.aggregator = self.aggregator.astype(predictor.dtype)
+        if self.cascade is not None:
+            predictor.cascade = self.cascade.astype(predictor.dtype)
+        if self.student is not None:
+            predictor.student = self.student.astype(predictor.dtype)
+        predictor.metadata['dtype'] = predictor.dtype.name
+        return predictor
+
+    @property
+    def explainer(self):
+        """Per-row explanation engine, built (and imported) on first use"""
+        from explanations import PredictionExplainer
+
+        if self._explainer is None:
+            self._explainer = PredictionExplainer(self)
+        return self._explainer
+
+    def save_artifact(self, path=DEFAULT_ARTIFACT_PATH):
+        """Write the trained predictor to a slim numpy artifact"""
+        arrays, meta = self.to_arrays()
+        self.metadata = write_artifact(path, arrays, meta)
+        return self.metadata
+
+    @classmethod
+    def from_artifact(cls, path=DEFAULT_ARTIFACT_PATH):
+        """Load a predictor for inference only; scikit-learn is not imported"""
+        return cls.from_arrays(*read_artifact(path))
     
     def prepare_features(self, startup_data):
         """Prepare features from startup data for prediction"""
         
-        funding_normalized = min(startup_data.get('funding_amount', 0) / 10000000, 1.0)
+        funding_normalized = min(startup_data.get('funding_amount', 0) / FUNDING_SCALE, 1.0)
         
         team_size = startup_data.get('team_size', 5)
         
         founding_year = startup_data.get('founding_year', 2024)
-        founding_year_age = 2024 - founding_year
+        founding_year_age = REFERENCE_YEAR - founding_year
         
         population_density = self._calculate_population_density(
             startup_data.get('country'),
@@ -135,37 +863,333 @@ class StartupSuccessPredictor:
         
         return features
     
-    def predict(self, startup_data):
-        """Make predictions using ensemble of models"""
-        features = self.prepare_features(startup_data)
+    def prepare_feature_matrix(self, startups):
+        """Prepare the feature matrix for a batch of startups"""
+        return self._check_finite(np.array([
+            [features[name] for name in self.feature_names]
+            for features in map(self.prepare_features, startups)
+        ], dtype=self.dtype).reshape(-1, len(self.feature_names)))
+
+    def _check_finite(self, feature_array):
+        """Raise a ValueError naming the features that are missing (null) or not finite"""
+        finite = np.isfinite(feature_array)
+        if not finite.all():
+            rows, columns = np.nonzero(~finite)
+            names = [self.feature_names[i] for i in np.unique(columns)]
+            rows = np.unique(rows)
+            raise ValueError(f"Missing or non-finite values for {', '.join(names)} "
+                             f"(row{'s' if len(rows) > 1 else ''} "
+                             f"{', '.join(map(str, rows[:10]))})")
+        return feature_array
+
+    def _timed(self, stage, fn, *args, rows=1):
+        """Call ``fn(*args)``, timing it only when instrumentation is attached"""
+        if self.instrumentation is None:
+            return fn(*args)
+        return self.instrumentation.time(stage, fn, *args, rows=rows)
+
+    def _score(self, feature_array):
+        """Scale a feature matrix and score it with every model
+
+        Returns the models' success probabilities (%) and the forest's
+        uncertainty bands (None without a forest).
+        """
+        rows = len(feature_array)
+        feature_array_scaled = self._timed('scaler.transform', self._scale, feature_array,
+                                           rows=rows)
+        probabilities, bands = {}, None
+        for name, model in self.models.items():
+            if name == FOREST_MODEL_NAME:
+                probability, bands = self._forest_proba(feature_array_scaled)
+            else:
+                probability = self._timed(PROBA_STAGES.get(name, name), model.predict_proba,
+                                          feature_array_scaled, rows=rows)[:, 1]
+            probabilities[name] = probability * 100
+        return probabilities, bands
+
+    def _scale(self, feature_array):
+        """Standardize in float64, then cast the scaled features to ``dtype``
+
+        Tree split thresholds were learned on float32 casts of float64-scaled
+        features, so this keeps float32 split decisions equal to float64 ones.
+        """
+        return self.scaler.transform(np.asarray(feature_array, dtype=np.float64)).astype(
+            self.dtype, copy=False)
+
+    def _forest_proba(self, feature_array_scaled):
+        """Forest success probabilities (in [0, 1]) and bands (%), from one pass over the trees"""
+        rows = len(feature_array_scaled)
+        forest = self.models[FOREST_MODEL_NAME]
+        # Artifacts without node covers get unsmoothed bands
+        with_cover = forest.cover is not None
+        scored = self._timed(PROBA_STAGES[FOREST_MODEL_NAME], forest.predict_tree_proba,
+                             feature_array_scaled, with_cover, rows=rows)
+        tree_proba, cover = scored if with_cover else (scored, None)
+        return tree_proba.mean(axis=1), self._timed('forest_bands', forest_bands, tree_proba,
+                                                    cover, rows=rows)
+
+    def _aggregate(self, stacked):
+        """Ensemble probability (%) of every row of the stacked model probabilities"""
+        if self.aggregator is None:
+            return stacked.mean(axis=1)
+        return self._timed('aggregate', self.aggregator.combine, stacked / 100,
+                           rows=len(stacked)) * 100
+
+    def _student_score(self, feature_array):
+        """Score a feature matrix with the distilled student (unscaled features)"""
+        if self.student is None:
+            raise ValueError("No distilled model in this artifact; run 'python main.py distill' first")
+        feature_array = np.asarray(feature_array, dtype=self.dtype)
+        return self._timed('predict_proba.student', self.student.predict_proba, feature_array,
+                           rows=len(feature_array))[:, 1] * 100
+
+    def _cascade_score(self, feature_array):
+        """Score a feature matrix model by model, stopping early per row (see ``_run_cascade``)"""
+        if self.cascade is None:
+            raise ValueError('No early-exit cascade in this artifact; retrain it first')
+        rows = len(feature_array)
+        feature_array_scaled = self._timed('scaler.transform', self._scale, feature_array,
+                                           rows=rows)
+        names = list(self.models)
+        bands = ({f'p{q}': np.full(rows, np.nan) for q in BAND_PERCENTILES}
+                 if FOREST_MODEL_NAME in self.models else None)
+
+        def score_model(j, indices):
+            if names[j] == FOREST_MODEL_NAME:
+                probability, reached = self._forest_proba(feature_array_scaled[indices])
+                for key, band in reached.items():
+                    bands[key][indices] = band
+                return probability
+            return self._timed(PROBA_STAGES.get(names[j], names[j]),
+                               self.models[names[j]].predict_proba,
+                               feature_array_scaled[indices], rows=len(indices))[:, 1]
+
+        probability, P, stage, margin = self._run_cascade(score_model, rows,
+                                                          self.cascade_tolerance)
+        exits = np.bincount(stage, minlength=len(names))
+        with self._cascade_lock:
+            for j, count in zip(self.cascade.order, exits):
+                self.cascade_exits[names[j]] = self.cascade_exits.get(names[j], 0) + int(count)
+        if self.instrumentation is not None:
+            for j, count in zip(self.cascade.order, exits):
+                if count:
+                    self.instrumentation.increment(f'cascade_exit.{MODEL_KEYS.get(names[j], j)}',
+                                                   int(count))
+        # Rows that exited early report their estimate's margin instead of the model spread
+        spread = np.where(stage < len(names) - 1, margin * 100, np.nanstd(P * 100, axis=1))
+        return (probability * 100, spread, {name: P[:, j] * 100 for j, name in enumerate(names)},
+                bands)
+
+    def _student_fidelity(self):
+        # Empty while distill() is still measuring a fresh student
+        return self.metadata.get('student', {}).get('fidelity', {})
+
+    def _student_accuracies(self):
+        accuracy = self._student_fidelity().get('student_accuracy', float('nan'))
+        return {FAST_MODEL_NAME: {'mean': accuracy, 'std': 0.0}}
+
+    def predict(self, startup_data, mode='full', explain=False):
+        """Make predictions using ensemble of models
+
+        With ``explain=True`` the result's ``explanation`` breaks the full
+        ensemble's probability down by feature (see
+        ``explanations.PredictionExplainer``); otherwise it is None.
+
+        ``mode='fast'`` scores with the distilled student instead of the four
+        models (see distillation.py); its confidence interval is the student's
+        mean absolute deviation from the ensemble and no explanation is given.
+        ``mode='cascade'`` scores the models cheapest first and stops once the
+        verdict (see ``VERDICT_THRESHOLDS``) is settled; models not reached are
+        left out of ``model_predictions`` (see ``fit_cascade`` and
+        ``cascade_stats``). The guarantee is statistical, not exact: a row exits
+        when its estimate, give or take an error margin that held for 99% of
+        the out-of-fold training rows, stays on one side of every threshold,
+        or crosses one by at most ``cascade_tolerance`` points. On rows like the
+        training data about 99% of verdicts match full scoring (held-out
+        ``metadata['cascade']['decision_agreement']``); rows unlike them may
+        match less often.
+
+        ``uncertainty_bands`` holds the percentiles of the forest's (leaf-smoothed)
+        per-tree probabilities (see ``forest_bands``), or None when the forest
+        was not scored.
+        """
+        if mode not in PREDICTION_MODES:
+            raise ValueError(f"Unknown prediction mode '{mode}'; expected one of {PREDICTION_MODES}")
+        if self.instrumentation is not None:
+            self.instrumentation.increment('predictions')
+            return self.instrumentation.time('predict', self._predict, startup_data, mode,
+                                             explain)
+        return self._predict(startup_data, mode, explain)
+
+    def _predict(self, startup_data, mode='full', explain=False):
+        started = time.perf_counter()
+        features = self._timed('prepare_features', self.prepare_features, startup_data)
         feature_values = [features[name] for name in self.feature_names]
-        feature_array = np.array(feature_values).reshape(1, -1)
-        
-        feature_array_scaled = self.scaler.transform(feature_array)
+        feature_array = self._check_finite(
+            np.array(feature_values, dtype=self.dtype).reshape(1, -1))
         
-        predictions = {}
-        probabilities = {}
-        
-        for name, model in self.models.items():
-            pred = model.predict(feature_array_scaled)[0]
-            prob = model.predict_proba(feature_array_scaled)[0]
+        if mode == 'fast':
+            probability = self._student_score(feature_array)[0]
+            return self._monitored({
+                'success_probability': probability,
+                'confidence_interval': self._student_fidelity().get('mae', 0.0),
+                'model_predictions': {FAST_MODEL_NAME: probability},
+                'feature_importance': self._timed('feature_importance',
+                                                  self._calculate_feature_importance, features),
+                'explanation': None,
+                'uncertainty_bands': None,
+                'model_accuracies': self._student_accuracies()
+            }, feature_array, [startup_data], mode, started)
+
+        if mode == 'cascade':
+            probability, spread, scores, bands = self._cascade_score(feature_array)
+            ensemble_probability, confidence_interval = probability[0], spread[0]
+            probabilities = {name: prob[0] for name, prob in scores.items()
+                             if not np.isnan(prob[0])}
+        else:
+            scores, bands = self._score(feature_array)
+            probabilities = {name: prob[0] for name, prob in scores.items()}
             
-            predictions[name] = pred
-            probabilities[name] = prob[1] * 100
+            ensemble_probability = self._aggregate(
+                np.array([list(probabilities.values())], dtype=self.dtype))[0]
+            
+            confidence_interval = np.std(list(probabilities.values()))
         
-        ensemble_probability = np.mean(list(probabilities.values()))
+        feature_importance = self._timed('feature_importance',
+                                         self._calculate_feature_importance, features)
         
-        confidence_interval = np.std(list(probabilities.values()))
+        explanation = (self._timed('explain', self.explainer.explain_row, feature_array[0])
+                       if explain else None)
         
-        feature_importance = self._calculate_feature_importance(features)
+        if bands is not None and not np.isnan(next(iter(bands.values()))[0]):
+            bands = {key: band[0] for key, band in bands.items()}
+        else:
+            bands = None
         
-        return {
+        return self._monitored({
             'success_probability': ensemble_probability,
             'confidence_interval': confidence_interval,
             'model_predictions': probabilities,
             'feature_importance': feature_importance,
+            'explanation': explanation,
+            'uncertainty_bands': bands,
             'model_accuracies': self.model_accuracies
-        }
+        }, feature_array, [startup_data], mode, started)
+
+    def predict_batch(self, startups, feature_importance=False, explain=False, mode='full'):
+        """Make ensemble predictions for many startups in one pass"""
+        started = time.perf_counter()
+        feature_array = self._prepared_matrix(startups)
+        return self._monitored(
+            self.predict_features(feature_array, feature_importance, explain, mode),
+            feature_array, startups, mode, started)
+
+    def _prepared_matrix(self, startups):
+        return self._timed('prepare_feature_matrix', self.prepare_feature_matrix, startups,
+                           rows=len(startups))
+
+    def _monitored(self, result, feature_array, startups, mode, started):
+        """Feed a prediction result to the drift monitor and audit log, if attached"""
+        if self.audit_log is not None:
+            self.audit_log.record(self, startups, feature_array, result, mode,
+                                  time.perf_counter() - started)
+        if self.monitor is not None:
+            self._timed('monitor', self.monitor.observe, feature_array,
+                        np.atleast_1d(result['success_probability']), startups,
+                        rows=len(feature_array))
+        return result
+
+    def predict_features(self, feature_array, feature_importance=False, explain=False,
+                         mode='full'):
+        """Make ensemble predictions for an already prepared feature matrix
+
+        With ``feature_importance=True`` the result also carries importance-weighted
+        contributions per row (see ``calculate_feature_contributions``), and with
+        ``explain=True`` per-row explanations (see ``explanations.PredictionExplainer``).
+        ``mode='fast'`` scores with the distilled student and ``mode='cascade'``
+        stops early per row, as in ``predict``; cascade-mode ``model_predictions``
+        and ``uncertainty_bands`` are NaN for the models a row did not reach.
+        """
+        if mode not in PREDICTION_MODES:
+            raise ValueError(f"Unknown prediction mode '{mode}'; expected one of {PREDICTION_MODES}")
+        if self.instrumentation is not None:
+            self.instrumentation.increment('predictions', len(feature_array))
+            return self.instrumentation.time('predict_features', self._predict_features,
+                                             feature_array, feature_importance, explain, mode,
+                                             rows=len(feature_array))
+        return self._predict_features(feature_array, feature_importance, explain, mode)
+
+    def _predict_features(self, feature_array, feature_importance=False, explain=False,
+                          mode='full'):
+        if mode == 'fast':
+            probability = self._student_score(feature_array)
+            result = {
+                'success_probability': probability,
+                'confidence_interval': np.full(len(probability),
+                                               self._student_fidelity().get('mae', 0.0)),
+                'model_predictions': {FAST_MODEL_NAME: probability},
+                'uncertainty_bands': None
+            }
+        elif mode == 'cascade':
+            probability, spread, probabilities, bands = self._cascade_score(feature_array)
+            result = {
+                'success_probability': probability,
+                'confidence_interval': spread,
+                'model_predictions': probabilities,
+                'uncertainty_bands': bands
+            }
+        else:
+            probabilities, bands = self._score(feature_array)
+            stacked = np.column_stack(list(probabilities.values()))
+            
+            result = {
+                'success_probability': self._aggregate(stacked),
+                'confidence_interval': stacked.std(axis=1),
+                'model_predictions': probabilities,
+                'uncertainty_bands': bands
+            }
+        if feature_importance:
+            result['feature_importance'] = self._timed(
+                'feature_importance', self.calculate_feature_contributions,
+                feature_array, rows=len(feature_array))
+        if explain:
+            result['explanation'] = self._timed('explain', self.explainer.explain_features,
+                                                feature_array, rows=len(feature_array))
+        return result
+    
+    def sensitivity(self, startup_data, grids=None):
+        """Response curves of the prediction as single inputs vary over grids
+
+        ``grids`` maps startup fields to the values to try, e.g.
+        ``{'funding_amount': np.linspace(0, 10000000, 100)}`` (default
+        ``SENSITIVITY_GRIDS``); every other field keeps its value from
+        ``startup_data``. The variants of all grids are stacked into one matrix
+        and scored in a single batch pass.
+        """
+        grids = SENSITIVITY_GRIDS if grids is None else grids
+        grids = {field: list(values) for field, values in grids.items()}
+        variants = [
+            dict(startup_data, **{field: value})
+            for field, values in grids.items() for value in values
+        ]
+        # Variants are not traffic, so they skip the drift monitor and audit log
+        result = self._timed('sensitivity',
+                             lambda: self.predict_features(self._prepared_matrix(variants)),
+                             rows=len(variants))
+        curves = {}
+        start = 0
+        for field, values in grids.items():
+            rows = slice(start, start + len(values))
+            curves[field] = {
+                'values': np.asarray(values),
+                'success_probability': result['success_probability'][rows],
+                'confidence_interval': result['confidence_interval'][rows],
+                'model_predictions': {
+                    name: probs[rows] for name, probs in result['model_predictions'].items()
+                }
+            }
+            start += len(values)
+        return curves
     
     def _calculate_population_density(self, country, state, city):
         """Calculate population density score"""
@@ -316,20 +1340,213 @@ class StartupSuccessPredictor:
     
     def _calculate_feature_importance(self, features):
         """Calculate feature importance for explanation"""
-        importance = {}
-        
-        for feature_name, value in features.items():
-            if 'Random Forest' in self.models:
-                rf_model = self.models['Random Forest']
-                feature_idx = self.feature_names.index(feature_name)
-                importance[feature_name] = {
-                    'value': value,
-                    'importance': rf_model.feature_importances_[feature_idx],
-                    'normalized_value': value
-                }
-        
-        sorted_importance = dict(sorted(importance.items(), 
-                                       key=lambda x: x[1]['importance'], 
-                                       reverse=True))
-        
-        return sorted_importance
+        return {
+            feature_name: {
+                'value': features[feature_name],
+                'importance': importance,
+                'normalized_value': features[feature_name]
+            }
+            for feature_name, importance in self._ranked_importances
+        }
+
+    def calculate_feature_contributions(self, feature_array):
+        """Importance-weighted contributions for a batch, most important feature first
+
+        Each contribution is the feature's standardized value scaled by its global
+        importance, so its sign shows whether the row sits above or below the
+        training average for that feature.
+        """
+        if self.feature_importances is None:
+            return None
+        order = self.importance_order
+        scaled = self._scale(feature_array)[:, order]
+        return {
+            'features': [self.feature_names[i] for i in order],
+            'importance': self.feature_importances[order],
+            'contributions': scaled * self.feature_importances[order]
+        }
+
+
+def forest_bands(tree_proba, leaf_cover=None, prior_rows=LEAF_PRIOR_ROWS):
+    """Percentile bands (%) of a forest's success probability across its trees
+
+    ``tree_proba`` holds every tree's probability for every row and
+    ``leaf_cover`` the training rows behind each of those leaves (see
+    ``TreeEnsembleModel.predict_tree_proba``). Fully grown trees mostly end in
+    pure leaves, so their raw probabilities are 0 or 1 and the percentiles
+    would span 0-100% for almost every row. Each leaf is therefore smoothed as
+    if it also held ``prior_rows`` rows at the forest's probability for that
+    row: a leaf backed by a handful of startups moves a tree's probability
+    only part of the way from the forest's. Keys are ``'p5'`` etc. for
+    ``BAND_PERCENTILES``.
+    """
+    if leaf_cover is not None:
+        forest = tree_proba.mean(axis=1, keepdims=True)
+        leaf_cover = np.asarray(leaf_cover, dtype=np.float64)
+        tree_proba = (leaf_cover * tree_proba + prior_rows * forest) / (leaf_cover + prior_rows)
+    bands = np.percentile(tree_proba, BAND_PERCENTILES, axis=1) * 100
+    return {f'p{q}': band for q, band in zip(BAND_PERCENTILES, bands)}
+
+
+def _verdict(probability):
+    """Verdict band (0 below the lowest threshold) of every success probability (%)"""
+    return np.searchsorted(VERDICT_THRESHOLDS, probability, side='right')
+
+
+def fit_sigmoid(decision, outcomes, max_iter=100, min_step=1e-10, eps=1e-5):
+    """Platt's sigmoid ``(a, b)``, P(success) = 1 / (1 + exp(a * f + b)), for decision values f
+
+    Newton's method with backtracking on the regularized targets of Platt
+    (1999) as improved by Lin, Lin and Weng (2007), the fit libsvm uses.
+    """
+    f = np.asarray(decision, dtype=np.float64)
+    y = np.asarray(outcomes).astype(int)
+    n_positive = y.sum()
+    n_negative = len(y) - n_positive
+    t = np.where(y == 1, (n_positive + 1.0) / (n_positive + 2.0), 1.0 / (n_negative + 2.0))
+
+    def loss(a, b):
+        z = f * a + b
+        return float((t * z + np.logaddexp(0, -z)).sum())
+
+    a, b = 0.0, np.log((n_negative + 1.0) / (n_positive + 1.0))
+    value = loss(a, b)
+    for _ in range(max_iter):
+        p = 1.0 / (1.0 + np.exp(f * a + b))
+        d1, d2 = t - p, p * (1.0 - p)
+        g1, g2 = (f * d1).sum(), d1.sum()
+        if abs(g1) < eps and abs(g2) < eps:
+            break
+        # Hessian, with a small ridge so it stays positive definite
+        h11, h22, h21 = (f * f * d2).sum() + 1e-12, d2.sum() + 1e-12, (f * d2).sum()
+        det = h11 * h22 - h21 * h21
+        da, db = -(h22 * g1 - h21 * g2) / det, -(-h21 * g1 + h11 * g2) / det
+        gd = g1 * da + g2 * db
+        step = 1.0
+        while step >= min_step:
+            new_value = loss(a + step * da, b + step * db)
+            if new_value < value + 1e-4 * step * gd:
+                a, b, value = a + step * da, b + step * db, new_value
+                break
+            step /= 2
+        else:
+            break
+    return float(a), float(b)
+
+
+def _probability_metrics(probability, outcomes, bins=10):
+    """Accuracy, Brier score, log loss and expected calibration error"""
+    p = np.clip(np.asarray(probability, dtype=np.float64), 1e-6, 1 - 1e-6)
+    y = np.asarray(outcomes).astype(int)
+    bin_index = np.minimum((p * bins).astype(int), bins - 1)
+    counts = np.bincount(bin_index, minlength=bins)
+    gaps = np.abs(np.bincount(bin_index, p - y, minlength=bins))
+    return {
+        'accuracy': float(((p > 0.5) == y).mean()),
+        'brier': float(((p - y) ** 2).mean()),
+        'log_loss': float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean()),
+        # Mean |predicted - observed| per probability bin, weighted by its rows
+        'ece': float(gaps[counts > 0].sum() / len(p))
+    }
+
+
+def precision_report(reference, candidate, feature_array, outcomes=None):
+    """How far ``candidate`` (e.g. a float32 copy) strays from ``reference``
+
+    Compares every model and the ensemble on the same rows: the mean and
+    largest probability difference (percentage points), how often the success
+    decision (> 50%) agrees, and accuracy against ``outcomes`` if given. These
+    are measurements on ``feature_array`` only; the one guarantee ``astype``
+    gives is that tree split decisions match away from float32 rounding of
+    the thresholds.
+    """
+    results = []
+    for predictor in (reference, candidate):
+        result = predictor.predict_features(feature_array)
+        scores = dict(result['model_predictions'], Ensemble=result['success_probability'])
+        results.append({name: np.asarray(p, dtype=np.float64) for name, p in scores.items()})
+    report = {'rows': len(feature_array), 'models': {}}
+    for name, expected in results[0].items():
+        actual = results[1][name]
+        entry = {
+            'mean_abs_diff': float(np.abs(actual - expected).mean()),
+            'max_abs_diff': float(np.abs(actual - expected).max()),
+            'decision_agreement': float(((actual > 50) == (expected > 50)).mean())
+        }
+        if outcomes is not None:
+            outcomes = np.asarray(outcomes).astype(int)
+            entry['accuracy_reference'] = float(((expected > 50) == outcomes).mean())
+            entry['accuracy_candidate'] = float(((actual > 50) == outcomes).mean())
+        report['models'][name] = entry
+    report['model_bytes'] = [sum(a.nbytes for a in p.to_arrays()[0].values())
+                             for p in (reference, candidate)]
+    return report
+
+
+def compact_artifact(path, output, feature_array, outcomes=None, dtype=np.float32,
+                     min_agreement=0.99):
+    """Write a ``dtype`` copy of an artifact once it matches the original closely enough
+
+    ``min_agreement`` is the smallest acceptable share of rows whose ensemble
+    success decision is unchanged; the measured report is stored in the new
+    artifact's metadata under ``precision_report``.
+    """
+    reference = StartupSuccessPredictor.from_artifact(path)
+    compact = reference.astype(dtype)
+    report = precision_report(reference, compact, feature_array, outcomes)
+    agreement = report['models']['Ensemble']['decision_agreement']
+    if agreement < min_agreement:
+        raise ValueError(f"{compact.dtype.name} predictions agree on {agreement:.2%} of rows, "
+                         f"below the required {min_agreement:.2%}")
+    compact.metadata['precision_report'] = report
+    compact.save_artifact(output)
+    return report
+
+
+def assign_folds(y, cv_folds=5):
+    """Fold id of every row, as in the splits cross_val_score(cv=cv_folds) uses"""
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = np.empty(len(y), dtype=np.int32)
+    for k, (_, test) in enumerate(StratifiedKFold(cv_folds).split(np.zeros(len(y)), y)):
+        folds[test] = k
+    return folds
+
+
+def training_state_path(artifact_path):
+    """Sidecar holding the training state of an artifact"""
+    return os.path.splitext(artifact_path)[0] + '.training.pkl'
+
+
+def load_or_train_predictor(path=DEFAULT_ARTIFACT_PATH):
+    """Load the predictor artifact, training and saving it first if missing"""
+    if not os.path.exists(path):
+        predictor = StartupSuccessPredictor()
+        predictor.train_models()
+        predictor.save_artifact(path)
+        predictor.save_training_state(training_state_path(path))
+    return StartupSuccessPredictor.from_artifact(path)
+
+
+def update_artifact(startups, outcomes, path=DEFAULT_ARTIFACT_PATH, **kwargs):
+    """Train an artifact's predictor on new outcomes and publish the next version
+
+    The artifact file is replaced atomically, so serving processes (see
+    ``serving.SharedPredictor``) switch to the new version on their next check
+    without downtime.
+    """
+    if not os.path.exists(path):
+        load_or_train_predictor(path)
+    state_path = training_state_path(path)
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(
+            f"No training state at {state_path}; retrain the artifact to enable updates")
+    predictor = StartupSuccessPredictor.from_training_state(state_path)
+    predictor.update(startups, outcomes, **kwargs)
+    if predictor.metadata.get('forest_compression', {}).get('quantized'):
+        from forest_compression import requantize
+
+        requantize(predictor)
+    meta = predictor.save_artifact(path)
+    predictor.save_training_state(training_state_path(path))
+    return meta
@@ -0,0 +1,767 @@
+"""Slim, numpy-only model artifacts for serving predictions.
+
+Fitted scikit-learn estimators are flattened into plain numpy arrays and
+written to a single ``.npz`` file. Loading an artifact and scoring with it
+only needs numpy, so the prediction path never imports scikit-learn.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_KEY = '__meta__'
+
+MODEL_KEYS = {
+    'Logistic Regression': 'logistic_regression',
+    'Decision Tree': 'decision_tree',
+    'Random Forest': 'random_forest',
+    'SVM': 'svm'
+}
+
+# Scoring cost of one tree split comparison in multiply-adds: each level of
+# ``TreeEnsembleModel.apply`` gathers node arrays per row, which in numpy costs
+# about as much as 20 multiply-adds of a BLAS matrix product
+TREE_COMPARISON_COST = 20
+
+
+def _positive_class_index(estimator):
+    """Column of predict_proba holding the success (class 1) probability"""
+    return list(estimator.classes_).index(1)
+
+
+class Standardizer:
+    """Numpy equivalent of a fitted StandardScaler"""
+
+    kind = 'standardizer'
+
+    def __init__(self, mean, scale):
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_estimator(cls, scaler):
+        return cls(np.asarray(scaler.mean_, dtype=np.float64),
+                   np.asarray(scaler.scale_, dtype=np.float64))
+
+    def transform(self, X):
+        return (X - self.mean) / self.scale
+
+    def astype(self, dtype):
+        return type(self)(self.mean.astype(dtype), self.scale.astype(dtype))
+
+    def to_arrays(self):
+        return {'mean': self.mean, 'scale': self.scale}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['mean'], arrays['scale'])
+
+
+class LogisticModel:
+    """Binary logistic regression scored with a single matrix-vector product"""
+
+    kind = 'logistic'
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        coef = np.asarray(estimator.coef_[0], dtype=np.float64)
+        intercept = np.asarray(estimator.intercept_[:1], dtype=np.float64)
+        if _positive_class_index(estimator) == 0:
+            coef, intercept = -coef, -intercept
+        return cls(coef, intercept)
+
+    def decision_function(self, X):
+        return X @ self.coef + self.intercept[0]
+
+    def predict_proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return (self.decision_function(X) > 0).astype(int)
+
+    def cost_per_row(self):
+        """Scoring cost of one row in multiply-adds"""
+        return float(self.coef.size)
+
+    def astype(self, dtype):
+        return type(self)(self.coef.astype(dtype), self.intercept.astype(dtype))
+
+    def to_arrays(self):
+        return {'coef': self.coef, 'intercept': self.intercept}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['coef'], arrays['intercept'])
+
+
+class CalibratedAggregator:
+    """Weighted combination of the models' probabilities, then isotonic calibration
+
+    A row's models' success probabilities ``P`` (columns in model order) are
+    combined into ``P @ weights + bias`` and mapped to a calibrated
+    probability by linear interpolation between the isotonic fit's
+    breakpoints ``calibration_x`` -> ``calibration_y`` (clipped at the ends).
+    """
+
+    kind = 'calibrated_aggregator'
+
+    def __init__(self, weights, bias, calibration_x, calibration_y):
+        self.weights = weights
+        self.bias = bias
+        self.calibration_x = calibration_x
+        self.calibration_y = calibration_y
+
+    def score(self, P):
+        return P @ self.weights + self.bias[0]
+
+    def combine(self, P):
+        """Calibrated success probability of every row of ``P``"""
+        return np.interp(self.score(P), self.calibration_x, self.calibration_y)
+
+    def astype(self, dtype):
+        return type(self)(*(array.astype(dtype) for array in (
+            self.weights, self.bias, self.calibration_x, self.calibration_y)))
+
+    def to_arrays(self):
+        return {
+            'weights': self.weights,
+            'bias': self.bias,
+            'calibration_x': self.calibration_x,
+            'calibration_y': self.calibration_y
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['weights'], arrays['bias'], arrays['calibration_x'],
+                   arrays['calibration_y'])
+
+
+class EarlyExitCascade:
+    """Stage-by-stage estimates of the ensemble for early-exit scoring
+
+    Models are scored in ``order`` (indices into the model order). After
+    stage ``k``, i.e. the first ``k + 1`` models, the ensemble's combined
+    score (before calibration) is estimated as ``P @ coef[k] + intercept[k]``,
+    where ``P`` holds the models' success probabilities with zeros for the
+    models not scored yet (``coef[k]`` is zero there too). The calibrated
+    estimate is expected to lie within ``margin[k, b]`` of the final
+    probability, ``b`` being the estimate's bin among ``margin.shape[1]``
+    equal-width probability bins.
+    """
+
+    kind = 'early_exit_cascade'
+
+    def __init__(self, order, coef, intercept, margin):
+        self.order = order
+        self.coef = coef
+        self.intercept = intercept
+        self.margin = margin
+
+    def estimate(self, P, stage):
+        return P @ self.coef[stage] + self.intercept[stage]
+
+    def margin_of(self, probability, stage):
+        bins = self.margin.shape[1]
+        index = np.clip((probability * bins).astype(int), 0, bins - 1)
+        return self.margin[stage, index]
+
+    def astype(self, dtype):
+        return type(self)(self.order, *(array.astype(dtype) for array in (
+            self.coef, self.intercept, self.margin)))
+
+    def to_arrays(self):
+        return {
+            'order': self.order,
+            'coef': self.coef,
+            'intercept': self.intercept,
+            'margin': self.margin
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['order'], arrays['coef'], arrays['intercept'], arrays['margin'])
+
+
+def _flatten_trees(trees, node_value):
+    """Concatenate fitted trees into flat node arrays
+
+    Returns (left, right, feature, threshold, value, roots, cover) with child
+    indices offset into the combined arrays, -1 children marking leaves and
+    ``node_value(tree_)`` as every node's value.
+    """
+    left, right, feature, threshold, value, roots, cover = [], [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        left.append(np.where(is_leaf, -1, t.children_left + offset))
+        right.append(np.where(is_leaf, -1, t.children_right + offset))
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        value.append(node_value(t))
+        cover.append(t.weighted_n_node_samples)
+        roots.append(offset)
+        offset += t.node_count
+    return (np.concatenate(left).astype(np.int32),
+            np.concatenate(right).astype(np.int32),
+            np.concatenate(feature).astype(np.int32),
+            np.concatenate(threshold).astype(np.float64),
+            np.concatenate(value).astype(np.float64),
+            np.asarray(roots, dtype=np.int32),
+            np.concatenate(cover).astype(np.float64))
+
+
+class TreeEnsembleModel:
+    """One or more decision trees stored as concatenated node arrays.
+
+    Every tree's nodes live in the same flat arrays; ``roots`` holds the
+    offset of each tree. ``value`` is the fraction of class 1 samples at
+    each node, so a leaf's value is that tree's success probability.
+    ``cover`` is the (weighted) number of training samples reaching each
+    node; it is only needed for explanations and may be absent in older
+    artifacts.
+    """
+
+    kind = 'tree_ensemble'
+
+    # Upper bound on (rows x trees) routed through the trees at once
+    chunk_cells = 1 << 20
+
+    def __init__(self, left, right, feature, threshold, value, roots, cover=None):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.cover = cover
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        trees = getattr(estimator, 'estimators_', [estimator])
+        class_idx = _positive_class_index(estimator)
+
+        def success_fraction(t):
+            counts = t.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0] = 1
+            return counts[:, class_idx] / totals
+
+        return cls(*_flatten_trees(trees, success_fraction))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Leaf node index reached by every row in every tree, shape (n, trees)"""
+        # scikit-learn compares float32 inputs against the split thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n_trees = self.n_trees
+        node = np.tile(self.roots, X.shape[0])
+        rows = np.repeat(np.arange(X.shape[0]), n_trees)
+        active = np.flatnonzero(self.left[node] != -1)
+        while active.size:
+            current = node[active]
+            go_left = (X[rows[active], self.feature[current]] <=
+                       self.threshold[current])
+            nxt = np.where(go_left, self.left[current], self.right[current])
+            node[active] = nxt
+            active = active[self.left[nxt] != -1]
+        return node.reshape(X.shape[0], n_trees)
+
+    def leaf_value(self, nodes):
+        """Values of the given leaf nodes"""
+        return self.value[nodes]
+
+    def predict_tree_proba(self, X, return_cover=False):
+        """Success probability of every tree for every row, shape (n, trees)
+
+        ``return_cover=True`` also returns the cover of every leaf reached,
+        in the same shape (requires ``cover``).
+        """
+        def leaves(X):
+            nodes = self.apply(X)
+            if return_cover:
+                return self.leaf_value(nodes), self.cover[nodes]
+            return self.leaf_value(nodes)
+
+        step = max(1, self.chunk_cells // self.n_trees)
+        if X.shape[0] <= step:
+            return leaves(X)
+        chunks = [leaves(X[start:start + step]) for start in range(0, X.shape[0], step)]
+        if return_cover:
+            return tuple(np.vstack(parts) for parts in zip(*chunks))
+        return np.vstack(chunks)
+
+    def predict_proba(self, X):
+        p = self.predict_tree_proba(X).mean(axis=1)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+    def cost_per_row(self):
+        """Scoring cost of one row in multiply-adds (see ``TREE_COMPARISON_COST``)
+
+        Counts the split comparisons a training row makes on average over
+        all trees, following each split in proportion to its cover (evenly
+        without covers).
+        """
+        left, right = self.left, self.right
+        reach = np.zeros(len(left))
+        reach[self.roots] = 1.0
+        comparisons = 0.0
+        level = np.asarray(self.roots)
+        while level.size:
+            level = level[left[level] != -1]
+            comparisons += reach[level].sum()
+            for child in (left[level], right[level]):
+                if self.cover is None:
+                    reach[child] = reach[level] / 2
+                else:
+                    cover = self.cover[level].astype(np.float64)
+                    reach[child] = reach[level] * self.cover[child] / np.maximum(cover, 1e-12)
+            level = np.concatenate([left[level], right[level]])
+        return float(comparisons * TREE_COMPARISON_COST)
+
+    def astype(self, dtype):
+        """Copy with float arrays in ``dtype``; float32 keeps every split decision"""
+        threshold = self.threshold.astype(dtype)
+        # Round thresholds down: for float32 inputs x, x <= t exactly when x <= t rounded down
+        above = threshold > self.threshold
+        threshold[above] = np.nextafter(threshold[above], -np.inf)
+        # Feature indices fit in a byte for any realistic feature count
+        feature = self.feature.astype(np.min_scalar_type(int(self.feature.max(initial=0))))
+        return type(self)(self.left, self.right, feature, threshold,
+                          self.value.astype(dtype), self.roots,
+                          None if self.cover is None else self.cover.astype(dtype))
+
+    def to_arrays(self):
+        arrays = {
+            'left': self.left,
+            'right': self.right,
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'value': self.value,
+            'roots': self.roots
+        }
+        if self.cover is not None:
+            arrays['cover'] = self.cover
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['left'], arrays['right'], arrays['feature'],
+                   arrays['threshold'], arrays['value'], arrays['roots'],
+                   arrays.get('cover'))
+
+
+class BoostedTreesModel(TreeEnsembleModel):
+    """Gradient-boosted regression trees that predict a probability directly
+
+    Leaf values already include the learning rate, so a row's prediction is
+    ``base`` plus its leaf values summed over the trees, clipped to [0, 1].
+    """
+
+    kind = 'boosted_trees'
+
+    def __init__(self, left, right, feature, threshold, value, roots, cover=None, base=None):
+        super().__init__(left, right, feature, threshold, value, roots, cover)
+        self.base = base
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        trees = [tree for stage in estimator.estimators_ for tree in stage]
+        arrays = _flatten_trees(trees, lambda t: t.value[:, 0, 0] * estimator.learning_rate)
+        base = estimator.init_.predict(np.zeros((1, estimator.n_features_in_)))
+        return cls(*arrays, base=np.asarray(base[:1], dtype=np.float64))
+
+    def predict_proba(self, X):
+        # predict_tree_proba gathers each tree's leaf value, here a boosting step
+        p = np.clip(self.base[0] + self.predict_tree_proba(X).sum(axis=1), 0.0, 1.0)
+        return np.column_stack([1.0 - p, p])
+
+    def astype(self, dtype):
+        model = super().astype(dtype)
+        model.base = self.base.astype(dtype)
+        return model
+
+    def to_arrays(self):
+        arrays = super().to_arrays()
+        arrays['base'] = self.base
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['left'], arrays['right'], arrays['feature'],
+                   arrays['threshold'], arrays['value'], arrays['roots'],
+                   arrays.get('cover'), arrays['base'])
+
+
+class CompressedTreeEnsemble(TreeEnsembleModel):
+    """Tree ensemble in packed node arrays (built by forest_compression.py)
+
+    Nodes are laid out breadth-first over all trees, so the children of node
+    ``i`` are ``child[i]`` and ``child[i] + 1`` (``child`` is -1 at leaves)
+    and each tree's root comes before everything below it. ``index`` points
+    internal nodes into the sorted ``thresholds`` table and leaves into the
+    sorted ``leaf_values`` table, each holding every distinct value once, so
+    a node takes 4 + 1 + 2 bytes instead of ``TreeEnsembleModel``'s 36. The
+    plain per-node arrays (used for explanations) are rebuilt on first access.
+    """
+
+    kind = 'compressed_tree_ensemble'
+
+    def __init__(self, child, feature, index, thresholds, leaf_values, roots, cover=None):
+        self.child = child
+        self.feature = feature
+        self.index = index
+        self.thresholds = thresholds
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.cover = cover
+        self._expanded = {}
+
+    @classmethod
+    def pack(cls, model, trees=None, threshold=None):
+        """Pack a ``TreeEnsembleModel``, keeping only ``trees`` (indices) if given
+
+        ``threshold`` replaces the model's per-node thresholds. Sibling leaves
+        with the same value are merged into their parent first, which leaves
+        every prediction unchanged.
+        """
+        left, right = model.left.copy(), model.right.copy()
+        value = model.value.copy()
+        threshold = model.threshold if threshold is None else threshold
+        while True:
+            internal = np.flatnonzero(left != -1)
+            merge = internal[(left[left[internal]] == -1) & (left[right[internal]] == -1) &
+                             (value[left[internal]] == value[right[internal]])]
+            if not merge.size:
+                break
+            value[merge] = value[left[merge]]
+            left[merge] = right[merge] = -1
+
+        roots = model.roots if trees is None else model.roots[np.asarray(trees)]
+        levels, children = [np.asarray(roots)], []
+        next_id = len(roots)
+        while levels[-1].size:
+            level = levels[-1]
+            internal = left[level] != -1
+            child = np.full(level.size, -1, dtype=np.int64)
+            child[internal] = next_id + 2 * np.arange(internal.sum())
+            children.append(child)
+            below = np.empty(2 * internal.sum(), dtype=level.dtype)
+            below[0::2], below[1::2] = left[level[internal]], right[level[internal]]
+            next_id += below.size
+            levels.append(below)
+        old = np.concatenate(levels)
+        child = np.concatenate(children)
+
+        is_leaf = child == -1
+        index = np.empty(len(old), dtype=np.int64)
+        thresholds, index[~is_leaf] = np.unique(threshold[old[~is_leaf]], return_inverse=True)
+        leaf_values, index[is_leaf] = np.unique(value[old[is_leaf]], return_inverse=True)
+        feature = np.where(is_leaf, 0, model.feature[old])
+        cover = None
+        if model.cover is not None:
+            cover = model.cover[old]
+            if np.array_equal(cover, np.round(cover)):
+                # Bootstrap sample weights are whole counts
+                cover = cover.astype(np.min_scalar_type(int(cover.max(initial=0))))
+        return cls(child.astype(np.int32),
+                   feature.astype(np.min_scalar_type(int(feature.max(initial=0)))),
+                   index.astype(np.min_scalar_type(int(index.max(initial=0)))),
+                   thresholds, leaf_values, np.arange(len(roots), dtype=np.int32), cover)
+
+    def _expand(self, name):
+        if name not in self._expanded:
+            is_leaf = self.child == -1
+            if name == 'left':
+                array = self.child
+            elif name == 'right':
+                array = np.where(is_leaf, -1, self.child + 1).astype(np.int32)
+            elif name == 'threshold':
+                array = np.full(len(self.child), -2.0, dtype=self.thresholds.dtype)
+                array[~is_leaf] = self.thresholds[self.index[~is_leaf]]
+            else:
+                array = np.full(len(self.child), np.nan, dtype=self.leaf_values.dtype)
+                array[is_leaf] = self.leaf_values[self.index[is_leaf]]
+            self._expanded[name] = array
+        return self._expanded[name]
+
+    left = property(lambda self: self._expand('left'))
+    right = property(lambda self: self._expand('right'))
+    threshold = property(lambda self: self._expand('threshold'))
+    value = property(lambda self: self._expand('value'))
+
+    def apply(self, X):
+        """Leaf node index reached by every row in every tree, shape (n, trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        n_trees = self.n_trees
+        node = np.tile(self.roots, X.shape[0])
+        rows = np.repeat(np.arange(X.shape[0]), n_trees)
+        active = np.flatnonzero(self.child[node] != -1)
+        while active.size:
+            current = node[active]
+            go_left = (X[rows[active], self.feature[current]] <=
+                       self.thresholds[self.index[current]])
+            nxt = self.child[current] + ~go_left
+            node[active] = nxt
+            active = active[self.child[nxt] != -1]
+        return node.reshape(X.shape[0], n_trees)
+
+    def leaf_value(self, nodes):
+        return self.leaf_values[self.index[nodes]]
+
+    def astype(self, dtype):
+        """Copy with float tables in ``dtype``; float32 keeps every split decision"""
+        thresholds = self.thresholds.astype(dtype)
+        above = thresholds > self.thresholds
+        thresholds[above] = np.nextafter(thresholds[above], -np.inf)
+        cover = self.cover
+        if cover is not None and cover.dtype.kind == 'f':
+            cover = cover.astype(dtype)
+        return type(self)(self.child, self.feature, self.index, thresholds,
+                          self.leaf_values.astype(dtype), self.roots, cover)
+
+    def to_arrays(self):
+        arrays = {
+            'child': self.child,
+            'feature': self.feature,
+            'index': self.index,
+            'thresholds': self.thresholds,
+            'leaf_values': self.leaf_values,
+            'roots': self.roots
+        }
+        if self.cover is not None:
+            arrays['cover'] = self.cover
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['child'], arrays['feature'], arrays['index'], arrays['thresholds'],
+                   arrays['leaf_values'], arrays['roots'], arrays.get('cover'))
+
+
+class KernelSVMModel:
+    """RBF-kernel SVC with Platt-scaled probability estimates"""
+
+    kind = 'rbf_svm'
+
+    # Rows scored per kernel block, bounds the (rows x support vectors) matrix
+    chunk_rows = 8192
+
+    def __init__(self, support_vectors, dual_coef, intercept, gamma, prob_a,
+                 prob_b):
+        self.support_vectors = support_vectors
+        self.dual_coef = dual_coef
+        self.intercept = intercept
+        self.gamma = gamma
+        self.prob_a = prob_a
+        self.prob_b = prob_b
+        self._sv_norms = (support_vectors**2).sum(axis=1)
+
+    @classmethod
+    def from_estimator(cls, estimator, X, sigmoid):
+        """Compile an SVC fitted on the rows ``X``
+
+        ``X`` resolves ``gamma='scale'`` or ``'auto'`` (see ``svm_gamma``);
+        ``sigmoid`` is the ``(a, b)`` of its Platt scaling, fitted on held-out
+        decision values (see ``platt_probability``).
+        """
+        if estimator.kernel != 'rbf':
+            raise ValueError(
+                f"Only RBF-kernel SVMs can be exported, got '{estimator.kernel}'")
+        prob_a, prob_b = sigmoid
+        return cls(np.asarray(estimator.support_vectors_, dtype=np.float64),
+                   np.asarray(estimator.dual_coef_[0], dtype=np.float64),
+                   np.asarray(estimator.intercept_[:1], dtype=np.float64),
+                   np.asarray([svm_gamma(estimator, X)], dtype=np.float64),
+                   np.asarray([prob_a], dtype=np.float64),
+                   np.asarray([prob_b], dtype=np.float64))
+
+    def _decision_block(self, X):
+        sq_dist = ((X**2).sum(axis=1)[:, None] + self._sv_norms[None, :] -
+                   2.0 * (X @ self.support_vectors.T))
+        np.maximum(sq_dist, 0, out=sq_dist)
+        kernel = np.exp(-self.gamma[0] * sq_dist)
+        return kernel @ self.dual_coef + self.intercept[0]
+
+    def decision_function(self, X):
+        if X.shape[0] <= self.chunk_rows:
+            return self._decision_block(X)
+        return np.concatenate([
+            self._decision_block(X[start:start + self.chunk_rows])
+            for start in range(0, X.shape[0], self.chunk_rows)
+        ])
+
+    def predict_proba(self, X):
+        p = platt_probability(self.decision_function(X), (self.prob_a[0], self.prob_b[0]))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return (self.decision_function(X) > 0).astype(int)
+
+    def cost_per_row(self):
+        """Scoring cost of one row in multiply-adds: a distance and a kernel per support vector"""
+        n_support, n_features = self.support_vectors.shape
+        return float(n_support * (n_features + 1))
+
+    def astype(self, dtype):
+        return type(self)(*(array.astype(dtype) for array in (
+            self.support_vectors, self.dual_coef, self.intercept, self.gamma,
+            self.prob_a, self.prob_b)))
+
+    def to_arrays(self):
+        return {
+            'support_vectors': self.support_vectors,
+            'dual_coef': self.dual_coef,
+            'intercept': self.intercept,
+            'gamma': self.gamma,
+            'prob_a': self.prob_a,
+            'prob_b': self.prob_b
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['support_vectors'], arrays['dual_coef'],
+                   arrays['intercept'], arrays['gamma'], arrays['prob_a'],
+                   arrays['prob_b'])
+
+
+def svm_gamma(estimator, X):
+    """RBF coefficient of an SVC fitted on the rows ``X``
+
+    Resolves ``gamma='scale'`` and ``'auto'`` from the training rows as
+    ``SVC.fit`` does, instead of reading the estimator's private state.
+    """
+    gamma = estimator.get_params()['gamma']
+    if gamma == 'scale':
+        variance = np.asarray(X, dtype=np.float64).var()
+        return 1.0 / (X.shape[1] * variance) if variance != 0 else 1.0
+    if gamma == 'auto':
+        return 1.0 / X.shape[1]
+    return float(gamma)
+
+
+def platt_probability(decision, sigmoid):
+    """Success probability of SVM decision values, ``1 / (1 + exp(a * f + b))``"""
+    a, b = sigmoid
+    p = 1.0 / (1.0 + np.exp(decision * a + b))
+    return np.clip(p, 1e-7, 1 - 1e-7)
+
+
+MODEL_KINDS = {
+    cls.kind: cls
+    for cls in (Standardizer, LogisticModel, TreeEnsembleModel, BoostedTreesModel,
+                CompressedTreeEnsemble, KernelSVMModel, CalibratedAggregator, EarlyExitCascade)
+}
+
+
+def compile_estimator(estimator, **kwargs):
+    """Convert a fitted scikit-learn estimator into its numpy equivalent
+
+    Keyword arguments go to the compiled class's ``from_estimator``; an SVC
+    needs its training rows and Platt sigmoid (see ``KernelSVMModel``).
+    """
+    name = type(estimator).__name__
+    if name == 'StandardScaler':
+        return Standardizer.from_estimator(estimator)
+    if name == 'LogisticRegression':
+        return LogisticModel.from_estimator(estimator)
+    if name in ('DecisionTreeClassifier', 'RandomForestClassifier',
+                'ExtraTreesClassifier'):
+        return TreeEnsembleModel.from_estimator(estimator)
+    if name == 'GradientBoostingRegressor':
+        return BoostedTreesModel.from_estimator(estimator)
+    if name == 'SVC':
+        return KernelSVMModel.from_estimator(estimator, **kwargs)
+    raise TypeError(f"Cannot compile estimator of type {name}")
+
+
+def flatten_components(components):
+    """Flatten named compiled components into one array dict plus a manifest"""
+    arrays = {}
+    manifest = []
+    for key, component in components.items():
+        manifest.append({'key': key, 'kind': component.kind})
+        for field, array in component.to_arrays().items():
+            arrays[f'{key}.{field}'] = np.ascontiguousarray(array)
+    return arrays, manifest
+
+
+def build_components(arrays, manifest):
+    """Rebuild compiled components from their flattened arrays"""
+    components = {}
+    for entry in manifest:
+        key = entry['key']
+        prefix = f'{key}.'
+        fields = {
+            name[len(prefix):]: array
+            for name, array in arrays.items() if name.startswith(prefix)
+        }
+        components[key] = MODEL_KINDS[entry['kind']].from_arrays(fields)
+    return components
+
+
+def checksum_arrays(arrays):
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def write_artifact(path, arrays, meta):
+    """Atomically write arrays and JSON metadata to an ``.npz`` artifact"""
+    meta = dict(meta)
+    meta.setdefault('format_version', FORMAT_VERSION)
+    meta.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+    meta['checksum'] = checksum_arrays(arrays)
+    payload = dict(arrays)
+    payload[META_KEY] = np.frombuffer(json.dumps(meta).encode('utf-8'),
+                                      dtype=np.uint8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return meta
+
+
+def read_artifact(path):
+    """Read an artifact written by ``write_artifact``; returns (arrays, meta)"""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files if name != META_KEY}
+        meta = json.loads(data[META_KEY].tobytes().decode('utf-8'))
+    if meta.get('format_version', 0) > FORMAT_VERSION:
+        raise ValueError(
+            f"Artifact {path} has format version {meta['format_version']}, "
+            f"this code reads up to {FORMAT_VERSION}")
+    for array in arrays.values():
+        array.flags.writeable = False
+    return arrays, meta
+
+
+def read_artifact_meta(path):
+    """Read only the metadata of an artifact, without loading the arrays"""
+    with np.load(path, allow_pickle=False) as data:
+        return json.loads(data[META_KEY].tobytes().decode('utf-8'))
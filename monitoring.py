@@ -0,0 +1,265 @@
+"""Drift monitoring of prediction traffic with constant-memory sketches.
+
+Attach a ``DriftMonitor`` to ``StartupSuccessPredictor.monitor`` and every
+``predict``/``predict_batch`` call feeds it. No raw requests are kept:
+
+- every feature in ``feature_names`` and the success probability go into a
+  fixed histogram whose bins are quantiles of the training data, so
+  population stability index (PSI) and Kolmogorov-Smirnov (KS) distances
+  to the training reference come straight from the bin counts
+- categorical inputs (country, industry, ...) go into count-min sketches.
+  Training works on prepared features, so these have no training reference;
+  ``rebase`` makes the traffic so far the baseline they are compared to
+
+    monitor = DriftMonitor.for_predictor(predictor)
+    predictor.monitor = monitor
+    ...
+    monitor.report()
+"""
+import bisect
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+
+# Raw startup fields tracked with count-min sketches
+CATEGORICAL_FIELDS = ('country', 'industry', 'business_model', 'city')
+
+# PSI above which a distribution is reported as drifted (the usual rule of thumb)
+PSI_THRESHOLD = 0.2
+
+# Added to every bin's count so empty bins keep PSI finite
+PSI_SMOOTHING = 0.5
+
+
+def reference_profile(X, feature_names, probability=None, n_bins=20):
+    """Quantile-binned training distribution of every feature (and of ``probability``)
+
+    The result is plain JSON, stored in the artifact metadata under
+    ``drift_reference``. Bin ``i`` holds values ``v`` with
+    ``edges[i - 1] <= v < edges[i]``; the first and last bins are open-ended.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    columns = {name: X[:, i] for i, name in enumerate(feature_names)}
+    if probability is not None:
+        columns['success_probability'] = np.asarray(probability, dtype=np.float64)
+    profile = {'rows': int(len(X)), 'columns': {}}
+    for name, values in columns.items():
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'),
+                             minlength=len(edges) + 1)
+        profile['columns'][name] = {'edges': edges.tolist(), 'counts': counts.tolist(),
+                                    'mean': float(values.mean())}
+    return profile
+
+
+def psi(expected, actual, smoothing=PSI_SMOOTHING):
+    """Population stability index between two count vectors over the same bins"""
+    expected = np.asarray(expected, dtype=np.float64) + smoothing
+    actual = np.asarray(actual, dtype=np.float64) + smoothing
+    expected, actual = expected / expected.sum(), actual / actual.sum()
+    return float(((actual - expected) * np.log(actual / expected)).sum())
+
+
+def ks(expected, actual):
+    """Largest gap between the two binned CDFs (KS statistic at the bin edges)"""
+    expected = np.cumsum(expected) / np.sum(expected)
+    actual = np.cumsum(actual) / np.sum(actual)
+    return float(np.abs(actual - expected).max())
+
+
+class CountMinSketch:
+    """Approximate counts of string keys in ``depth`` rows of ``width`` counters
+
+    Estimates never undercount; they overcount by at most ``2 / width`` of the
+    total with probability ``1 - 0.5 ** depth``. A bounded list of the
+    ``top_k`` heaviest keys seen (by estimate) makes them reportable.
+    """
+
+    def __init__(self, width=2048, depth=4, top_k=20):
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        # Plain lists: single increments are cheaper than on numpy arrays
+        self.table = [[0] * width for _ in range(depth)]
+        self.total = 0
+        self.top = {}
+
+    def _cells(self, key):
+        # Double hashing: row i uses h1 + i * h2, so two hashes serve every row
+        data = str(key).encode('utf-8')
+        h1, h2 = zlib.crc32(data), zlib.adler32(data) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        estimate = None
+        for row, cell in zip(self.table, self._cells(key)):
+            row[cell] += count
+            estimate = row[cell] if estimate is None else min(estimate, row[cell])
+        self.total += count
+        if key in self.top or len(self.top) < self.top_k:
+            self.top[key] = estimate
+        else:
+            smallest = min(self.top, key=self.top.get)
+            if estimate > self.top[smallest]:
+                del self.top[smallest]
+                self.top[key] = estimate
+
+    def estimate(self, key):
+        return min(row[cell] for row, cell in zip(self.table, self._cells(key)))
+
+    def copy(self):
+        sketch = type(self)(self.width, self.depth, self.top_k)
+        sketch.table = [row[:] for row in self.table]
+        sketch.total = self.total
+        sketch.top = dict(self.top)
+        return sketch
+
+
+class DriftMonitor:
+    """Streaming sketches of prediction traffic, compared to the training reference
+
+    ``reference`` is a ``reference_profile``. Memory is fixed by the number of
+    bins and the sketch sizes, however much traffic is observed.
+    """
+
+    def __init__(self, reference, feature_names, categorical_fields=CATEGORICAL_FIELDS,
+                 width=2048, depth=4, top_k=20):
+        self.reference = reference
+        self.feature_names = list(feature_names)
+        self.categorical_fields = tuple(categorical_fields)
+        self.width, self.depth, self.top_k = width, depth, top_k
+        reference_columns = reference['columns']
+        # The success probability is binned like one more feature when it has a reference
+        self.track_probability = 'success_probability' in reference_columns
+        self.columns = self.feature_names + (['success_probability']
+                                             if self.track_probability else [])
+        self._edges = [np.asarray(reference_columns[name]['edges']) for name in self.columns]
+        self._edge_lists = [edges.tolist() for edges in self._edges]
+        # Every column's bins live in one flat count array, starting at its offset
+        self._offsets = np.cumsum([0] + [len(edges) + 1 for edges in self._edges])
+        self._offset_list = self._offsets.tolist()
+        self.baseline = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def for_predictor(cls, predictor, n_training_samples=1000, **kwargs):
+        """Monitor against the predictor's stored reference
+
+        Artifacts from before references were stored get one from the
+        synthetic training generator (``train_models``' data), scored by the
+        predictor itself.
+        """
+        reference = predictor.metadata.get('drift_reference')
+        if reference is None:
+            df = predictor.generate_synthetic_training_data(n_training_samples)
+            X = df[predictor.feature_names].to_numpy(dtype=np.float64)
+            probability = predictor.predict_features(X)['success_probability']
+            reference = reference_profile(X, predictor.feature_names, probability)
+        return cls(reference, predictor.feature_names, **kwargs)
+
+    def reset(self):
+        """Forget all observed traffic (the categorical baseline is kept)"""
+        with self._lock:
+            self.rows = 0
+            self.counts = np.zeros(self._offsets[-1], dtype=np.int64)
+            self.sums = np.zeros(len(self.columns))
+            self.sketches = {field: CountMinSketch(self.width, self.depth, self.top_k)
+                             for field in self.categorical_fields}
+
+    def observe(self, feature_array, probability, startups=None):
+        """Add a batch of prepared feature rows, their success probabilities (%)
+        and optionally the raw startups they came from"""
+        values = np.asarray(feature_array, dtype=np.float64)
+        single = len(values) == 1
+        if single:
+            # numpy's per-call overhead dominates for one row, so bin it in Python
+            row = values[0].tolist()
+            if self.track_probability:
+                row.append(float(np.asarray(probability).reshape(-1)[0]))
+            cells = [offset + bisect.bisect_right(edges, value)
+                     for offset, edges, value in zip(self._offset_list, self._edge_lists, row)]
+            totals = np.array(row)
+        else:
+            if self.track_probability:
+                values = np.column_stack([values, np.asarray(probability, dtype=np.float64)])
+            cells = np.column_stack([np.searchsorted(edges, values[:, i], side='right')
+                                     for i, edges in enumerate(self._edges)]) + self._offsets[:-1]
+            binned = np.bincount(cells.ravel(), minlength=len(self.counts))
+            totals = values.sum(axis=0)
+        if not startups:
+            categories = {}
+        elif len(startups) == 1:
+            categories = {field: {startups[0].get(field): 1} for field in self.categorical_fields}
+        else:
+            # Each distinct value goes into its sketch once per batch
+            categories = {field: Counter(startup.get(field) for startup in startups)
+                          for field in self.categorical_fields}
+        with self._lock:
+            self.rows += len(values)
+            if single:
+                self.counts[cells] += 1
+            else:
+                self.counts += binned
+            self.sums += totals
+            for field, counts in categories.items():
+                for value, count in counts.items():
+                    if value is not None:
+                        self.sketches[field].add(value, count)
+
+    def rebase(self):
+        """Make the categorical traffic seen so far the baseline for categorical PSI"""
+        with self._lock:
+            self.baseline = {field: sketch.copy() for field, sketch in self.sketches.items()}
+
+    def _compare(self, i):
+        reference = self.reference['columns'][self.columns[i]]
+        counts = self.counts[self._offsets[i]:self._offsets[i + 1]]
+        result = {
+            'psi': psi(reference['counts'], counts),
+            'ks': ks(reference['counts'], counts),
+            'reference_mean': reference['mean'],
+            'mean': float(self.sums[i] / self.rows)
+        }
+        result['drifted'] = result['psi'] > PSI_THRESHOLD
+        return result
+
+    def _categorical(self, field, sketch):
+        report = {'count': sketch.total, 'top': [
+            {'value': key, 'estimate': count, 'share': count / sketch.total}
+            for key, count in sorted(sketch.top.items(), key=lambda item: -item[1])
+        ]}
+        baseline = self.baseline and self.baseline[field]
+        if baseline is not None and baseline.total and sketch.total:
+            # Bins: the heavy hitters of either window, plus everything else
+            keys = sorted(set(sketch.top) | set(baseline.top), key=str)
+            live = [sketch.estimate(key) for key in keys]
+            base = [baseline.estimate(key) for key in keys]
+            live.append(max(sketch.total - sum(live), 0))
+            base.append(max(baseline.total - sum(base), 0))
+            report['psi'] = psi(base, live)
+            report['drifted'] = report['psi'] > PSI_THRESHOLD
+        return report
+
+    def report(self):
+        """PSI and KS of every feature and the success probability against the
+        training reference, plus categorical top values (and PSI against the
+        baseline, after ``rebase``)"""
+        with self._lock:
+            if not self.rows:
+                return {'rows': 0}
+            columns = {name: self._compare(i) for i, name in enumerate(self.columns)}
+            report = {
+                'rows': self.rows,
+                'reference_rows': self.reference['rows'],
+                'features': {name: columns[name] for name in self.feature_names},
+                'success_probability': columns.get('success_probability'),
+                'categorical': {field: self._categorical(field, sketch)
+                                for field, sketch in self.sketches.items()}
+            }
+        report['drifted'] = [name for name, entry in columns.items() if entry['drifted']]
+        report['drifted'] += [field for field, entry in report['categorical'].items()
+                              if entry.get('drifted')]
+        return report
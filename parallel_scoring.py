@@ -0,0 +1,193 @@
+"""Multi-process batch scoring with model weights in shared memory.
+
+The predictor's flattened arrays (tree node arrays, SVC support vectors,
+coefficients, scaler statistics) are copied once into a single
+``multiprocessing.shared_memory`` block. Worker processes attach to that
+block and build their predictor from zero-copy numpy views, so adding
+workers does not duplicate the model in memory. Feature preparation runs
+inside the workers, which is what lets throughput scale past one core.
+"""
+import multiprocessing
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ml_model import BAND_PERCENTILES, StartupSuccessPredictor
+
+ALIGNMENT = 64
+
+
+def pack_arrays(arrays):
+    """Copy arrays into one new shared memory block; returns (block, manifest)"""
+    manifest = []
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        manifest.append((name, array.dtype.str, array.shape, offset))
+        offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (name, dtype, shape, start), array in zip(manifest, arrays.values()):
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view[...] = array
+    return block, manifest
+
+
+def attach_block(name):
+    """Attach to an existing block without handing its lifetime to this process"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the block with the resource tracker,
+    # which then unlinks it (or, when forked, forgets the creator's entry)
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def unpack_arrays(block, manifest):
+    """Read-only numpy views onto the arrays stored in a shared block"""
+    arrays = {}
+    for name, dtype, shape, offset in manifest:
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False
+        arrays[name] = view
+    return arrays
+
+
+_worker_block = None
+_worker_predictor = None
+
+
+def _init_worker(block_name, manifest, meta):
+    global _worker_block, _worker_predictor
+    _worker_block = attach_block(block_name)
+    _worker_predictor = StartupSuccessPredictor.from_arrays(
+        unpack_arrays(_worker_block, manifest), meta)
+
+
+def _run_task(fn, args):
+    return fn(_worker_predictor, *args)
+
+
+def _score_records(predictor, startups):
+    return predictor.predict_batch(startups)
+
+
+def _score_feature_rows(predictor, block_name, shape, dtype, start, stop):
+    block = attach_block(block_name)
+    X = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    try:
+        return predictor.predict_features(X[start:stop])
+    finally:
+        # Views must be released before the block can be closed
+        del X
+        block.close()
+
+
+def concat_results(results):
+    """Concatenate predict_batch results in order"""
+    if not results:
+        return {'success_probability': np.empty(0), 'confidence_interval': np.empty(0),
+                'model_predictions': {},
+                'uncertainty_bands': {f'p{q}': np.empty(0) for q in BAND_PERCENTILES}}
+    bands = results[0].get('uncertainty_bands')
+    return {
+        'success_probability': np.concatenate([r['success_probability'] for r in results]),
+        'confidence_interval': np.concatenate([r['confidence_interval'] for r in results]),
+        'model_predictions': {
+            name: np.concatenate([r['model_predictions'][name] for r in results])
+            for name in results[0]['model_predictions']
+        },
+        'uncertainty_bands': None if bands is None else {
+            key: np.concatenate([r['uncertainty_bands'][key] for r in results])
+            for key in bands
+        }
+    }
+
+
+class ParallelScoringEngine:
+    """Process pool whose workers share one copy of the model weights.
+
+    Use as a context manager; the shared block is unlinked on exit.
+
+        with ParallelScoringEngine(predictor, workers=8) as engine:
+            result = engine.score(startups)
+    """
+
+    def __init__(self, predictor, workers=None, shard_size=4096, start_method=None):
+        self.predictor = predictor
+        self.workers = workers or multiprocessing.cpu_count()
+        self.shard_size = shard_size
+        self.start_method = start_method
+        self._block = None
+        self._pool = None
+
+    def __enter__(self):
+        arrays, meta = self.predictor.to_arrays()
+        self._block, manifest = pack_arrays(arrays)
+        context = multiprocessing.get_context(self.start_method)
+        self._pool = context.Pool(self.workers,
+                                  initializer=_init_worker,
+                                  initargs=(self._block.name, manifest, meta))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+    @property
+    def shared_bytes(self):
+        return self._block.size if self._block is not None else 0
+
+    def submit(self, fn, *args):
+        """Run ``fn(predictor, *args)`` in a worker; returns an AsyncResult"""
+        return self._pool.apply_async(_run_task, (fn, args))
+
+    def _gather(self, tasks):
+        """Submit (fn, args) tasks with a bounded window, collecting results in order"""
+        pending = []
+        results = []
+        for fn, args in tasks:
+            pending.append(self.submit(fn, *args))
+            if len(pending) >= 2 * self.workers:
+                results.append(pending.pop(0).get())
+        results.extend(p.get() for p in pending)
+        return results
+
+    def score(self, startups):
+        """Prepare features and score startups in parallel shards, in input order"""
+        shards = (
+            (_score_records, (startups[start:start + self.shard_size],))
+            for start in range(0, len(startups), self.shard_size)
+        )
+        return concat_results(self._gather(shards))
+
+    def score_features(self, feature_array):
+        """Score a prepared feature matrix; workers read it from shared memory"""
+        feature_array = np.ascontiguousarray(feature_array, dtype=self.predictor.dtype)
+        block, _ = pack_arrays({'X': feature_array})
+        try:
+            shape, dtype = feature_array.shape, feature_array.dtype.str
+            shards = (
+                (_score_feature_rows,
+                 (block.name, shape, dtype, start,
+                  min(start + self.shard_size, shape[0])))
+                for start in range(0, shape[0], self.shard_size)
+            )
+            return concat_results(self._gather(shards))
+        finally:
+            block.close()
+            block.unlink()
@@ -0,0 +1,170 @@
+"""Opt-in profiling of Streamlit script reruns.
+
+Every widget interaction re-executes app.py from the top. A
+``RerunProfiler`` splits one execution into named sections with
+``mark(name)`` (each mark closes the previous section), optionally runs
+cProfile over the whole rerun, and keeps the last ``window`` reruns so
+the most expensive sections and functions can be reported:
+
+    profiler.start()
+    profiler.mark('styles')
+    ...
+    profiler.mark('step 4: prediction')
+    ...
+    profiler.finish()
+    profiler.section_report()
+
+Before cutting a rerun short with ``st.rerun()``, call
+``finish(interrupted=True)`` so the rerun ends at that moment. A rerun
+stopped any other way (an exception, or Streamlit starting a new rerun) is
+closed by the next ``start()``: when it stopped is unknown, so its open
+section is dropped and it ends at its last mark. Either way it is flagged
+as interrupted. A profiler created with
+``enabled=False`` ignores every call, so the markers can stay in the app.
+"""
+import collections
+import cProfile
+import pstats
+import time
+
+import numpy as np
+
+
+class RerunProfiler:
+    """Per-section timers and cProfile stats over a rolling window of reruns"""
+
+    def __init__(self, enabled=True, window=50, use_cprofile=True, top_functions=25):
+        self.enabled = enabled
+        self.window = window
+        self.use_cprofile = use_cprofile
+        self.top_functions = top_functions
+        self.reruns = collections.deque(maxlen=window)
+        self._current = None
+        self._section = None
+        self._section_started = None
+        self._profile = None
+
+    @property
+    def active(self):
+        return self._current is not None
+
+    def start(self, label=None):
+        """Begin timing a rerun, closing one left open by an interrupted rerun"""
+        if not self.enabled:
+            return
+        if self._current is not None:
+            # The time since the last mark includes the idle wait for this rerun
+            stopped = (self._current['started'] if self._section_started is None
+                       else self._section_started)
+            self._section = None
+            self.finish(interrupted=True, at=stopped)
+        self._current = {
+            'label': label,
+            'started_at': time.time(),
+            'started': time.perf_counter(),
+            'sections': {},
+            'interrupted': False
+        }
+        if self.use_cprofile:
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError:
+                # Another profiler (e.g. a concurrent session) already holds the hook
+                self._profile = None
+
+    def mark(self, name):
+        """End the current section and start a new one called ``name``"""
+        if self._current is None:
+            return
+        now = time.perf_counter()
+        self._close_section(now)
+        self._section = name
+        self._section_started = now
+
+    def finish(self, interrupted=False, at=None):
+        """Close the rerun (at ``time.perf_counter()`` value ``at``, by default now)
+        and add it to the rolling window"""
+        if self._current is None:
+            return None
+        now = time.perf_counter() if at is None else at
+        self._close_section(now)
+        rerun = self._current
+        rerun['total'] = now - rerun.pop('started')
+        rerun['interrupted'] = interrupted
+        rerun['functions'] = self._collect_functions()
+        self.reruns.append(rerun)
+        self._current = None
+        return rerun
+
+    def reset(self):
+        self.reruns.clear()
+
+    def _add(self, name, seconds):
+        sections = self._current['sections']
+        sections[name] = sections.get(name, 0.0) + seconds
+
+    def _close_section(self, now):
+        if self._section is not None:
+            self._add(self._section, now - self._section_started)
+        self._section = None
+        self._section_started = None
+
+    def _collect_functions(self):
+        if self._profile is None:
+            return []
+        self._profile.disable()
+        stats = pstats.Stats(self._profile).stats
+        self._profile = None
+        functions = [(f'{func}:{line}({filename.rsplit("/", 1)[-1]})', calls, tottime, cumtime)
+                     for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.items()]
+        functions.sort(key=lambda f: f[3], reverse=True)
+        return functions[:self.top_functions * 4]
+
+    def section_report(self):
+        """Sections across the window, most expensive (by total time) first"""
+        timings = collections.defaultdict(list)
+        for rerun in self.reruns:
+            for name, seconds in rerun['sections'].items():
+                timings[name].append(seconds)
+        total = sum(r['total'] for r in self.reruns) or 1.0
+        report = []
+        for name, values in timings.items():
+            values = np.array(values) * 1000
+            report.append({
+                'section': name,
+                'reruns': len(values),
+                'mean_ms': float(values.mean()),
+                'p95_ms': float(np.percentile(values, 95)),
+                'max_ms': float(values.max()),
+                'share': float(values.sum() / 1000 / total)
+            })
+        report.sort(key=lambda r: r['share'], reverse=True)
+        return report
+
+    def function_report(self):
+        """Functions by cumulative time summed over the profiled reruns"""
+        merged = {}
+        for rerun in self.reruns:
+            for name, calls, tottime, cumtime in rerun['functions']:
+                entry = merged.setdefault(name, [0, 0.0, 0.0])
+                entry[0] += calls
+                entry[1] += tottime
+                entry[2] += cumtime
+        report = [{
+            'function': name,
+            'calls': calls,
+            'tottime_ms': tottime * 1000,
+            'cumtime_ms': cumtime * 1000
+        } for name, (calls, tottime, cumtime) in merged.items()]
+        report.sort(key=lambda r: r['cumtime_ms'], reverse=True)
+        return report[:self.top_functions]
+
+    def rerun_report(self):
+        """Most recent reruns first, with their slowest section"""
+        return [{
+            'label': r['label'],
+            'total_ms': r['total'] * 1000,
+            'slowest': max(r['sections'], key=r['sections'].get) if r['sections'] else None,
+            'interrupted': r['interrupted']
+        } for r in reversed(self.reruns)]
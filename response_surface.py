@@ -0,0 +1,214 @@
+"""Precomputed response surfaces for interactive what-if sliders.
+
+The ensemble's success probability is evaluated once over a coarse grid of
+the continuous features (funding, team size, company age) for every
+categorical context, i.e. every distinct combination of the remaining
+features that industries, business models and country tiers produce.
+Slider positions are then answered by trilinear interpolation in that
+table without running any model:
+
+    surface = ResponseSurface.load(surface_path(artifact), predictor)
+    estimate = surface.slice_for(predictor, startup)
+    estimate(funding_amount=2000000, team_size=12, founding_year=2020)
+
+Contexts that were not precomputed (a particular city or industry metrics)
+are evaluated on first use, one batch of grid points, and kept.
+"""
+import bisect
+import os
+import threading
+
+import numpy as np
+
+from ml_model import FUNDING_SCALE, REFERENCE_YEAR
+from model_artifact import read_artifact, write_artifact
+
+CONTINUOUS_FEATURES = ('funding_amount_normalized', 'team_size', 'founding_year_age')
+
+DEFAULT_AXES = {
+    'funding_amount_normalized': np.linspace(0, 1, 11),
+    'team_size': np.array([1, 2, 3, 5, 8, 12, 20, 30, 50, 75, 100], dtype=np.float64),
+    'founding_year_age': np.array([0, 1, 2, 3, 5, 7, 10, 15, 20, 25], dtype=np.float64)
+}
+
+
+def surface_path(artifact_path):
+    """Sidecar file next to a model artifact"""
+    return os.path.splitext(artifact_path)[0] + '.surface.npz'
+
+
+def default_contexts(predictor):
+    """Distinct context vectors over every country, industry and business model"""
+    from industry_metrics import get_all_industries, get_business_models
+    from location_data import get_all_countries
+
+    names = [n for n in predictor.feature_names if n not in CONTINUOUS_FEATURES]
+    contexts = {
+        tuple(features[n] for n in names)
+        for country in get_all_countries()
+        for industry in get_all_industries()
+        for business_model in get_business_models()
+        for features in [predictor.prepare_features({
+            'country': country,
+            'industry': industry,
+            'business_model': business_model
+        })]
+    }
+    return np.array(sorted(contexts), dtype=np.float64).reshape(-1, len(names))
+
+
+def interpolate(axes, table, points):
+    """Trilinear interpolation of ``table`` at (n, 3) points, clamped to the grid"""
+    points = np.atleast_2d(points)
+    result = np.zeros(len(points))
+    lower, weight = [], []
+    for axis, values in zip(axes, points.T):
+        values = np.clip(values, axis[0], axis[-1])
+        i = np.clip(np.searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+        lower.append(i)
+        weight.append((values - axis[i]) / (axis[i + 1] - axis[i]))
+    for corner in range(8):
+        bits = [(corner >> k) & 1 for k in range(3)]
+        w = np.ones(len(points))
+        for bit, t in zip(bits, weight):
+            w *= t if bit else 1 - t
+        result += w * table[lower[0] + bits[0], lower[1] + bits[1], lower[2] + bits[2]]
+    return result
+
+
+class SurfaceSlice:
+    """The surface of one context, queried with the app's raw input values"""
+
+    def __init__(self, axes, table):
+        self.axes = axes
+        self.table = table
+        # Plain Python copies keep single-point lookups in the microsecond range
+        self._axis_lists = [axis.tolist() for axis in axes]
+        self._table_list = table.tolist()
+
+    def _at(self, point):
+        corners = []
+        for axis, value in zip(self._axis_lists, point):
+            value = min(max(value, axis[0]), axis[-1])
+            i = min(max(bisect.bisect_right(axis, value) - 1, 0), len(axis) - 2)
+            corners.append((i, (value - axis[i]) / (axis[i + 1] - axis[i])))
+        (i, x), (j, y), (k, z) = corners
+        t = self._table_list
+        return ((1 - x) * ((1 - y) * ((1 - z) * t[i][j][k] + z * t[i][j][k + 1]) +
+                           y * ((1 - z) * t[i][j + 1][k] + z * t[i][j + 1][k + 1])) +
+                x * ((1 - y) * ((1 - z) * t[i + 1][j][k] + z * t[i + 1][j][k + 1]) +
+                     y * ((1 - z) * t[i + 1][j + 1][k] + z * t[i + 1][j + 1][k + 1])))
+
+    def __call__(self, funding_amount, team_size, founding_year):
+        """Interpolated ensemble success probability (%); accepts scalars or arrays"""
+        if all(np.ndim(v) == 0 for v in (funding_amount, team_size, founding_year)):
+            return self._at((min(float(funding_amount) / FUNDING_SCALE, 1.0),
+                             float(team_size), REFERENCE_YEAR - float(founding_year)))
+        points = np.column_stack(np.broadcast_arrays(
+            np.minimum(np.asarray(funding_amount, dtype=np.float64) / FUNDING_SCALE, 1.0),
+            np.asarray(team_size, dtype=np.float64),
+            REFERENCE_YEAR - np.asarray(founding_year, dtype=np.float64)))
+        return interpolate(self.axes, self.table, points)
+
+
+class ResponseSurface:
+    """Ensemble success probability over a grid per categorical context"""
+
+    def __init__(self, feature_names, axes=None, contexts=None, values=None,
+                 artifact_version=None):
+        axes = DEFAULT_AXES if axes is None else axes
+        self.feature_names = list(feature_names)
+        self.context_features = [n for n in self.feature_names if n not in CONTINUOUS_FEATURES]
+        self.axes = tuple(np.asarray(axes[n], dtype=np.float64) for n in CONTINUOUS_FEATURES)
+        shape = tuple(len(axis) for axis in self.axes)
+        self.contexts = (np.empty((0, len(self.context_features))) if contexts is None
+                         else np.asarray(contexts, dtype=np.float64))
+        self.values = (np.empty((0,) + shape, dtype=np.float32) if values is None
+                       else np.asarray(values, dtype=np.float32))
+        self.artifact_version = artifact_version
+        self._index = {tuple(row): i for i, row in enumerate(self.contexts.tolist())}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, predictor, contexts=None, axes=None, workers=1):
+        """Evaluate the ensemble over the grid for ``contexts`` (default: all known)"""
+        surface = cls(predictor.feature_names, axes,
+                      artifact_version=predictor.metadata.get('checksum'))
+        if contexts is None:
+            contexts = default_contexts(predictor)
+        surface.add_contexts(predictor, contexts, workers)
+        return surface
+
+    def __len__(self):
+        return len(self.contexts)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.contexts.nbytes
+
+    def _grid_features(self, contexts):
+        """Feature matrix of every grid point of every context, context-major"""
+        grid = np.stack(np.meshgrid(*self.axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        X = np.empty((len(contexts) * len(grid), len(self.feature_names)))
+        for name, column in zip(CONTINUOUS_FEATURES, grid.T):
+            X[:, self.feature_names.index(name)] = np.tile(column, len(contexts))
+        for name, column in zip(self.context_features, np.asarray(contexts).T):
+            X[:, self.feature_names.index(name)] = np.repeat(column, len(grid))
+        return X
+
+    def add_contexts(self, predictor, contexts, workers=1):
+        """Evaluate and store contexts not yet in the surface, in one batch"""
+        contexts = np.asarray(contexts, dtype=np.float64).reshape(-1, len(self.context_features))
+        missing = [row for row in dict.fromkeys(map(tuple, contexts.tolist()))
+                   if row not in self._index]
+        if not missing:
+            return 0
+        X = self._grid_features(missing)
+        if workers > 1:
+            from parallel_scoring import ParallelScoringEngine
+            with ParallelScoringEngine(predictor, workers=workers) as engine:
+                probabilities = engine.score_features(X)['success_probability']
+        else:
+            probabilities = predictor.predict_features(X)['success_probability']
+        values = probabilities.astype(np.float32).reshape((len(missing),) + self.values.shape[1:])
+        with self._lock:
+            # Another thread may have added some of these contexts meanwhile
+            keep = [i for i, row in enumerate(missing) if row not in self._index]
+            self.contexts = np.vstack([self.contexts, np.asarray(missing)[keep]])
+            self.values = np.concatenate([self.values, values[keep]])
+            for i in keep:
+                self._index[missing[i]] = len(self._index)
+        return len(keep)
+
+    def slice_for(self, predictor, startup_data):
+        """Queryable surface for a startup's context, evaluating it if needed"""
+        features = predictor.prepare_features(startup_data)
+        context = tuple(float(features[n]) for n in self.context_features)
+        if context not in self._index:
+            self.add_contexts(predictor, [context])
+        return SurfaceSlice(self.axes, self.values[self._index[context]])
+
+    def to_arrays(self):
+        arrays = {f'axis.{name}': axis for name, axis in zip(CONTINUOUS_FEATURES, self.axes)}
+        arrays.update({'contexts': self.contexts, 'values': self.values})
+        meta = {
+            'kind': 'response_surface',
+            'feature_names': self.feature_names,
+            'artifact_version': self.artifact_version
+        }
+        return arrays, meta
+
+    def save(self, path):
+        return write_artifact(path, *self.to_arrays())
+
+    @classmethod
+    def load(cls, path, predictor=None):
+        """Read a saved surface; None if missing or built for a different model"""
+        if not os.path.exists(path):
+            return None
+        arrays, meta = read_artifact(path)
+        if predictor is not None and meta['artifact_version'] != predictor.metadata.get('checksum'):
+            return None
+        axes = {name: arrays[f'axis.{name}'] for name in CONTINUOUS_FEATURES}
+        return cls(meta['feature_names'], axes, arrays['contexts'], arrays['values'],
+                   meta['artifact_version'])
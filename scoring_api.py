@@ -0,0 +1,219 @@
+"""Headless HTTP/JSON scoring API built on the standard library.
+
+Endpoints:
+    GET  /health          artifact version and status
+    GET  /metrics         p50/p99 latency for single and batch scoring
+    GET  /metrics/prometheus  per-stage timings in Prometheus text format
+                          (when started with instrumentation enabled)
+    GET  /drift           PSI/KS of traffic against the training data
+                          (when started with monitoring enabled)
+    GET  /predictions     newest logged predictions, filtered by ?limit=, ?mode=,
+                          ?artifact_version= and ?since= (when started with an audit log)
+    POST /predict         one startup object -> one prediction
+    POST /predict/batch   list of startups (or {"startups": [...]}) -> predictions
+
+Both POST endpoints take ``?mode=fast`` to score with the artifact's
+distilled student instead of the full ensemble (see distillation.py), or
+``?mode=cascade`` to stop scoring each startup once its verdict is settled.
+"""
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from audit_log import AuditLog
+from instrumentation import Instrumentation
+from ml_model import DEFAULT_ARTIFACT_PATH, PREDICTION_MODES
+from monitoring import DriftMonitor
+from serving import LatencyTracker, MicroBatcher, SharedPredictor, batch_row
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'StartupScoring/1.0'
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        if path == '/predictions' and self.server.audit_log is not None:
+            self._recent_predictions(parse_qs(query))
+        elif path == '/health':
+            self._send_json(200, {
+                'status': 'ok',
+                'artifact_version': self.server.shared_predictor.version
+            })
+        elif path == '/metrics':
+            metrics = {
+                'predict': self.server.batcher.stats(),
+                'predict_batch': self.server.batch_latency.snapshot()
+            }
+            cascade = self.server.shared_predictor.get().cascade_stats()
+            if cascade and cascade['rows']:
+                metrics['cascade'] = cascade
+            if self.server.instrumentation is not None:
+                metrics['stages'] = self.server.instrumentation.snapshot()
+            if self.server.audit_log is not None:
+                metrics['audit_log'] = self.server.audit_log.stats()
+            self._send_json(200, metrics)
+        elif path == '/drift' and self.server.monitoring:
+            self._send_json(200, self.server.shared_predictor.get().monitor.report())
+        elif path == '/metrics/prometheus' and self.server.instrumentation is not None:
+            self._send_text(200, self.server.instrumentation.to_prometheus(),
+                            'text/plain; version=0.0.4')
+        else:
+            self._send_json(404, {'error': f'Unknown path {path}'})
+
+    def do_POST(self):
+        path, _, query = self.path.partition('?')
+        if path not in ('/predict', '/predict/batch'):
+            self._send_json(404, {'error': f'Unknown path {path}'})
+            return
+        mode = parse_qs(query).get('mode', ['full'])[-1]
+        if mode not in PREDICTION_MODES:
+            self._send_json(400, {'error': f"Unknown mode '{mode}'; expected one of "
+                                           f"{', '.join(PREDICTION_MODES)}"})
+            return
+        if mode == 'fast' and self.server.shared_predictor.get().student is None:
+            self._send_json(400, {'error': 'The served artifact has no distilled model '
+                                           'for fast mode'})
+            return
+        if mode == 'cascade' and self.server.shared_predictor.get().cascade is None:
+            self._send_json(400, {'error': 'The served artifact has no early-exit cascade'})
+            return
+        try:
+            payload = self._read_json()
+        except ValueError as exc:
+            self._send_json(400, {'error': str(exc)})
+            return
+
+        try:
+            if path == '/predict':
+                self._predict_one(payload, mode)
+            else:
+                self._predict_batch(payload, mode)
+        except (ValueError, TypeError) as exc:
+            # Raised by feature preparation for fields of the wrong type or missing values
+            self._send_json(400, {'error': f'Invalid startup: {exc}'})
+        except Exception:
+            logger.exception('Scoring request failed')
+            self._send_json(500, {'error': 'Prediction failed'})
+
+    def _predict_one(self, payload, mode='full'):
+        if not isinstance(payload, dict):
+            self._send_json(400, {'error': 'Expected a JSON object'})
+            return
+        self._send_json(200, self.server.batcher.predict(payload, mode=mode))
+
+    def _predict_batch(self, payload, mode='full'):
+        startups = payload.get('startups') if isinstance(payload, dict) else payload
+        if not isinstance(startups, list) or not all(
+                isinstance(s, dict) for s in startups):
+            self._send_json(400, {'error': 'Expected a list of JSON objects'})
+            return
+        started = time.perf_counter()
+        result = self.server.shared_predictor.get().predict_batch(startups, mode=mode)
+        predictions = [batch_row(result, i) for i in range(len(startups))]
+        self.server.batch_latency.record(time.perf_counter() - started)
+        self._send_json(200, {'predictions': predictions})
+
+    def _recent_predictions(self, query):
+        filters = {key: query[key][-1] for key in ('mode', 'artifact_version') if key in query}
+        try:
+            filters['limit'] = min(int(query.get('limit', ['100'])[-1]), 10000)
+            if 'since' in query:
+                filters['since'] = float(query['since'][-1])
+        except ValueError:
+            self._send_json(400, {'error': 'limit and since must be numbers'})
+            return
+        self._send_json(200, {'predictions': self.server.audit_log.recent(**filters)})
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f'Request body larger than {MAX_BODY_BYTES} bytes')
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except json.JSONDecodeError as exc:
+            raise ValueError(f'Invalid JSON: {exc}') from exc
+
+    def _send_json(self, status, payload):
+        self._send_text(status, json.dumps(payload), 'application/json')
+
+    def _send_text(self, status, text, content_type):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug('%s - %s', self.address_string(), format % args)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Concurrent clients are expected; the stdlib default backlog is 5
+    request_queue_size = 128
+
+
+def create_server(host='127.0.0.1',
+                  port=8000,
+                  artifact_path=DEFAULT_ARTIFACT_PATH,
+                  max_batch_size=64,
+                  max_wait=0.005,
+                  instrument=False,
+                  cascade_tolerance=0.0,
+                  monitor=False,
+                  audit_log=None):
+    """Build (but do not start) the scoring server
+
+    ``audit_log`` is the path of a prediction audit log to append every
+    prediction to (see audit_log.py).
+    """
+    shared_predictor = SharedPredictor(artifact_path)
+    if audit_log is not None:
+        audit_log = AuditLog(audit_log)
+        shared_predictor.add_reload_hook(
+            lambda predictor: setattr(predictor, 'audit_log', audit_log))
+    if monitor:
+        # Every artifact is monitored against its own training reference
+        shared_predictor.add_reload_hook(
+            lambda predictor: setattr(predictor, 'monitor', DriftMonitor.for_predictor(predictor)))
+    if cascade_tolerance:
+        shared_predictor.add_reload_hook(
+            lambda predictor: setattr(predictor, 'cascade_tolerance', cascade_tolerance))
+    instrumentation = Instrumentation() if instrument else None
+    if instrumentation is not None:
+        shared_predictor.add_reload_hook(
+            lambda predictor: setattr(predictor, 'instrumentation', instrumentation))
+    shared_predictor.get()
+    server = ScoringServer((host, port), ScoringRequestHandler)
+    server.shared_predictor = shared_predictor
+    server.batcher = MicroBatcher(shared_predictor,
+                                  max_batch_size=max_batch_size,
+                                  max_wait=max_wait)
+    server.batch_latency = LatencyTracker()
+    server.instrumentation = instrumentation
+    server.monitoring = monitor
+    server.audit_log = audit_log
+    return server
+
+
+def serve(host='127.0.0.1', port=8000, **kwargs):
+    """Run the scoring server until interrupted"""
+    server = create_server(host, port, **kwargs)
+    logger.info('Scoring API listening on http://%s:%s', *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        if server.audit_log is not None:
+            server.audit_log.close()
+        logger.info('Latency: %s', json.dumps(server.batcher.stats()))
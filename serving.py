@@ -0,0 +1,342 @@
+"""Process-wide serving helpers around StartupSuccessPredictor."""
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from ml_model import (DEFAULT_ARTIFACT_PATH, PREDICTION_MODES, StartupSuccessPredictor,
+                      load_or_train_predictor)
+
+logger = logging.getLogger(__name__)
+
+
+class SharedPredictor:
+    """Thread-safe, process-wide holder of one read-only predictor.
+
+    Every caller shares the same loaded artifact. The artifact file is
+    polled at most every ``check_interval`` seconds; a new version is loaded
+    by one caller while the others keep using the old predictor, then
+    swapped in with a single assignment.
+    """
+
+    def __init__(self, artifact_path=DEFAULT_ARTIFACT_PATH, check_interval=5.0):
+        self.artifact_path = artifact_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._predictor = None
+        self._stamp = None
+        self._last_check = 0.0
+        self._reload_hooks = []
+
+    @property
+    def version(self):
+        predictor = self._predictor
+        return predictor.metadata.get('checksum') if predictor else None
+
+    def add_reload_hook(self, hook):
+        """Call ``hook(predictor)`` for every newly loaded predictor, before it is served"""
+        with self._lock:
+            self._reload_hooks.append(hook)
+            if self._predictor is not None:
+                hook(self._predictor)
+
+    def get(self):
+        """Return the current predictor, loading or reloading it if needed"""
+        predictor = self._predictor
+        if predictor is not None:
+            if time.monotonic() - self._last_check < self.check_interval:
+                return predictor
+            # Another caller is already reloading: keep serving the old version
+            if not self._lock.acquire(blocking=False):
+                return predictor
+        else:
+            self._lock.acquire()
+        try:
+            if self._predictor is None:
+                self._load(load_or_train_predictor)
+            elif time.monotonic() - self._last_check >= self.check_interval:
+                self._last_check = time.monotonic()
+                if self._file_stamp() != self._stamp:
+                    self._reload()
+            return self._predictor
+        finally:
+            self._lock.release()
+
+    def reload(self):
+        """Force a reload of the artifact from disk"""
+        with self._lock:
+            self._reload()
+            return self._predictor
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.artifact_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _reload(self):
+        try:
+            self._load(StartupSuccessPredictor.from_artifact)
+        except Exception:
+            logger.exception('Failed to reload %s; keeping version %s',
+                             self.artifact_path, self.version)
+
+    def _load(self, loader):
+        stamp = self._file_stamp()
+        predictor = loader(self.artifact_path)
+        if stamp is None:
+            stamp = self._file_stamp()
+        self._stamp = stamp
+        self._last_check = time.monotonic()
+        if (self._predictor is not None and
+                predictor.metadata.get('checksum') == self.version):
+            return
+        for hook in self._reload_hooks:
+            hook(predictor)
+        self._predictor = predictor
+        logger.info('Serving predictor artifact %s (version %s)',
+                    self.artifact_path, self.version)
+
+
+def resolve_predictor(predictor):
+    """Current predictor behind a SharedPredictor, or the predictor itself"""
+    if isinstance(predictor, SharedPredictor):
+        return predictor.get()
+    return predictor
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with percentile summaries"""
+
+    def __init__(self, window=10000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            samples = np.array(self._samples)
+            count = self.count
+        if not samples.size:
+            return {'count': count, 'p50_ms': None, 'p99_ms': None, 'mean_ms': None}
+        p50, p99 = np.percentile(samples, [50, 99]) * 1000
+        return {
+            'count': count,
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+            'mean_ms': float(samples.mean() * 1000)
+        }
+
+
+def batch_row(result, index):
+    """Extract one startup's prediction from a predict_batch result"""
+    row = {
+        'success_probability': float(result['success_probability'][index]),
+        'confidence_interval': float(result['confidence_interval'][index]),
+        # Cascade mode leaves the models a row did not reach as NaN
+        'model_predictions': {
+            name: float(probs[index])
+            for name, probs in result['model_predictions'].items()
+            if not np.isnan(probs[index])
+        },
+        'uncertainty_bands': None
+    }
+    bands = result.get('uncertainty_bands')
+    if bands and not np.isnan(next(iter(bands.values()))[index]):
+        row['uncertainty_bands'] = {key: float(band[index]) for key, band in bands.items()}
+    return row
+
+
+class MicroBatcher:
+    """Groups concurrent single predictions into one ``predict_batch`` call.
+
+    Requests arriving within ``max_wait`` seconds of the first queued one are
+    scored together, up to ``max_batch_size`` per batch, with one
+    ``predict_batch`` call per prediction mode in it. ``predictor`` may be a
+    SharedPredictor or anything with ``predict_batch``.
+    """
+
+    def __init__(self, predictor, max_batch_size=64, max_wait=0.005):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.latency = LatencyTracker()
+        self.batch_sizes = deque(maxlen=1000)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run,
+                                        name='micro-batcher',
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, startup, mode='full'):
+        """Queue one startup for scoring; returns a Future of its prediction"""
+        if mode not in PREDICTION_MODES:
+            raise ValueError(f"Unknown prediction mode '{mode}'; expected one of {PREDICTION_MODES}")
+        future = Future()
+        self._queue.put((startup, mode, future, time.perf_counter()))
+        return future
+
+    def predict(self, startup, timeout=None, mode='full'):
+        return self.submit(startup, mode).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._score(batch)
+            except Exception as exc:
+                # Never let one batch kill the thread: its callers would wait forever
+                logger.exception('Micro-batch scoring failed')
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            if stop:
+                return
+
+    def _score(self, batch):
+        self.batch_sizes.append(len(batch))
+        try:
+            predictor = resolve_predictor(self.predictor)
+        except Exception as exc:
+            # e.g. a corrupt or half-written artifact on first load; not the requests' fault
+            error = RuntimeError(f'Could not load the predictor: {exc}')
+            error.__cause__ = exc
+            for _, _, future, _ in batch:
+                future.set_exception(error)
+            return
+        for mode in PREDICTION_MODES:
+            group = [item for item in batch if item[1] == mode]
+            if not group:
+                continue
+            try:
+                result = predictor.predict_batch([startup for startup, _, _, _ in group],
+                                                 mode=mode)
+            except Exception as exc:
+                if len(group) == 1:
+                    group[0][2].set_exception(exc)
+                else:
+                    # One bad startup fails the whole call: score the requests one by
+                    # one so that only the bad request fails
+                    self._score_each(predictor, group, mode)
+                continue
+            now = time.perf_counter()
+            for index, (_, _, future, started) in enumerate(group):
+                self.latency.record(now - started)
+                future.set_result(batch_row(result, index))
+
+    def _score_each(self, predictor, group, mode):
+        for startup, _, future, started in group:
+            try:
+                result = predictor.predict_batch([startup], mode=mode)
+            except Exception as exc:
+                future.set_exception(exc)
+                continue
+            self.latency.record(time.perf_counter() - started)
+            future.set_result(batch_row(result, 0))
+
+    def stats(self):
+        sizes = list(self.batch_sizes)
+        stats = self.latency.snapshot()
+        stats['mean_batch_size'] = float(np.mean(sizes)) if sizes else None
+        return stats
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    return str(value)
+
+
+def canonical_key(startup):
+    """Stable key for a startup dict: sorted keys, numbers compared as floats"""
+    return json.dumps(_canonical(startup), sort_keys=True, separators=(',', ':'))
+
+
+class AsyncPredictor:
+    """Asyncio front end that coalesces identical in-flight predictions.
+
+    Concurrent ``predict`` calls for the same canonicalized startup share a
+    single inference; results are shared and must be treated as read-only.
+    Inference runs on a bounded thread pool and at most ``max_pending``
+    predictions are queued on it, so the event loop itself never blocks.
+    """
+
+    def __init__(self, predictor, max_workers=4, max_pending=64):
+        self.predictor = predictor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='async-predict')
+        self._slots = asyncio.Semaphore(max_pending)
+        self._inflight = {}
+        self.requests = 0
+        self.executed = 0
+
+    @property
+    def coalesced(self):
+        return self.requests - self.executed
+
+    async def predict(self, startup, mode='full'):
+        self.requests += 1
+        key = (mode, canonical_key(startup))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, startup, mode))
+            self._inflight[key] = task
+        # A cancelled caller must not cancel the shared inference
+        return await asyncio.shield(task)
+
+    async def predict_many(self, startups, mode='full'):
+        return await asyncio.gather(*(self.predict(s, mode) for s in startups))
+
+    async def _run(self, key, startup, mode):
+        try:
+            async with self._slots:
+                self.executed += 1
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor,
+                    lambda: resolve_predictor(self.predictor).predict(startup, mode))
+        finally:
+            del self._inflight[key]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
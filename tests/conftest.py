@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from ml_model import StartupSuccessPredictor, training_state_path
+
+
+@pytest.fixture(scope='session')
+def training_frame():
+    return StartupSuccessPredictor().generate_synthetic_training_data(1000)
+
+
+@pytest.fixture(scope='session')
+def trained():
+    """A predictor trained from scratch, with its scikit-learn estimators"""
+    predictor = StartupSuccessPredictor()
+    predictor.train_models()
+    return predictor
+
+
+@pytest.fixture(scope='session')
+def artifact_dir(trained, tmp_path_factory):
+    """Directory holding ``predictor.npz`` and its training state, never modified"""
+    directory = tmp_path_factory.mktemp('artifact')
+    path = str(directory / 'predictor.npz')
+    trained.save_artifact(path)
+    trained.save_training_state(training_state_path(path))
+    return directory
+
+
+@pytest.fixture
+def artifact_path(artifact_dir, tmp_path):
+    """A private copy of the artifact and its training state, free to modify"""
+    for name in os.listdir(artifact_dir):
+        (tmp_path / name).write_bytes((artifact_dir / name).read_bytes())
+    return str(tmp_path / 'predictor.npz')
+
+
+@pytest.fixture(scope='session')
+def predictor(artifact_dir):
+    return StartupSuccessPredictor.from_artifact(str(artifact_dir / 'predictor.npz'))
+
+
+@pytest.fixture(scope='session')
+def feature_matrix(training_frame):
+    """Training rows with their features swapped between rows, so they are new rows"""
+    X = training_frame.drop('success', axis=1).to_numpy(dtype=np.float64)
+    rng = np.random.RandomState(7)
+    samples = X[rng.randint(len(X), size=2000)]
+    swap = rng.rand(*samples.shape) < 0.5
+    donors = X[rng.randint(len(X), size=2000)]
+    samples[swap] = donors[swap]
+    return samples
+
+
+@pytest.fixture
+def startup():
+    return {
+        'funding_amount': 2000000,
+        'team_size': 12,
+        'founding_year': 2020,
+        'country': 'India',
+        'city': 'Mumbai',
+        'industry': 'Fintech',
+        'business_model': 'Marketplace'
+    }
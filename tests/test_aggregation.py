@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from ml_model import StartupSuccessPredictor, training_state_path
+
+
+@pytest.fixture
+def state(artifact_path):
+    return StartupSuccessPredictor.from_training_state(training_state_path(artifact_path))
+
+
+def test_mean_restores_the_plain_average(state, feature_matrix):
+    report = state.fit_aggregator('mean')
+    assert 'calibrated' not in report
+    result = state.predict_features(feature_matrix)
+    stacked = np.column_stack(list(result['model_predictions'].values()))
+    np.testing.assert_allclose(result['success_probability'], stacked.mean(axis=1))
+
+
+@pytest.mark.parametrize('method', ['weighted', 'stacking'])
+def test_calibrated_aggregation_survives_the_artifact(state, feature_matrix, tmp_path, method):
+    report = state.fit_aggregator(method)
+    assert report['method'] == method
+    assert set(report['calibrated']) == set(report['mean'])
+    assert set(report['weights']) == set(state.models)
+    path = str(tmp_path / 'aggregated.npz')
+    state.save_artifact(path)
+    expected = state.predict_features(feature_matrix)['success_probability']
+    actual = StartupSuccessPredictor.from_artifact(path).predict_features(feature_matrix)
+    np.testing.assert_allclose(actual['success_probability'], expected)
+    assert ((expected >= 0) & (expected <= 100)).all()
+
+
+def test_training_keeps_the_plain_mean_by_default(trained):
+    assert trained.aggregator is None
+    assert trained.metadata['aggregation']['method'] == 'mean'
+
+
+def test_changing_the_aggregation_is_a_new_model_version(state):
+    version = state.metadata['model_version']
+    state.fit_aggregator('stacking')
+    assert state.metadata['aggregation']['method'] == 'stacking'
+    assert state.metadata['model_version'] == version + 1
@@ -0,0 +1,97 @@
+import os
+import sqlite3
+
+import pytest
+
+from audit_log import AuditLog, recent_predictions
+
+
+@pytest.fixture
+def audit(tmp_path):
+    log = AuditLog(str(tmp_path / 'predictions.db'), max_wait=0.05)
+    yield log
+    log.close()
+
+
+@pytest.fixture
+def logged(audit, artifact_dir, startup):
+    from ml_model import StartupSuccessPredictor
+
+    predictor = StartupSuccessPredictor.from_artifact(str(artifact_dir / 'predictor.npz'))
+    predictor.audit_log = audit
+    predictor.predict(startup)
+    predictor.predict_batch([startup, dict(startup, team_size=40)], mode='cascade')
+    assert audit.flush(timeout=10)
+    return audit
+
+
+def test_predictions_are_logged_newest_first(logged, startup):
+    rows = logged.recent()
+    assert [row['mode'] for row in rows] == ['cascade', 'cascade', 'full']
+    assert rows[0]['inputs']['team_size'] == 40
+    assert rows[2]['inputs'] == startup
+    assert rows[0]['batch_rows'] == 2
+    assert set(rows[2]['features']) == set(rows[0]['features'])
+
+
+@pytest.mark.parametrize('statement', ['UPDATE predictions SET mode = ?',
+                                       'DELETE FROM predictions WHERE mode != ?'])
+def test_log_is_append_only(logged, statement):
+    connection = sqlite3.connect(logged.path)
+    try:
+        with pytest.raises(sqlite3.DatabaseError, match='append-only'):
+            with connection:
+                connection.execute(statement, ('tampered',))
+    finally:
+        connection.close()
+    assert len(logged.recent()) == 3
+
+
+def test_unstorable_prediction_is_rejected_alone(audit, startup):
+    class Predictor:
+        metadata = {'checksum': 'x', 'model_version': 1}
+        feature_names = ['a']
+
+    result = {'success_probability': [50.0, float('nan')], 'confidence_interval': [1.0, 1.0],
+              'model_predictions': {'m': [50.0, 50.0]}}
+    audit.record(Predictor(), [startup, startup], [[1.0], [2.0]], result, 'full', 0.001)
+    assert audit.flush(timeout=10)
+    assert audit.written == 1 and audit.rejected == 1
+
+
+def test_missing_log_is_not_created(tmp_path):
+    path = str(tmp_path / 'missing.db')
+    with pytest.raises(FileNotFoundError):
+        recent_predictions(path)
+    assert not os.path.exists(path)
+
+
+def test_recent_does_not_wait_for_a_dead_writer(logged):
+    # Stop the writer thread behind the log's back
+    logged._pending.append(None)
+    logged._wake.set()
+    logged._thread.join()
+    assert logged.flush(timeout=10) is False
+    assert len(logged.recent()) == 3
+
+
+def test_queue_bound_counts_startups(tmp_path, startup):
+    class Predictor:
+        metadata = {'checksum': 'x', 'model_version': 1}
+        feature_names = ['a']
+
+    def result(n):
+        return {'success_probability': [50.0] * n, 'confidence_interval': [1.0] * n,
+                'model_predictions': {'m': [50.0] * n}}
+
+    # The writer only runs on flush, so nothing drains between the calls
+    log = AuditLog(str(tmp_path / 'predictions.db'), max_wait=60, max_pending=3)
+    try:
+        log.record(Predictor(), [startup] * 2, [[1.0]] * 2, result(2), 'full', 0.001)
+        log.record(Predictor(), [startup] * 2, [[1.0]] * 2, result(2), 'full', 0.001)
+        log.record(Predictor(), [startup], [[1.0]], result(1), 'full', 0.001)
+        assert log.stats()['pending'] == 3 and log.dropped == 2
+        assert log.flush(timeout=10)
+        assert log.stats()['pending'] == 0 and log.written == 3
+    finally:
+        log.close()
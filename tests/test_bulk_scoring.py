@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from bulk_scoring import score_file, score_frame
+
+
+def _frame(startup, team_sizes):
+    return pd.DataFrame([dict(startup, team_size=size) for size in team_sizes])
+
+
+def test_clean_chunk_has_an_empty_error_column(predictor, startup):
+    scored = score_frame(predictor, _frame(startup, [3, 12, 40]))
+    assert scored['error'].isna().all()
+    expected = predictor.predict_batch([dict(startup, team_size=s) for s in (3, 12, 40)])
+    np.testing.assert_allclose(scored['success_probability'], expected['success_probability'])
+
+
+def test_bad_row_is_rejected_alone(predictor, startup):
+    scored = score_frame(predictor, _frame(startup, [3, 'many', 40]))
+    assert scored['error'].notna().tolist() == [False, True, False]
+    assert np.isnan(scored['success_probability'][1])
+    expected = predictor.predict(dict(startup, team_size=40))['success_probability']
+    assert scored['success_probability'][2] == expected
+
+
+def test_score_file_counts_rejected_rows(artifact_dir, startup, tmp_path):
+    source, output = str(tmp_path / 'startups.csv'), str(tmp_path / 'scored.csv')
+    _frame(startup, [3, 'many', 40, 7]).to_csv(source, index=False)
+    summary = score_file(source, output, artifact_path=str(artifact_dir / 'predictor.npz'),
+                         chunk_size=2, progress=False)
+    assert summary['rows'] == 4 and summary['rejected'] == 1
+    written = pd.read_csv(output)
+    assert written['error'].notna().tolist() == [False, True, False, False]
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from ml_model import StartupSuccessPredictor, _verdict, training_state_path
+
+
+def test_cascade_verdicts_agree_with_full_ensemble(predictor, feature_matrix):
+    full = predictor.predict_features(feature_matrix)['success_probability']
+    cascade = predictor.predict_features(feature_matrix, mode='cascade')['success_probability']
+    assert (_verdict(cascade) == _verdict(full)).mean() >= 0.99
+
+
+def test_rows_scored_by_every_model_get_the_full_probability(predictor, feature_matrix):
+    full = predictor.predict_features(feature_matrix)
+    cascade = predictor.predict_features(feature_matrix, mode='cascade')
+    reached = ~np.isnan(np.column_stack(list(cascade['model_predictions'].values()))).any(axis=1)
+    assert reached.any() and not reached.all()
+    np.testing.assert_allclose(cascade['success_probability'][reached],
+                               full['success_probability'][reached], atol=1e-9)
+    for name, probability in cascade['model_predictions'].items():
+        scored = ~np.isnan(probability)
+        np.testing.assert_allclose(probability[scored],
+                                   full['model_predictions'][name][scored], atol=1e-9)
+
+
+def test_cascade_counts_every_exit(artifact_dir, feature_matrix):
+    predictor = StartupSuccessPredictor.from_artifact(str(artifact_dir / 'predictor.npz'))
+    predictor.predict_features(feature_matrix[:500], mode='cascade')
+    stats = predictor.cascade_stats()
+    assert stats['rows'] == 500
+    assert list(stats['exits']) == predictor.metadata['cascade']['order']
+    assert 1 <= stats['models_per_row'] <= len(predictor.models)
+
+
+def test_cascade_order_follows_counted_costs(artifact_path):
+    state = StartupSuccessPredictor.from_training_state(training_state_path(artifact_path))
+    costs = {name: model.cost_per_row() for name, model in state.models.items()}
+    assert state.metadata['cascade']['order'] == sorted(costs, key=costs.get)
+    assert state.fit_cascade()['order'] == state.metadata['cascade']['order']
+
+
+def test_caller_can_set_the_cascade_order(artifact_path, feature_matrix):
+    state = StartupSuccessPredictor.from_training_state(training_state_path(artifact_path))
+    order = list(reversed(state.metadata['cascade']['order']))
+    report = state.fit_cascade(order=order)
+    assert report['order'] == order
+    assert 0.95 <= report['decision_agreement'] <= 1
+    with pytest.raises(ValueError, match='every model once'):
+        state.fit_cascade(order=order[:-1])
@@ -0,0 +1,89 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from explanations import TreeExplainer
+from model_artifact import compile_estimator
+
+
+def _expected_value(model, root, x, subset):
+    """Path-dependent expectation of one tree with the features outside ``subset`` unknown"""
+    def visit(node):
+        if model.left[node] == -1:
+            return model.value[node]
+        left, right = model.left[node], model.right[node]
+        if model.feature[node] in subset:
+            go_left = np.float32(x[model.feature[node]]) <= model.threshold[node]
+            return visit(left if go_left else right)
+        return (model.cover[left] * visit(left) +
+                model.cover[right] * visit(right)) / model.cover[node]
+    return visit(root)
+
+
+def brute_force_shapley(model, x, n_features):
+    """Shapley values of the forest's average by enumerating every feature subset"""
+    def value(subset):
+        return np.mean([_expected_value(model, root, x, subset) for root in model.roots])
+
+    values = {subset: value(set(subset))
+              for size in range(n_features + 1)
+              for subset in itertools.combinations(range(n_features), size)}
+    phi = np.zeros(n_features)
+    for i in range(n_features):
+        others = [j for j in range(n_features) if j != i]
+        for size in range(n_features):
+            weight = (math.factorial(size) * math.factorial(n_features - size - 1) /
+                      math.factorial(n_features))
+            for subset in itertools.combinations(others, size):
+                with_i = tuple(sorted(subset + (i,)))
+                phi[i] += weight * (values[with_i] - values[subset])
+    return phi, values[()]
+
+
+@pytest.fixture(scope='module')
+def small_forest(trained, training_frame):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X = trained.fitted_scaler.transform(training_frame.drop('success', axis=1))[:, :6]
+    forest = RandomForestClassifier(n_estimators=3, max_depth=4, random_state=0)
+    forest.fit(X, training_frame['success'])
+    return compile_estimator(forest), X
+
+
+def test_tree_shap_matches_brute_force_shapley(small_forest):
+    model, X = small_forest
+    explainer = TreeExplainer(model, X.shape[1])
+    phi = explainer.shap_values(X[:4])
+    for row, x in enumerate(X[:4]):
+        expected, base = brute_force_shapley(model, x, X.shape[1])
+        np.testing.assert_allclose(phi[row], expected, atol=1e-9)
+        assert explainer.expected_value == pytest.approx(base)
+
+
+def test_tree_shap_adds_up_to_prediction(small_forest):
+    model, X = small_forest
+    explainer = TreeExplainer(model, X.shape[1])
+    phi = explainer.shap_values(X[:100])
+    np.testing.assert_allclose(explainer.expected_value + phi.sum(axis=1),
+                               model.predict_proba(X[:100])[:, 1], atol=1e-9)
+
+
+def test_predict_explains_only_on_request(predictor, startup):
+    assert predictor.predict(startup)['explanation'] is None
+    explanation = predictor.predict(startup, explain=True)['explanation']
+    assert set(explanation['contributions']) == set(predictor.feature_names)
+
+
+@pytest.mark.parametrize('method', ['mean', 'weighted', 'stacking'])
+def test_explanation_adds_up_to_ensemble_probability(artifact_path, feature_matrix, method):
+    from ml_model import StartupSuccessPredictor, training_state_path
+
+    predictor = StartupSuccessPredictor.from_training_state(training_state_path(artifact_path))
+    predictor.fit_aggregator(method)
+    result = predictor.predict_features(feature_matrix[:200], explain=True)
+    explanation = result['explanation']
+    np.testing.assert_allclose(
+        explanation['base_value'] + explanation['contributions'].sum(axis=1),
+        result['success_probability'], atol=1e-6)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulk_scoring import records_from_frame
+from feature_store import FeatureStore
+
+
+@pytest.fixture
+def outcomes_csv(tmp_path):
+    path = tmp_path / 'outcomes.csv'
+    pd.DataFrame({
+        'startup_id': ['a', 'b', 'c', 'd'],
+        'funding_amount': [1000000, 2500000, 500000, 7000000],
+        'team_size': [3, 8, 20, 45],
+        'country': ['India', 'Chile', 'Japan', 'United States'],
+        'industry': ['Fintech', 'Healthcare', 'Software & IT', 'Education'],
+        'success': [1, 0, None, 1]
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_ingest_stores_prepared_features(predictor, outcomes_csv, tmp_path, dtype):
+    preparer = predictor.astype(dtype)
+    store = FeatureStore.ingest(outcomes_csv, str(tmp_path / 'store'), predictor=preparer)
+    frame = pd.read_csv(outcomes_csv)
+    labeled = frame[frame['success'].notna()]
+    expected = preparer.prepare_feature_matrix(records_from_frame(labeled))
+    assert store.features.dtype == np.float64
+    np.testing.assert_array_equal(store.features, expected.astype(np.float64))
+    np.testing.assert_array_equal(store.labels, [1, 0, 1])
+    np.testing.assert_array_equal(store.lookup(['d', 'a']), store.features[[2, 0]])
@@ -0,0 +1,44 @@
+import numpy as np
+
+from forest_compression import compress_artifact
+from ml_model import (FOREST_MODEL_NAME, StartupSuccessPredictor, training_state_path,
+                      update_artifact)
+from model_artifact import CompressedTreeEnsemble
+
+
+def test_compression_keeps_predictions_close(artifact_path, feature_matrix):
+    before = StartupSuccessPredictor.from_artifact(artifact_path)
+    report = compress_artifact(artifact_path)
+    after = StartupSuccessPredictor.from_artifact(artifact_path)
+    assert isinstance(after.models[FOREST_MODEL_NAME], CompressedTreeEnsemble)
+    assert report['forest_bytes'][1] < report['forest_bytes'][0]
+    agreement = ((before.predict_features(feature_matrix)['success_probability'] > 50) ==
+                 (after.predict_features(feature_matrix)['success_probability'] > 50)).mean()
+    assert agreement >= 0.97
+
+
+def test_training_state_keeps_the_compressed_forest(artifact_path, feature_matrix):
+    report = compress_artifact(artifact_path)
+    artifact = StartupSuccessPredictor.from_artifact(artifact_path)
+    state = StartupSuccessPredictor.from_training_state(training_state_path(artifact_path))
+    forest = state.models[FOREST_MODEL_NAME]
+    assert isinstance(forest, CompressedTreeEnsemble)
+    assert forest.n_trees == report['pruning']['trees_after']
+    assert state.metadata['forest_compression']['pruning'] == report['pruning']
+    np.testing.assert_allclose(state.predict_features(feature_matrix)['success_probability'],
+                               artifact.predict_features(feature_matrix)['success_probability'],
+                               atol=1e-9)
+
+
+def test_update_keeps_the_forest_compressed(artifact_path, training_frame):
+    report = compress_artifact(artifact_path)
+    new = training_frame.sample(40, random_state=1)
+    startups = [{'funding_amount': row.funding_amount_normalized * 10000000,
+                 'team_size': int(row.team_size), 'country': 'India'}
+                for row in new.itertuples()]
+    meta = update_artifact(startups, new['success'].to_numpy(), path=artifact_path,
+                           new_trees=5)
+    assert meta['forest_compression']['quantized']
+    forest = StartupSuccessPredictor.from_artifact(artifact_path).models[FOREST_MODEL_NAME]
+    assert isinstance(forest, CompressedTreeEnsemble)
+    assert forest.n_trees == report['pruning']['trees_after'] + 5
@@ -0,0 +1,121 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from ml_model import (BAND_PERCENTILES, FOREST_MODEL_NAME, LEAF_PRIOR_ROWS,
+                      StartupSuccessPredictor, fit_sigmoid, forest_bands, precision_report)
+from model_artifact import MODEL_KEYS, KernelSVMModel, platt_probability
+
+
+@pytest.mark.parametrize('name', [name for name in MODEL_KEYS if name != 'SVM'])
+def test_compiled_models_match_sklearn(trained, feature_matrix, name):
+    scaled = trained.fitted_scaler.transform(feature_matrix)
+    expected = trained.estimators[name].predict_proba(scaled)[:, 1]
+    actual = trained.models[name].predict_proba(trained.scaler.transform(feature_matrix))[:, 1]
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+
+def test_compiled_svm_matches_sklearn(trained, feature_matrix):
+    svm, model = trained.estimators['SVM'], trained.models['SVM']
+    decision = svm.decision_function(trained.fitted_scaler.transform(feature_matrix))
+    scaled = trained.scaler.transform(feature_matrix)
+    np.testing.assert_allclose(model.decision_function(scaled), decision, atol=1e-6)
+    sigmoid = trained.training_data['svm']['SVM']['sigmoid']
+    np.testing.assert_allclose(model.predict_proba(scaled)[:, 1],
+                               platt_probability(decision, sigmoid), atol=1e-6)
+
+
+@pytest.mark.parametrize('gamma', ['scale', 'auto', 0.05])
+def test_svm_gamma_is_resolved_like_sklearn(training_frame, gamma):
+    from sklearn.svm import SVC
+
+    X = training_frame.drop('success', axis=1).to_numpy(dtype=np.float64)[:300]
+    y = training_frame['success'].to_numpy()[:300]
+    svm = SVC(gamma=gamma).fit(X, y)
+    model = KernelSVMModel.from_estimator(svm, X, (-1.0, 0.0))
+    np.testing.assert_allclose(model.decision_function(X), svm.decision_function(X),
+                               rtol=1e-6, atol=1e-6)
+
+
+def test_training_raises_no_deprecation_warnings(training_frame):
+    X = training_frame.drop('success', axis=1)
+    predictor = StartupSuccessPredictor()
+    predictor.feature_names = X.columns.tolist()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        warnings.simplefilter('error', DeprecationWarning)
+        predictor.fit(X.to_numpy(dtype=np.float64), training_frame['success'].to_numpy())
+
+
+def test_platt_sigmoid_is_calibrated():
+    rng = np.random.RandomState(0)
+    decision = rng.randn(5000) * 2
+    outcomes = rng.rand(5000) < 1 / (1 + np.exp(-1.5 * decision + 0.5))
+    a, b = fit_sigmoid(decision, outcomes)
+    assert a == pytest.approx(-1.5, abs=0.15) and b == pytest.approx(0.5, abs=0.15)
+
+
+@pytest.mark.parametrize('name', list(MODEL_KEYS))
+def test_artifact_round_trip(trained, predictor, feature_matrix, name):
+    expected = trained.models[name].predict_proba(trained.scaler.transform(feature_matrix))
+    actual = predictor.models[name].predict_proba(predictor.scaler.transform(feature_matrix))
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_loaded_predictor_predicts_like_the_trained_one(trained, predictor, startup):
+    expected, actual = trained.predict(startup), predictor.predict(startup)
+    assert actual['success_probability'] == expected['success_probability']
+    assert actual['model_predictions'] == expected['model_predictions']
+
+
+def test_float32_copy_keeps_decisions(predictor, feature_matrix):
+    compact = predictor.astype(np.float32)
+    report = precision_report(predictor, compact, feature_matrix)
+    for name, entry in report['models'].items():
+        assert entry['decision_agreement'] == 1.0, name
+    # Scaling stays in float64, so trees take the same paths
+    for name in ('Decision Tree', FOREST_MODEL_NAME):
+        assert report['models'][name]['max_abs_diff'] < 1e-3
+    assert report['model_bytes'][1] < report['model_bytes'][0]
+
+
+def test_float32_artifact_round_trip(predictor, feature_matrix, tmp_path):
+    path = str(tmp_path / 'compact.npz')
+    compact = predictor.astype(np.float32)
+    compact.save_artifact(path)
+    loaded = StartupSuccessPredictor.from_artifact(path)
+    assert loaded.dtype == np.float32
+    np.testing.assert_array_equal(loaded.predict_features(feature_matrix)['success_probability'],
+                                  compact.predict_features(feature_matrix)['success_probability'])
+
+
+def test_forest_bands_are_smoothed_per_tree_percentiles(trained, predictor, feature_matrix):
+    forest = trained.estimators[FOREST_MODEL_NAME]
+    scaled = trained.fitted_scaler.transform(feature_matrix[:200])
+    tree_proba = np.column_stack([tree.predict_proba(scaled)[:, 1] for tree in forest.estimators_])
+    cover = np.column_stack([tree.tree_.weighted_n_node_samples[tree.apply(scaled)]
+                             for tree in forest.estimators_])
+    prior = tree_proba.mean(axis=1, keepdims=True)
+    smoothed = (cover * tree_proba + LEAF_PRIOR_ROWS * prior) / (cover + LEAF_PRIOR_ROWS)
+    bands = predictor.predict_features(feature_matrix[:200])['uncertainty_bands']
+    assert list(bands) == [f'p{q}' for q in BAND_PERCENTILES]
+    for q in BAND_PERCENTILES:
+        np.testing.assert_allclose(bands[f'p{q}'], np.percentile(smoothed, q, axis=1) * 100)
+
+
+def test_forest_bands_are_not_all_or_nothing(predictor, feature_matrix):
+    bands = predictor.predict_features(feature_matrix)['uncertainty_bands']
+    # Raw per-tree probabilities put p5 at 0% and p95 at 100% for most rows
+    assert ((bands['p5'] < 1) & (bands['p95'] > 99)).mean() < 0.01
+    assert np.median(bands['p95'] - bands['p5']) < 80
+
+
+def test_forest_bands_do_not_narrow_with_more_trees():
+    rng = np.random.RandomState(0)
+    votes = (rng.rand(50, 1000) < 0.3).astype(float)
+    cover = rng.randint(1, 30, size=votes.shape)
+    few, many = forest_bands(votes[:, :100], cover[:, :100]), forest_bands(votes, cover)
+    width = many['p95'] - many['p5']
+    assert (width > 30).all()
+    np.testing.assert_allclose(width, few['p95'] - few['p5'], atol=10)
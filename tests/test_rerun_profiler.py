@@ -0,0 +1,29 @@
+import time
+
+from rerun_profiler import RerunProfiler
+
+
+def test_rerun_left_open_ends_at_its_last_mark():
+    profiler = RerunProfiler(use_cprofile=False)
+    profiler.start()
+    profiler.mark('a')
+    time.sleep(0.02)
+    profiler.mark('b')
+    # Stopped without finish(); the wait for the next rerun must not count
+    time.sleep(0.1)
+    profiler.start()
+    rerun = profiler.reruns[-1]
+    assert rerun['interrupted']
+    assert list(rerun['sections']) == ['a']
+    assert rerun['total'] < 0.1
+
+
+def test_finish_before_rerun_closes_the_open_section():
+    profiler = RerunProfiler(use_cprofile=False)
+    profiler.start()
+    profiler.mark('a')
+    profiler.finish(interrupted=True)
+    time.sleep(0.05)
+    profiler.start()
+    assert len(profiler.reruns) == 1
+    assert profiler.reruns[0]['interrupted'] and profiler.reruns[0]['total'] < 0.05
@@ -0,0 +1,43 @@
+import pytest
+
+from serving import MicroBatcher, SharedPredictor
+
+
+@pytest.fixture
+def batcher(predictor):
+    # A long wait so that every request submitted together lands in one batch
+    batcher = MicroBatcher(predictor, max_wait=0.2)
+    yield batcher
+    batcher.close()
+
+
+def test_batched_predictions_match_single_ones(batcher, predictor, startup):
+    startups = [dict(startup, team_size=size) for size in (1, 10, 50)]
+    futures = [batcher.submit(s) for s in startups]
+    for future, s in zip(futures, startups):
+        expected = predictor.predict(s)
+        assert future.result(10)['success_probability'] == pytest.approx(
+            expected['success_probability'])
+    assert batcher.stats()['mean_batch_size'] == 3
+
+
+def test_bad_startup_fails_only_its_own_request(batcher, startup):
+    futures = [batcher.submit(startup), batcher.submit(dict(startup, team_size=None)),
+               batcher.submit(startup, mode='cascade')]
+    assert 0 <= futures[0].result(10)['success_probability'] <= 100
+    with pytest.raises((TypeError, ValueError)):
+        futures[1].result(10)
+    assert 0 <= futures[2].result(10)['success_probability'] <= 100
+
+
+def test_unloadable_artifact_fails_requests_and_keeps_the_thread(tmp_path, startup):
+    path = tmp_path / 'corrupt.npz'
+    path.write_bytes(b'not an artifact')
+    batcher = MicroBatcher(SharedPredictor(str(path)))
+    try:
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match='Could not load the predictor'):
+                batcher.predict(startup, timeout=10)
+        assert batcher._thread.is_alive()
+    finally:
+        batcher.close()
@@ -0,0 +1,24 @@
+import pytest
+
+from tuning import HalvingSearch
+
+
+def _search(n_candidates, factor, min_resources, max_resources):
+    search = HalvingSearch.__new__(HalvingSearch)
+    search.n_candidates, search.factor = n_candidates, factor
+    search.min_resources, search.max_resources = min_resources, max_resources
+    return search
+
+
+@pytest.mark.parametrize('n_candidates, factor, min_resources, max_resources, expected', [
+    (27, 3, 100, 2700, [(27, 100), (9, 300), (3, 900), (1, 2700)]),
+    (28, 3, 100, 8100, [(28, 100), (10, 300), (4, 900), (2, 2700), (1, 8100)]),
+    # Float logs miss exact powers: math.log(125, 5) > 3 and math.log(243, 3) < 5
+    (125, 5, 100, 62500, [(125, 500), (25, 2500), (5, 12500), (1, 62500)]),
+    (243, 3, 100, 24300, [(243, 100), (81, 300), (27, 900), (9, 2700), (3, 8100), (1, 24300)]),
+    # Too few rows for every rung: start higher so the last rung uses them all
+    (27, 3, 100, 899, [(27, 299), (9, 899)]),
+    (1, 3, 100, 800, [(1, 800)]),
+])
+def test_rungs(n_candidates, factor, min_resources, max_resources, expected):
+    assert _search(n_candidates, factor, min_resources, max_resources).rungs() == expected
@@ -0,0 +1,288 @@
+"""Hyperparameter search for the ensemble's models by successive halving.
+
+As in scikit-learn's ``HalvingRandomSearchCV``, each model samples
+``n_candidates`` settings from its search space and cross-validates them on a
+few training rows; the best ``1 / factor`` advance to ``factor`` times as
+many rows, until the last rung trains on the full training folds. On top of
+that:
+
+- the data is scaled once and the CV folds are the ones ``fit`` uses; each
+  fold's training rows are taken from one fixed permutation, so every rung
+  reuses the same cached arrays (joblib memory-maps them into the workers)
+- every (candidate, rows, fold) fit is its own task, spread over local cores
+- finished fits are checkpointed as they complete, so an interrupted search
+  rerun with the same checkpoint only runs what is missing
+
+    results = tune(X, y, checkpoint='artifacts/tuning.pkl', n_jobs=-1)
+    tune_artifact()  # search, then train and save an artifact with the winners
+"""
+import hashlib
+import logging
+import math
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+from scipy.stats import loguniform
+
+from ml_model import (DEFAULT_ARTIFACT_PATH, StartupSuccessPredictor, assign_folds,
+                      training_state_path)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SPACES = {
+    'Logistic Regression': {
+        'C': loguniform(1e-3, 1e2)
+    },
+    'Decision Tree': {
+        'max_depth': [3, 4, 5, 6, 8, 10, 12, 16, None],
+        'min_samples_leaf': [1, 2, 5, 10, 20, 50],
+        'criterion': ['gini', 'entropy']
+    },
+    'Random Forest': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [6, 8, 12, 16, None],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'max_features': ['sqrt', 0.5, 1.0]
+    },
+    'SVM': {
+        'C': loguniform(1e-1, 1e2),
+        'gamma': loguniform(1e-3, 1e0)
+    }
+}
+
+
+def tuning_checkpoint_path(artifact_path):
+    """Search checkpoint next to a model artifact"""
+    return os.path.splitext(artifact_path)[0] + '.tuning.pkl'
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def sample_candidates(space, n_candidates, random_state):
+    from sklearn.model_selection import ParameterSampler
+
+    return [{k: _plain(v) for k, v in params.items()}
+            for params in ParameterSampler(space, n_candidates, random_state=random_state)]
+
+
+def _evaluate(key, estimator, X, y, train, test):
+    """Accuracy on ``test`` after fitting on ``train``; NaN if the fit fails"""
+    try:
+        estimator.fit(X[train], y[train])
+    except ValueError:
+        # e.g. a small subsample holding a single class, as error_score=nan
+        return key, float('nan')
+    return key, float((estimator.predict(X[test]) == y[test]).mean())
+
+
+class HalvingSearch:
+    """Checkpointable successive-halving random search over every model"""
+
+    def __init__(self, X, y, spaces=None, n_candidates=27, factor=3, min_resources=None,
+                 cv_folds=5, n_jobs=-1, checkpoint=None, checkpoint_interval=10.0,
+                 random_state=42, model_params=None):
+        from sklearn.preprocessing import StandardScaler
+
+        self.y = np.asarray(y).astype(int)
+        self.X = StandardScaler().fit_transform(np.asarray(X, dtype=np.float64))
+        self.spaces = SEARCH_SPACES if spaces is None else spaces
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.cv_folds = cv_folds
+        self.n_jobs = n_jobs
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.random_state = random_state
+        self.model_params = model_params or {}
+
+        self.folds = assign_folds(self.y, cv_folds)
+        rng = np.random.RandomState(random_state)
+        self.train_orders = [rng.permutation(np.flatnonzero(self.folds != k))
+                             for k in range(cv_folds)]
+        self.tests = [np.flatnonzero(self.folds == k) for k in range(cv_folds)]
+        self.max_resources = min(len(order) for order in self.train_orders)
+        self.min_resources = min(min_resources or 20 * cv_folds, self.max_resources)
+        self.candidates = {
+            name: sample_candidates(space, n_candidates, random_state)
+            for name, space in self.spaces.items()
+        }
+        self.signature = self._signature()
+        self.scores = {}
+        self._saved = time.monotonic()
+        self._load_checkpoint()
+
+    def _signature(self):
+        """Identifies the data and settings a checkpoint's scores belong to"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.X).tobytes())
+        digest.update(self.y.tobytes())
+        return {
+            'data': digest.hexdigest(),
+            'candidates': self.candidates,
+            'factor': self.factor,
+            'min_resources': self.min_resources,
+            'cv_folds': self.cv_folds,
+            'random_state': self.random_state,
+            'model_params': self.model_params
+        }
+
+    def _load_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint, 'rb') as f:
+            state = pickle.load(f)
+        if state['signature'] != self.signature:
+            raise ValueError(f"Checkpoint {self.checkpoint} belongs to a different search; "
+                             "remove it or choose another path")
+        self.scores = state['scores']
+        logger.info('Resuming from %s with %d finished fits', self.checkpoint, len(self.scores))
+
+    def save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.pkl.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'signature': self.signature, 'scores': self.scores}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.checkpoint)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._saved = time.monotonic()
+
+    def rungs(self):
+        """(candidates kept, training rows per fold) of every rung"""
+        # Counted in integers: float logs miss exact powers (math.log(125, 5) > 3)
+        n_rungs = 1
+        while self.factor ** (n_rungs - 1) < self.n_candidates:
+            n_rungs += 1
+        # Start as low as min_resources allows, so the last rung uses every row
+        max_rungs = 1
+        while self.min_resources * self.factor ** max_rungs <= self.max_resources:
+            max_rungs += 1
+        n_rungs = min(n_rungs, max_rungs)
+        return [(math.ceil(self.n_candidates / self.factor ** i),
+                 int(self.max_resources / self.factor ** (n_rungs - 1 - i)))
+                for i in range(n_rungs)]
+
+    def _estimator(self, name, params):
+        from sklearn.base import clone
+
+        estimator = clone(StartupSuccessPredictor(self.model_params)._build_estimators()[name])
+        estimator.set_params(**params)
+        return estimator
+
+    def _run(self, tasks):
+        """Fit and score the tasks not already in the checkpoint"""
+        from joblib import Parallel, delayed
+
+        pending = [task for task in tasks if task[0] not in self.scores]
+        if not pending:
+            return 0
+        jobs = (delayed(_evaluate)(key, estimator, self.X, self.y, train, test)
+                for key, estimator, train, test in pending)
+        try:
+            for key, score in Parallel(n_jobs=self.n_jobs, return_as='generator_unordered')(jobs):
+                self.scores[key] = score
+                if time.monotonic() - self._saved >= self.checkpoint_interval:
+                    self.save_checkpoint()
+        finally:
+            # Also keeps the finished fits of an interrupted run
+            self.save_checkpoint()
+        return len(pending)
+
+    def _mean_scores(self, name, indices, resources):
+        scores = np.array([[self.scores[(name, i, resources, k)] for k in range(self.cv_folds)]
+                           for i in indices])
+        return np.where(np.isnan(scores).any(axis=1), -np.inf, scores.mean(axis=1))
+
+    def run(self, models=None):
+        """Search every model (or those named); returns each model's winner"""
+        names = list(self.spaces) if models is None else list(models)
+        survivors = {name: list(range(len(self.candidates[name]))) for name in names}
+        history = {name: [] for name in names}
+        for keep, resources in self.rungs():
+            tasks = []
+            for name in names:
+                survivors[name] = survivors[name][:keep]
+                tasks += [((name, i, resources, k),
+                           self._estimator(name, self.candidates[name][i]),
+                           self.train_orders[k][:resources], self.tests[k])
+                          for i in survivors[name] for k in range(self.cv_folds)]
+            started = time.perf_counter()
+            ran = self._run(tasks)
+            for name in names:
+                means = self._mean_scores(name, survivors[name], resources)
+                # Stable sort keeps sampling order among ties
+                order = np.argsort(-means, kind='stable')
+                survivors[name] = [survivors[name][j] for j in order]
+                history[name].append({
+                    'resources': resources,
+                    'candidates': len(order),
+                    'best_score': float(means[order[0]])
+                })
+            logger.info('Rung with %d rows per fold: %d fits in %.1fs, %d from the checkpoint',
+                        resources, ran, time.perf_counter() - started, len(tasks) - ran)
+
+        final = self.rungs()[-1][1]
+        results = {}
+        for name in names:
+            best = survivors[name][0]
+            results[name] = {
+                'best_params': self.candidates[name][best],
+                'cv_accuracy': float(self._mean_scores(name, [best], final)[0]),
+                'n_candidates': len(self.candidates[name]),
+                'rungs': history[name]
+            }
+        return results
+
+
+def tune(X, y, models=None, **kwargs):
+    """Successive-halving search; see ``HalvingSearch`` for the options"""
+    return HalvingSearch(X, y, **kwargs).run(models)
+
+
+def tune_artifact(path=DEFAULT_ARTIFACT_PATH, store_path=None, n_samples=1000, models=None,
+                  **kwargs):
+    """Search hyperparameters, then train and publish an artifact with the winners
+
+    Trains on a feature store when ``store_path`` is given, otherwise on the
+    synthetic data ``train_models`` uses. The search results are recorded in
+    the artifact metadata under ``tuning``.
+    """
+    kwargs.setdefault('checkpoint', tuning_checkpoint_path(path))
+    cv_folds = kwargs.setdefault('cv_folds', 5)
+    if store_path:
+        from feature_store import FeatureStore, train_predictor
+
+        store = FeatureStore(store_path)
+        results = tune(store.features, store.labels, models, **kwargs)
+        predictor = train_predictor(store, _winning_params(results), cv_folds)
+    else:
+        df = StartupSuccessPredictor().generate_synthetic_training_data(n_samples)
+        X = df.drop('success', axis=1)
+        y = df['success'].to_numpy()
+        results = tune(X.to_numpy(dtype=np.float64), y, models, **kwargs)
+        predictor = StartupSuccessPredictor(_winning_params(results))
+        predictor.feature_names = X.columns.tolist()
+        predictor.fit(X.to_numpy(dtype=np.float64), y, cv_folds)
+    predictor.metadata['tuning'] = {
+        name: {k: result[k] for k in ('best_params', 'cv_accuracy', 'n_candidates')}
+        for name, result in results.items()
+    }
+    meta = predictor.save_artifact(path)
+    predictor.save_training_state(training_state_path(path))
+    return meta, results
+
+
+def _winning_params(results):
+    return {name: result['best_params'] for name, result in results.items()}